@@ -0,0 +1,79 @@
+# benchmarks/bench_startup.py
+"""
+Mide el arranque de la aplicación.
+
+- import: tiempo de `import main` en un proceso nuevo (no necesita pantalla).
+- ventana: tiempo hasta que la ventana está visible y hasta que terminó de
+  cargar el catálogo, leído del perfil de arranque de main.py. Requiere un
+  entorno gráfico; si no lo hay se omite.
+
+Uso:
+    python benchmarks/bench_startup.py [--runs 5] [--json salida.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+
+def _has_display() -> bool:
+    return sys.platform in ("win32", "darwin") or bool(os.environ.get("DISPLAY"))
+
+
+def measure_import(runs: int) -> dict:
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(out.strip().splitlines()[-1]))
+    return {"median_s": statistics.median(samples), "samples": samples}
+
+
+def measure_window(runs: int, timeout: float = 60) -> dict:
+    env = dict(os.environ, MERGEETIQUETAS_PROFILE_STARTUP="1", MERGEETIQUETAS_EXIT_AFTER_STARTUP="1")
+    phases = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "main.py"], cwd=ROOT_DIR, env=env,
+            capture_output=True, text=True, timeout=timeout
+        )
+        for line in result.stderr.splitlines():
+            if line.startswith("startup "):
+                phases.append(json.loads(line[len("startup "):]))
+                break
+        else:
+            raise RuntimeError(f"main.py no reportó el arranque:\n{result.stderr}")
+    names = phases[0].keys()
+    return {name: statistics.median(p[name] for p in phases if name in p) for name in names}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", type=Path, help="Guardar los resultados en este archivo.")
+    args = parser.parse_args()
+
+    results = {"import": measure_import(args.runs)}
+    print(f"import main: {results['import']['median_s'] * 1000:.1f} ms (mediana de {args.runs})")
+
+    if _has_display():
+        results["window"] = measure_window(args.runs)
+        for name, seconds in results["window"].items():
+            print(f"  {name:<24} {seconds * 1000:8.1f} ms")
+    else:
+        print("Sin entorno gráfico: se omite la medición de la ventana.")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=1))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+# benchmarks/bench_suite.py
+"""
+Benchmarks de los caminos críticos: fusión, escaneo del catálogo y email.
+
+Para cada tamaño (cantidad de etiquetas) se genera un árbol sintético con la
+forma de `_ETIQUETAS_PDFS` (ver synthetic_tree.py) y se mide:
+
+- scan_cold: `SQLiteCatalogIndex.refresh()` con un índice vacío (cuenta
+  páginas y calcula hashes de todas las etiquetas).
+- scan_warm: el mismo refresco con el índice ya al día.
+- merge: `PyMuPDFRepository.merge_pdfs` de todo el árbol, configurado como
+  en main.py (sin modo incremental, para medir siempre la fusión completa).
+- merge_bundled: la misma fusión con los paquetes por categoría ya armados
+  (se arman antes de medir, fuera del tiempo del caso).
+- load_local / load_slow: la misma fusión con un solo trabajador, sin caché
+  y sin compresión (para que pese la carga de las etiquetas), con cada modo
+  de carga ("read", "bulk", "mmap") con y sin lectura anticipada. El tiempo
+  del caso es el de la configuración de main.py (bulk + prefetch); el resto
+  queda en `variants`. load_slow corre sobre un sistema de archivos lento
+  simulado (slow_fs.py).
+- email: envío de la salida de `merge` con `SMTPEmailService` a un
+  servidor SMTP local que descarta los mensajes (smtp_sink.py).
+
+Cada caso corre en un proceso nuevo, así el pico de memoria (RSS) es el del
+caso y no el de los anteriores. Se guarda tiempo (mediana de --repeat),
+rendimiento, pico de RSS y tamaño de salida.
+
+Los resultados se pueden guardar en JSON y comparar contra una corrida
+anterior: si algún tiempo o pico de memoria empeora más que --threshold,
+el programa termina con código 1.
+
+Uso:
+    python benchmarks/bench_suite.py --sizes 100,1000,10000 --json actual.json
+    python benchmarks/bench_suite.py --baseline base.json --threshold 0.15
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+CASES = ("scan_cold", "scan_warm", "merge", "merge_bundled", "load_local", "load_slow", "email")
+# Modos de carga comparados en load_*: (loader, prefetch)
+LOAD_VARIANTS = {
+    "read": ("read", 0), "bulk": ("bulk", 0), "mmap": ("mmap", 0),
+    "read+prefetch": ("read", 8), "bulk+prefetch": ("bulk", 8), "mmap+prefetch": ("mmap", 8),
+}
+LOAD_DEFAULT = "bulk+prefetch"
+# Métricas donde un valor más alto es peor
+_LOWER_IS_BETTER = ("seconds", "peak_rss_bytes")
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Pico de memoria residente del proceso actual (None si no se puede medir)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset
+        except (ImportError, AttributeError):
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB; macOS, bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# --- Casos (se ejecutan dentro del proceso hijo) ---
+
+def _case_scan(tree: Path, workdir: Path, warm: bool) -> Dict:
+    from src.infrastructure.catalog_index import SQLiteCatalogIndex
+    index_path = workdir / "catalogo.sqlite3"
+    if not warm and index_path.exists():
+        index_path.unlink()
+    index = SQLiteCatalogIndex(tree, index_path)
+    if warm:
+        index.refresh()
+    started = time.perf_counter()
+    catalog = index.refresh()
+    seconds = time.perf_counter() - started
+    labels = sum(len(items) for items in catalog.values())
+    return {"seconds": seconds, "items": labels, "throughput": labels / seconds, "unit": "etiquetas/s"}
+
+
+def _case_merge(tree: Path, workdir: Path, bundled: bool = False) -> Dict:
+    from src.infrastructure.category_bundles import CategoryBundles
+    from src.infrastructure.pdf_cache import PdfSourceCache
+    from src.infrastructure.pdf_repository import PyMuPDFRepository
+    # Mismo orden que la aplicación: por categoría y luego por nombre
+    files = sorted((str(path) for path in tree.glob("*/*.pdf")), key=Path)
+    bundles = None
+    if bundled:
+        bundles = CategoryBundles(tree, auto_rebuild=False, use_processes=False)
+        bundles.rebuild_stale()
+    repository = PyMuPDFRepository(
+        workers=min(4, os.cpu_count() or 1),
+        cache=PdfSourceCache(max_bytes=256 * 1024 * 1024),
+        max_memory_bytes=128 * 1024 * 1024,
+        garbage=4,
+        deflate=True,
+        bundles=bundles
+    )
+    output = workdir / ("merge_bundled.pdf" if bundled else "merge.pdf")
+    started = time.perf_counter()
+    report = repository.merge_pdfs(files, str(output))
+    seconds = time.perf_counter() - started
+    return {"seconds": seconds, "items": len(files), "throughput": len(files) / seconds,
+            "unit": "etiquetas/s", "input_bytes": report["input_bytes"],
+            "output_bytes": output.stat().st_size,
+            "opened": report.get("opened", len(files))}
+
+
+def _case_load(tree: Path, workdir: Path, slow: bool) -> Dict:
+    from benchmarks.slow_fs import slow_filesystem
+    from src.infrastructure.pdf_repository import PyMuPDFRepository
+    files = sorted((str(path) for path in tree.glob("*/*.pdf")), key=Path)
+    output = workdir / "load.pdf"
+    variants = {}
+    for name, (loader, prefetch) in LOAD_VARIANTS.items():
+        repository = PyMuPDFRepository(workers=1, max_memory_bytes=128 * 1024 * 1024,
+                                       loader=loader, prefetch=prefetch)
+        with slow_filesystem() if slow else contextlib.nullcontext():
+            started = time.perf_counter()
+            repository.merge_pdfs(files, str(output))
+            variants[name] = time.perf_counter() - started
+    seconds = variants[LOAD_DEFAULT]
+    return {"seconds": seconds, "items": len(files), "throughput": len(files) / seconds,
+            "unit": "etiquetas/s", "variants": variants}
+
+
+def _case_email(tree: Path, workdir: Path) -> Dict:
+    from benchmarks.smtp_sink import SMTPSink
+    from src.infrastructure.smtp_email_service import SMTPEmailService
+    attachment = workdir / "merge.pdf"
+    if not attachment.exists():
+        raise RuntimeError("El caso email necesita la salida del caso merge.")
+    service = SMTPEmailService()
+    with SMTPSink() as sink:
+        started = time.perf_counter()
+        service.send_email_with_attachment(sink.config(), str(attachment))
+        seconds = time.perf_counter() - started
+        service.close()
+    size = attachment.stat().st_size
+    return {"seconds": seconds, "items": size, "throughput": size / seconds / 1024 / 1024,
+            "unit": "MB/s", "output_bytes": sink.bytes_received}
+
+
+def _run_case_in_child(case: str, tree: Path, workdir: Path) -> Dict:
+    # Los print() de la infraestructura van a stderr; stdout queda para el JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        if case in ("merge", "merge_bundled"):
+            result = _case_merge(tree, workdir, bundled=case == "merge_bundled")
+        elif case in ("load_local", "load_slow"):
+            result = _case_load(tree, workdir, slow=case == "load_slow")
+        elif case == "email":
+            result = _case_email(tree, workdir)
+        else:
+            result = _case_scan(tree, workdir, warm=case == "scan_warm")
+    result["peak_rss_bytes"] = peak_rss_bytes()
+    return result
+
+
+# --- Orquestación ---
+
+def run_case(case: str, tree: Path, workdir: Path, repeat: int) -> Dict:
+    """Corre un caso `repeat` veces, cada una en un proceso nuevo."""
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", case, "--tree", str(tree), "--workdir", str(workdir)],
+            cwd=ROOT_DIR, capture_output=True, text=True
+        )
+        if out.returncode != 0:
+            raise RuntimeError(f"Falló el caso {case}:\n{out.stderr}")
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    result = dict(runs[-1])
+    result["seconds"] = statistics.median(run["seconds"] for run in runs)
+    result["throughput"] = result["items"] / result["seconds"]
+    if result["unit"] == "MB/s":
+        result["throughput"] /= 1024 * 1024
+    rss = [run["peak_rss_bytes"] for run in runs if run["peak_rss_bytes"] is not None]
+    result["peak_rss_bytes"] = max(rss) if rss else None
+    result["samples"] = [run["seconds"] for run in runs]
+    return result
+
+
+def run_suite(sizes: List[int], cases: List[str], repeat: int, data_dir: Path = DATA_DIR) -> Dict:
+    from benchmarks.synthetic_tree import build_label_tree
+    results = {}
+    for size in sizes:
+        started = time.perf_counter()
+        tree = build_label_tree(data_dir / f"labels_{size}", size)
+        print(f"Árbol de {size} etiquetas listo ({time.perf_counter() - started:.1f}s)", file=sys.stderr)
+        with tempfile.TemporaryDirectory(prefix="bench_") as workdir:
+            # email usa la salida de merge: si se pide email, merge corre antes
+            needed = [case for case in CASES if case in cases or (case == "merge" and "email" in cases)]
+            for case in needed:
+                result = run_case(case, tree, Path(workdir), repeat)
+                if case in cases:
+                    results[f"{case}/{size}"] = result
+                    print(_format_row(f"{case}/{size}", result), file=sys.stderr)
+    return {"meta": _metadata(repeat), "results": results}
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Compara dos corridas y devuelve las regresiones encontradas.
+
+    Se comparan el tiempo y el pico de RSS de cada caso presente en ambas;
+    empeorar más que `threshold` (fracción) cuenta como regresión.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        for metric in _LOWER_IS_BETTER:
+            before, after = base.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = after / before - 1
+            marker = "  <-- regresión" if change > threshold else ""
+            print(f"{name:<18} {metric:<15} {before:>14.4g} -> {after:<14.4g} {change:+7.1%}{marker}",
+                  file=sys.stderr)
+            if change > threshold:
+                regressions.append(f"{name} {metric} {change:+.1%}")
+    return regressions
+
+
+def _format_row(name: str, result: Dict) -> str:
+    rss = result["peak_rss_bytes"]
+    row = (f"{name:<18} {result['seconds'] * 1000:10.1f} ms  "
+           f"{result['throughput']:10.1f} {result['unit']:<12} ")
+    row += f"RSS {rss / 1024 / 1024:7.1f} MB" if rss else "RSS -"
+    if "output_bytes" in result:
+        row += f"  salida {result['output_bytes'] / 1024:.0f} KB"
+    for variant, seconds in result.get("variants", {}).items():
+        row += f"\n    {variant:<16} {seconds * 1000:10.1f} ms"
+    return row
+
+
+def _metadata(repeat: int) -> Dict:
+    import fitz  # PyMuPDF
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pymupdf": fitz.VersionBind,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "repeat": repeat,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000",
+                        help="Cantidades de etiquetas, separadas por comas.")
+    parser.add_argument("--cases", default=",".join(CASES), help="Casos a correr.")
+    parser.add_argument("--repeat", type=int, default=3, help="Corridas por caso (se usa la mediana).")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR,
+                        help="Dónde guardar los árboles sintéticos.")
+    parser.add_argument("--json", type=Path, help="Guardar los resultados en este archivo.")
+    parser.add_argument("--baseline", type=Path, help="Resultados anteriores para comparar.")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Empeoramiento tolerado antes de fallar (0.10 = 10%%).")
+    # Uso interno: ejecutar un solo caso en este proceso
+    parser.add_argument("--child", choices=CASES, help=argparse.SUPPRESS)
+    parser.add_argument("--tree", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(_run_case_in_child(args.child, args.tree, args.workdir)))
+        return 0
+
+    cases = [case.strip() for case in args.cases.split(",") if case.strip()]
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"Casos desconocidos: {', '.join(sorted(unknown))}")
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    results = run_suite(sizes, cases, args.repeat, args.data_dir)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=1))
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+        if regressions:
+            print("Regresiones: " + "; ".join(regressions), file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# benchmarks/slow_fs.py
+"""
+Simulación de un sistema de archivos lento (recurso de red, disco USB).
+
+Reemplaza `open` y `mmap` dentro de `pdf_repository` por versiones que
+esperan antes de responder:
+
+- cada apertura cuesta `open_latency` segundos (la ida y vuelta al servidor);
+- cada pedido de lectura cuesta `request_latency` más el tiempo de
+  transferir los bytes a `bandwidth` bytes/s. Un `read()` sin tamaño son
+  dos pedidos, como en `FileIO.readall` (los datos y la lectura vacía que
+  confirma el fin de archivo);
+- un mapeo se cobra al crearlo como un pedido por cada ventana de lectura
+  anticipada (`readahead` bytes). Es una aproximación: en un mapeo real las
+  páginas se traen cuando MuPDF las toca.
+
+Las esperas usan `time.sleep`, que libera el GIL: igual que con E/S real,
+varios hilos pueden esperar a la vez.
+"""
+import builtins
+import contextlib
+import mmap as _mmap
+import time
+import types
+from typing import Iterator
+
+
+class _SlowFile:
+    """Envuelve un archivo abierto y cobra cada pedido de lectura."""
+
+    def __init__(self, f, fs: "SlowFilesystem"):
+        self._f = f
+        self._fs = fs
+
+    def read(self, size: int = -1):
+        data = self._f.read(size)
+        self._fs.charge(len(data), requests=2 if size is None or size < 0 else 1)
+        return data
+
+    def readinto(self, buffer) -> int:
+        count = self._f.readinto(buffer)
+        self._fs.charge(count or 0)
+        return count
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._f.close()
+
+
+class SlowFilesystem:
+    """Parámetros de la simulación y contadores de lo cobrado."""
+
+    def __init__(self, open_latency: float = 0.002, request_latency: float = 0.001,
+                 bandwidth: float = 50 * 1024 * 1024, readahead: int = 128 * 1024):
+        self.open_latency = open_latency
+        self.request_latency = request_latency
+        self.bandwidth = bandwidth
+        self.readahead = readahead
+        self.opens = 0
+        self.requests = 0
+
+    def charge(self, size: int, requests: int = 1) -> None:
+        self.requests += requests
+        time.sleep(self.request_latency * requests + size / self.bandwidth)
+
+    def open(self, path, mode="r", *args, **kwargs):
+        self.opens += 1
+        time.sleep(self.open_latency)
+        return _SlowFile(builtins.open(path, mode, *args, **kwargs), self)
+
+    def mmap(self, fileno, length, *args, **kwargs):
+        mapped = _mmap.mmap(fileno, length, *args, **kwargs)
+        size = len(mapped)
+        self.charge(size, requests=max(1, -(-size // self.readahead)))
+        return mapped
+
+
+@contextlib.contextmanager
+def slow_filesystem(**params) -> Iterator[SlowFilesystem]:
+    """Aplica la simulación a `pdf_repository` mientras dure el bloque."""
+    from src.infrastructure import pdf_repository
+    fs = SlowFilesystem(**params)
+    fake_mmap = types.SimpleNamespace(**{
+        name: getattr(_mmap, name) for name in dir(_mmap) if name.isupper()
+    })
+    fake_mmap.mmap = fs.mmap
+    original_mmap = pdf_repository.mmap
+    pdf_repository.open = fs.open
+    pdf_repository.mmap = fake_mmap
+    try:
+        yield fs
+    finally:
+        del pdf_repository.open
+        pdf_repository.mmap = original_mmap
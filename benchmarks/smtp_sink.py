@@ -0,0 +1,106 @@
+# benchmarks/smtp_sink.py
+"""
+Servidor SMTP local que acepta todo y descarta los mensajes.
+
+Sirve para medir el envío de emails (codificación y escritura en el
+socket) sin depender de la red ni de Gmail. Acepta cualquier AUTH y solo
+cuenta mensajes y bytes recibidos.
+"""
+import socketserver
+import threading
+
+_END_OF_DATA = b"\r\n.\r\n"
+
+
+class SMTPSink:
+    """Servidor en un hilo; usar como context manager."""
+
+    def __init__(self, host: str = "127.0.0.1"):
+        self.messages = 0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        sink = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                self.buffer = b""
+                self._send("220 sink ESMTP")
+                while True:
+                    line = self._readline()
+                    if line is None:
+                        return
+                    verb = line.split(b" ", 1)[0].upper()
+                    if verb == b"EHLO":
+                        self._send("250-sink\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME")
+                    elif verb == b"AUTH":
+                        self._send("235 ok")
+                    elif verb == b"DATA":
+                        self._send("354 go ahead")
+                        size = self._read_data()
+                        if size is None:
+                            return
+                        with sink._lock:
+                            sink.messages += 1
+                            sink.bytes_received += size
+                        self._send("250 queued")
+                    elif verb == b"QUIT":
+                        self._send("221 bye")
+                        return
+                    else:
+                        self._send("250 ok")
+
+            def _send(self, text: str):
+                self.request.sendall(text.encode("ascii") + b"\r\n")
+
+            def _readline(self):
+                while b"\r\n" not in self.buffer:
+                    chunk = self.request.recv(65536)
+                    if not chunk:
+                        return None
+                    self.buffer += chunk
+                line, self.buffer = self.buffer.split(b"\r\n", 1)
+                return line
+
+            def _read_data(self):
+                # El DATA se recibe en bloques grandes; solo se busca el final
+                size = 0
+                tail = b"\r\n"
+                data, self.buffer = self.buffer, b""
+                while True:
+                    window = tail + data
+                    end = window.find(_END_OF_DATA)
+                    if end >= 0:
+                        consumed = end + len(_END_OF_DATA) - len(tail)
+                        self.buffer = data[consumed:]
+                        return size + consumed
+                    size += len(data)
+                    tail = window[-4:]
+                    data = self.request.recv(262144)
+                    if not data:
+                        return None
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self._server = Server((host, 0), Handler)
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    def config(self, sender: str = "bench@example.com", recipients: str = "sucursal@example.com") -> dict:
+        """Configuración de email que apunta a este servidor."""
+        return {
+            "EMAIL_EMISOR": sender, "APP_PASSWORD": "bench", "EMAIL_RECEPTOR": recipients,
+            "ASUNTO": "Benchmark", "SMTP_HOST": self.host, "SMTP_PORT": str(self.port),
+            "SMTP_SSL": "0",
+        }
+
+    def __enter__(self) -> "SMTPSink":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
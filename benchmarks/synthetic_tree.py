@@ -0,0 +1,96 @@
+# benchmarks/synthetic_tree.py
+"""
+Genera árboles de etiquetas sintéticos con la forma de `_ETIQUETAS_PDFS`:
+una carpeta por categoría y PDFs de una página del tamaño de una etiqueta
+(texto, un marco y un código de barras dibujado con vectores).
+
+Los árboles se generan una sola vez y se reutilizan entre corridas: el
+contenido depende solo de la cantidad de archivos y de la semilla.
+
+Uso:
+    python benchmarks/synthetic_tree.py 1000 benchmarks/.data/labels_1000
+"""
+import argparse
+import json
+import random
+import shutil
+import sys
+from pathlib import Path
+
+# Etiqueta de 100 x 50 mm
+LABEL_WIDTH = 283
+LABEL_HEIGHT = 142
+LABELS_PER_CATEGORY = 100
+_MARKER = ".synthetic.json"
+
+_BRANDS = ["Royal", "Pro Plan", "Eukanuba", "Old Prince", "Vital Can", "Excellent"]
+_KINDS = ["Perro Adulto", "Cachorro", "Gato Adulto", "Gatito", "Senior", "Light"]
+
+
+def _label_pdf(rng: random.Random, title: str) -> bytes:
+    import fitz  # PyMuPDF
+    with fitz.open() as doc:
+        page = doc.new_page(width=LABEL_WIDTH, height=LABEL_HEIGHT)
+        page.draw_rect(fitz.Rect(4, 4, LABEL_WIDTH - 4, LABEL_HEIGHT - 4), width=1)
+        page.insert_text((12, 28), title, fontsize=13)
+        page.insert_text((12, 48), f"{rng.randint(1, 20)} kg - ${rng.randint(5, 90) * 1000}", fontsize=10)
+        page.insert_text((12, 62), f"Lote {rng.randint(10000, 99999)}", fontsize=8)
+        # Código de barras: barras de ancho variable, todo vectorial
+        x = 12.0
+        shape = page.new_shape()
+        while x < LABEL_WIDTH - 20:
+            width = rng.choice((0.8, 1.6, 2.4))
+            shape.draw_rect(fitz.Rect(x, 80, x + width, 125))
+            x += width + rng.choice((0.8, 1.6))
+        shape.finish(color=None, fill=(0, 0, 0))
+        shape.commit()
+        return doc.tobytes(garbage=3, deflate=True, no_new_id=True)
+
+
+def build_label_tree(root: Path, count: int, seed: int = 0) -> Path:
+    """
+    Crea (o reutiliza) un árbol con `count` etiquetas bajo `root`.
+
+    Args:
+        root (Path): Carpeta del árbol; se borra y regenera si su contenido
+            no corresponde a `count` y `seed`.
+        count (int): Cantidad total de PDFs.
+        seed (int): Semilla del contenido.
+
+    Returns:
+        Path: La misma `root`, lista para usar como carpeta de entrada.
+    """
+    root = Path(root)
+    spec = {"count": count, "seed": seed, "per_category": LABELS_PER_CATEGORY}
+    marker = root / _MARKER
+    if marker.exists() and json.loads(marker.read_text()) == spec:
+        return root
+    if root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+
+    rng = random.Random(seed)
+    categories = max(1, -(-count // LABELS_PER_CATEGORY))
+    for index in range(count):
+        category = root / f"{index % categories + 1:03d}_{_BRANDS[index % categories % len(_BRANDS)]}"
+        category.mkdir(exist_ok=True)
+        title = f"{rng.choice(_BRANDS)} {rng.choice(_KINDS)}"
+        (category / f"etiqueta_{index:05d}.pdf").write_bytes(_label_pdf(rng, title))
+    # El marcador se escribe al final: un árbol a medio generar no se reutiliza
+    marker.write_text(json.dumps(spec))
+    return root
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("count", type=int)
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    build_label_tree(args.root, args.count, args.seed)
+    print(f"{args.count} etiquetas en {args.root}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,33 @@
 # main.py
+import time
+_PROCESS_STARTED = time.perf_counter()  # lo antes posible, para el perfil de arranque
+
+import multiprocessing
 import os
 import sys
+import threading
 from pathlib import Path
-from src.interface.app_gui import App
+from typing import Callable, TypeVar
 # --- MODIFICADO ---
-from src.core.use_cases import merge_pdfs_use_case, send_pdf_by_email_use_case
-from src.infrastructure.pdf_repository import PyMuPDFRepository
-from src.infrastructure.smtp_email_service import SMTPEmailService
+# Solo el núcleo se importa al cargar el módulo. La GUI, PyMuPDF y smtplib
+# se importan cuando se usan por primera vez (ver main() y lazy()).
+from src.core.jobs import JobScheduler
+from src.core.use_cases import merge_pdfs_use_case, queue_pdf_email_use_case
+from src.interface.startup_profiler import StartupProfiler
 # --- FIN MODIFICADO ---
 
+T = TypeVar("T")
+
+# MERGEETIQUETAS_PROFILE_STARTUP=1 (o --profile-startup) imprime en stderr
+# cuánto tarda cada etapa del arranque
+PROFILE_STARTUP = (
+    os.environ.get("MERGEETIQUETAS_PROFILE_STARTUP") == "1" or "--profile-startup" in sys.argv
+)
+# Usado por benchmarks/bench_startup.py: cerrar apenas termina el arranque
+EXIT_AFTER_STARTUP = os.environ.get("MERGEETIQUETAS_EXIT_AFTER_STARTUP") == "1"
+# MERGEETIQUETAS_METRICS=archivo.jsonl registra los tiempos de cada fusión
+METRICS_FILE = os.environ.get("MERGEETIQUETAS_METRICS")
+
 
 def get_project_root() -> Path:
     """
@@ -39,6 +58,40 @@ OUTPUT_DIR = ROOT_DIR / "_SALIDA"
 LOGO_FILE = get_asset_path("logo.png")
 # --- NUEVA RUTA ---
 CONFIG_FILE = ROOT_DIR / "config.ini"
+CATALOG_INDEX_FILE = OUTPUT_DIR / ".catalogo.sqlite3"
+OUTBOX_DIR = OUTPUT_DIR / "outbox"
+THUMBNAILS_DIR = OUTPUT_DIR / ".miniaturas"
+PRESETS_FILE = CONFIG_FILE.parent / "presets.json"
+PLANS_FILE = OUTPUT_DIR / ".planes.json"
+
+
+def lazy(factory: Callable[[], T]) -> Callable[[], T]:
+    """
+    Devuelve una función que construye el objeto la primera vez que se la
+    llama y luego devuelve siempre el mismo (segura entre hilos).
+    """
+    lock = threading.Lock()
+    instance = []
+
+    def get() -> T:
+        with lock:
+            if not instance:
+                instance.append(factory())
+        return instance[0]
+    return get
+
+
+def read_email_config() -> dict:
+    """
+    Lee la configuración de email vigente de config.ini (sección [Email] o
+    [DEFAULT]). La cola de salida la consulta en cada envío para obtener la
+    contraseña, que nunca se guarda en disco junto a los envíos.
+    """
+    import configparser
+    parser = configparser.ConfigParser()
+    parser.read(CONFIG_FILE, encoding="utf-8")
+    section = parser["Email"] if parser.has_section("Email") else parser["DEFAULT"]
+    return {key.upper(): value for key, value in section.items()}
 
 
 def main():
@@ -46,6 +99,8 @@ def main():
     Punto de entrada principal de la aplicación.
     Configura las carpetas, inyecta las dependencias e inicia la GUI.
     """
+    profiler = StartupProfiler(enabled=PROFILE_STARTUP, origin=_PROCESS_STARTED)
+    profiler.mark("imports")
     
     INPUT_DIR.mkdir(exist_ok=True)
     OUTPUT_DIR.mkdir(exist_ok=True)
@@ -54,38 +109,154 @@ def main():
         (INPUT_DIR / "01_Ejemplo_Categoria").mkdir(exist_ok=True)
         print(f"Carpetas creadas. Agrega tus PDFs en: {INPUT_DIR}")
 
+    profiler.mark("carpetas")
+
     # 2. Inyección de Dependencias
     
-    # Repositorio de PDF
-    pdf_repository = PyMuPDFRepository()
-    def merge_use_case_func(files: list[str], output: str, on_progress: callable = None):
-        merge_pdfs_use_case(
+    # Paquetes pre-fusionados por categoría (en _ETIQUETAS_PDFS/.bundles); se
+    # arman en un proceso aparte cuando la ventana ya está lista
+    from src.infrastructure.category_bundles import CategoryBundles
+    bundles = CategoryBundles(INPUT_DIR)
+
+    # Repositorio de PDF (se crea en la primera fusión: importa PyMuPDF)
+    # Los hilos solo leen los archivos; el parseo e inserción quedan en un escritor
+    def build_pdf_repository():
+        from src.infrastructure.pdf_cache import PdfSourceCache
+        from src.infrastructure.pdf_repository import PyMuPDFRepository
+        pdf_cache = PdfSourceCache(max_bytes=256 * 1024 * 1024)
+        return pdf_cache, PyMuPDFRepository(
+            workers=min(4, os.cpu_count() or 1),
+            cache=pdf_cache,
+            incremental=True,
+            max_memory_bytes=128 * 1024 * 1024,
+            garbage=4,
+            deflate=True,
+            bundles=bundles,
+            loader="bulk",
+            prefetch=8
+        )
+    get_pdf_repository = lazy(build_pdf_repository)
+
+    def build_metrics_file():
+        from src.infrastructure.metrics_sink import JsonLinesMetricsSink
+        return JsonLinesMetricsSink(Path(METRICS_FILE))
+    get_metrics_file = lazy(build_metrics_file)
+
+    def merge_use_case_func(files: list[str], output: str, on_progress: callable = None,
+                            metrics=None, cancel=None):
+        pdf_cache, pdf_repository = get_pdf_repository()
+        if METRICS_FILE:
+            from src.core.metrics import MetricsFanout
+            metrics = MetricsFanout([metrics, get_metrics_file()])
+        report = merge_pdfs_use_case(
             pdf_files=files, 
             output_path=output, 
             pdf_repository=pdf_repository,
-            on_progress=on_progress
+            on_progress=on_progress,
+            metrics=metrics,
+            cancel=cancel
         )
+        if METRICS_FILE:
+            # Aciertos acumulados de la caché compartida, junto a los tiempos de la fusión
+            get_metrics_file().record("cache", pdf_cache.stats())
+        return report
 
-    # --- NUEVO: Servicio de Email ---
-    email_service = SMTPEmailService()
-    def send_email_use_case_func(config: dict, pdf_path: str):
-        send_pdf_by_email_use_case(
+    # --- NUEVO: Servicio de Email (se crea en el primer envío: importa smtplib/ssl) ---
+    def build_email_service():
+        from src.infrastructure.smtp_email_service import SMTPEmailService
+        # Gmail acepta 25 MB por mensaje ya codificado en base64 (~18 MB de PDF)
+        return SMTPEmailService(max_attachment_bytes=18 * 1024 * 1024)
+    get_email_service = lazy(build_email_service)
+
+    # Cola de salida: encolar es inmediato y los reintentos sobreviven a un
+    # reinicio. Se despacha desde que la ventana está lista.
+    def build_email_outbox():
+        from src.infrastructure.email_outbox import FileEmailOutbox
+        return FileEmailOutbox(OUTBOX_DIR, get_email_service(), secrets=read_email_config)
+    get_email_outbox = lazy(build_email_outbox)
+
+    def send_email_use_case_func(config: dict, pdf_path: str) -> list:
+        return queue_pdf_email_use_case(
             config=config,
             pdf_path=pdf_path,
-            email_service=email_service
+            email_outbox=get_email_outbox()
         )
     # --- FIN NUEVO ---
 
+    # Índice persistente del catálogo de etiquetas
+    from src.infrastructure.catalog_index import SQLiteCatalogIndex
+    from src.infrastructure.catalog_watcher import CatalogWatcher
+    from src.infrastructure.preflight_index import SQLitePreflightIndex
+    label_catalog = SQLiteCatalogIndex(INPUT_DIR, CATALOG_INDEX_FILE)
+    catalog_watcher = CatalogWatcher(label_catalog)
+    # Un cambio en una categoría vence su paquete: se rehace en segundo plano
+    catalog_watcher.subscribe(lambda events: bundles.schedule({e.label.category for e in events}))
+    # Validación previa de las etiquetas (páginas, contraseña, daños), en
+    # procesos aparte y guardada junto al catálogo
+    preflight_index = SQLitePreflightIndex(CATALOG_INDEX_FILE, workers=min(4, os.cpu_count() or 1))
+    # Vistas previas de las etiquetas: se dibujan a pedido, en procesos aparte
+    from src.infrastructure.thumbnail_cache import ThumbnailCache
+    thumbnails = ThumbnailCache(THUMBNAILS_DIR, workers=2)
+    # Selecciones guardadas con nombre y sus planes de fusión ya resueltos
+    from src.infrastructure.preset_store import JsonPresetStore
+    preset_store = JsonPresetStore(PRESETS_FILE, INPUT_DIR, PLANS_FILE, preflight_index)
+    # Fusiones y envíos corren en un grupo acotado de hilos; el carril
+    # pesado deja un hilo libre para los trabajos cortos
+    scheduler = JobScheduler(workers=2)
+    profiler.mark("dependencias")
+
     # 3. Iniciar la Aplicación (Interface)
+    from src.interface.app_gui import App
+    profiler.mark("import_gui")
+
+    def on_ready():
+        profiler.report()
+        if EXIT_AFTER_STARTUP:
+            app.after(0, app.close)
+            return
+        # Con la ventana ya usable, precargar PyMuPDF para que la primera
+        # fusión no pague el import, retomar los emails pendientes y poner
+        # al día los paquetes por categoría
+        threading.Thread(target=get_pdf_repository, daemon=True).start()
+        threading.Thread(target=start_email_outbox, daemon=True).start()
+        bundles.schedule(bundles.categories())
+
+    started_outboxes = []
+
+    def start_email_outbox():
+        outbox = get_email_outbox()
+        outbox.start()
+        started_outboxes.append(outbox)
+        if not app.is_closing:
+            app.after(0, lambda: app.attach_email_outbox(outbox))
+
     app = App(
         merge_use_case=merge_use_case_func,
         send_email_use_case=send_email_use_case_func, # <--- MODIFICADO
         input_dir=INPUT_DIR,
         output_dir=OUTPUT_DIR,
         logo_file=LOGO_FILE,
-        config_file=CONFIG_FILE # <--- NUEVO
+        config_file=CONFIG_FILE, # <--- NUEVO
+        label_catalog=label_catalog,
+        catalog_watcher=catalog_watcher,
+        startup_profiler=profiler,
+        on_ready=on_ready,
+        preflight_index=preflight_index,
+        thumbnails=thumbnails,
+        preset_store=preset_store,
+        scheduler=scheduler
     )
     app.mainloop()
 
+    # La ventana ya canceló los trabajos: se espera a que suelten sus archivos temporales
+    scheduler.shutdown(cancel=True, timeout=10)
+
+    # Lo que no se llegó a enviar queda en disco para la próxima vez
+    for outbox in started_outboxes:
+        outbox.stop(timeout=2)
+    bundles.close()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Necesario para los procesos de la validación previa y de las miniaturas en el .exe
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,2 @@
+# mergeetiquetas/__init__.py
+"""Permite ejecutar `python -m mergeetiquetas` desde la raíz del proyecto."""
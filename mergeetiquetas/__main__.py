@@ -0,0 +1,6 @@
+# mergeetiquetas/__main__.py
+import sys
+from src.interface.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+# src/core/entities.py
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class LabelInfo:
+    """
+    Una etiqueta PDF del catálogo, tal como la conoce el índice.
+
+    Attributes:
+        category (str): Nombre de la carpeta (categoría) que la contiene.
+        path (str): Ruta absoluta al archivo PDF.
+        size (int): Tamaño en bytes.
+        mtime_ns (int): Fecha de modificación en nanosegundos.
+        page_count (int): Cantidad de páginas (0 si no se pudo abrir).
+        content_hash (str): SHA-256 del contenido.
+    """
+    category: str
+    path: str
+    size: int
+    mtime_ns: int
+    page_count: int
+    content_hash: str
+
+    @property
+    def name(self) -> str:
+        """Nombre del archivo, tal como se muestra en la interfaz."""
+        return self.path.replace("\\", "/").rsplit("/", 1)[-1]
+
+
+@dataclass(frozen=True)
+class CatalogEvent:
+    """
+    Un cambio puntual en el catálogo de etiquetas.
+
+    Attributes:
+        kind (str): 'added', 'removed' o 'modified'.
+        label (LabelInfo): La etiqueta afectada (para 'removed', su último
+            estado conocido).
+    """
+    kind: str
+    label: LabelInfo
+
+
+# Estados de la validación previa de una etiqueta
+PREFLIGHT_OK = "ok"
+PREFLIGHT_NEEDS_REPAIR = "needs_repair"  # abre, pero MuPDF tuvo que reconstruirlo
+PREFLIGHT_ENCRYPTED = "encrypted"        # pide contraseña para abrirlo
+PREFLIGHT_EMPTY = "empty"                # sin páginas
+PREFLIGHT_CORRUPT = "corrupt"            # no se puede abrir
+PREFLIGHT_MISSING = "missing"            # el archivo ya no existe
+
+
+@dataclass(frozen=True)
+class PreflightResult:
+    """
+    Resultado de validar una etiqueta antes de fusionarla.
+
+    Attributes:
+        path (str): Ruta absoluta al archivo PDF.
+        status (str): Uno de los estados PREFLIGHT_*.
+        page_count (int): Páginas (0 si no se pudo abrir).
+        detail (str): Descripción del problema, si lo hay.
+    """
+    path: str
+    status: str
+    page_count: int
+    detail: str = ""
+
+    @property
+    def usable(self) -> bool:
+        """True si se puede fusionar (aunque haya que repararlo al abrirlo)."""
+        return self.status in (PREFLIGHT_OK, PREFLIGHT_NEEDS_REPAIR)
+
+
+@dataclass(frozen=True)
+class PreflightReport:
+    """
+    Resultado de validar una selección completa.
+
+    Attributes:
+        entries (list): La selección a fusionar, ya sin las etiquetas omitidas.
+        skipped (list): PreflightResult de las etiquetas omitidas.
+        repaired (list): PreflightResult de las que se repararán al abrirlas.
+        total_pages (int): Páginas de la salida, copias incluidas.
+    """
+    entries: list
+    skipped: list
+    repaired: list
+    total_pages: int
+
+
+@dataclass(frozen=True)
+class SelectionPreset:
+    """
+    Una selección de etiquetas guardada con nombre, para repetirla.
+
+    Attributes:
+        name (str): Nombre del preset.
+        categories (tuple): Categorías completas (lo que tengan al usarlo).
+        globs (tuple): Patrones relativos a la carpeta de etiquetas.
+        files (tuple): Etiquetas sueltas, relativas a la carpeta de
+            etiquetas, o pares (ruta, copias).
+    """
+    name: str
+    categories: tuple = ()
+    globs: tuple = ()
+    files: tuple = ()
+
+
+@dataclass(frozen=True)
+class MergePlan:
+    """
+    Un preset ya resuelto y validado, listo para fusionar.
+
+    Attributes:
+        name (str): Nombre del preset.
+        entries (list): Rutas absolutas o pares (ruta, copias), sin las
+            etiquetas que no se pueden usar.
+        skipped (list): PreflightResult de las etiquetas omitidas.
+        total_pages (int): Páginas de la salida, copias incluidas.
+        fingerprint (str): Hash del contenido y las copias de `entries`;
+            dos planes con el mismo valor producen el mismo PDF.
+        reused (bool): True si el plan se tomó del caché sin recompilarlo.
+    """
+    name: str
+    entries: list
+    skipped: list
+    total_pages: int
+    fingerprint: str
+    reused: bool = False
+
+
+@dataclass(frozen=True)
+class ProgressUpdate:
+    """
+    El estado de un trabajo largo, tal como lo entrega un ProgressChannel.
+
+    Attributes:
+        current (int): Unidades hechas (archivos, mensajes, miniaturas...).
+        total (int): Unidades esperadas (0 si no se sabe).
+        message (str): Texto para mostrar.
+        seconds (float): Tiempo desde `start`.
+        items_per_second (float): Ritmo medio desde `start`.
+        eta_seconds (float): Tiempo restante estimado (None sin datos).
+        done (bool): True en la entrega de `finish`.
+        ok (bool): Resultado informado en `finish`.
+        fields (dict): Datos propios del trabajo.
+        throughput (dict): `ThroughputMeter.snapshot()` al entregar, si el
+            canal tiene medidor.
+    """
+    current: int
+    total: int
+    message: str
+    seconds: float
+    items_per_second: float
+    eta_seconds: object
+    done: bool
+    ok: bool
+    fields: dict
+    throughput: object = None
+
+    @property
+    def fraction(self) -> float:
+        """Avance entre 0 y 1 (para una barra de progreso)."""
+        return min(1.0, self.current / self.total) if self.total > 0 else 0.0
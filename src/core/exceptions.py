@@ -9,3 +9,7 @@ class EmailError(Exception):
 class ConfigurationError(Exception):
     """Raised when there is an issue with the configuration."""
     pass
+
+class OperationCancelled(Exception):
+    """Raised when a job notices that it was cancelled."""
+    pass
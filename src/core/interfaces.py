@@ -1,20 +1,97 @@
 # src/core/interfaces.py
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import Any, Callable, List, Dict, Optional
+from src.core.selection import SelectionEntry
+from src.core.entities import CatalogEvent, LabelInfo, MergePlan, PreflightResult, SelectionPreset
+from src.core.jobs import CancellationToken
+
+class IMetricsSink(ABC):
+    """
+    Define la interfaz (el "contrato") para recibir métricas de las fusiones.
+
+    Eventos que se registran:
+        - "merge_start": files, output.
+        - "file": index, path, pages, copies, bytes, cached, read_seconds,
+          parse_seconds, insert_seconds.
+        - "save": seconds, bytes_written, incremental.
+        - "merge_end": ok, files, pages, bytes, seconds, pages_per_second,
+          mb_per_second (y error si falló).
+    """
+    @abstractmethod
+    def record(self, event: str, fields: Dict[str, Any]) -> None:
+        """
+        Registra un evento. Se llama desde el hilo que fusiona, por lo que
+        debe ser rápido y no lanzar excepciones.
+        """
+        pass
+
 
 class IPdfRepository(ABC):
     """
     Define la interfaz (el "contrato") para las operaciones de PDF.
     """
     @abstractmethod
-    def merge_pdfs(self, pdf_file_paths: List[str], output_path: str, on_progress: callable = None) -> None:
+    def merge_pdfs(self, pdf_file_paths: List[SelectionEntry], output_path: str, on_progress: callable = None,
+                   metrics: Optional[IMetricsSink] = None,
+                   cancel: Optional[CancellationToken] = None) -> Optional[Dict]:
         """
         Fusiona una lista de archivos PDF en un único archivo de salida.
         
         Args:
-            pdf_file_paths (List[str]): Lista de rutas a los archivos PDF de entrada.
+            pdf_file_paths (List[SelectionEntry]): Lista de rutas a los archivos PDF de entrada,
+                o pares (ruta, copias). Cada fuente se lee una sola vez aunque se pidan varias copias.
+            output_path (str): Ruta al archivo PDF de salida.
+            on_progress (callable, optional): Callback que recibe (actual, total) para reportar progreso.
+            metrics (IMetricsSink, optional): Recibe un evento "file" por
+                fuente y uno "save" por guardado.
+            cancel (CancellationToken, optional): Se consulta entre fuente y
+                fuente. La salida se escribe aparte y reemplaza a la anterior
+                solo al terminar, así que cancelar nunca la deja a medias.
+
+        Returns:
+            Dict, optional: Reporte de esta fusión (modo, bytes, tiempos), si
+                la implementación lo lleva.
+
+        Raises:
+            OperationCancelled: Si se canceló antes de terminar.
+        """
+        pass
+
+    @abstractmethod
+    def impose_pdfs(
+        self,
+        pdf_file_paths: List[SelectionEntry],
+        output_path: str,
+        columns: int,
+        rows: int,
+        paper_size: str = "a4",
+        margin: float = 18,
+        gap: float = 6,
+        on_progress: callable = None,
+        metrics: Optional[IMetricsSink] = None,
+        cancel: Optional[CancellationToken] = None
+    ) -> Optional[Dict]:
+        """
+        Acomoda varias etiquetas por hoja (imposición N-up) en el PDF de salida.
+
+        Args:
+            pdf_file_paths (List[SelectionEntry]): Lista de rutas o pares (ruta, copias).
             output_path (str): Ruta al archivo PDF de salida.
+            columns (int): Etiquetas por fila de la grilla.
+            rows (int): Filas de la grilla por hoja.
+            paper_size (str): Tamaño de la hoja (por ejemplo 'a4' o 'letter').
+            margin (float): Margen de la hoja, en puntos.
+            gap (float): Separación entre celdas, en puntos.
             on_progress (callable, optional): Callback que recibe (actual, total) para reportar progreso.
+            metrics (IMetricsSink, optional): Como en `merge_pdfs`.
+            cancel (CancellationToken, optional): Como en `merge_pdfs`.
+
+        Returns:
+            Dict, optional: Reporte como el de `merge_pdfs`.
+
+        Raises:
+            ValueError: Si la grilla no tiene filas o columnas.
+            OperationCancelled: Si se canceló antes de terminar.
         """
         pass
 
@@ -24,7 +101,8 @@ class IEmailService(ABC):
     Define la interfaz (el "contrato") para el servicio de envío de email.
     """
     @abstractmethod
-    def send_email_with_attachment(self, config: Dict[str, str], file_path: str) -> None:
+    def send_email_with_attachment(self, config: Dict[str, str], file_path: str,
+                                   cancel: Optional[CancellationToken] = None) -> Optional[Dict]:
         """
         Envía un email con un archivo adjunto.
 
@@ -32,9 +110,195 @@ class IEmailService(ABC):
             config (Dict[str, str]): Un diccionario que contiene
                 'EMAIL_EMISOR', 'APP_PASSWORD', 'EMAIL_RECEPTOR', 'ASUNTO'.
             file_path (str): Ruta al archivo que se debe adjuntar.
-        
+            cancel (CancellationToken, optional): Se consulta entre mensaje y
+                mensaje y mientras se transmite el adjunto; un mensaje cortado
+                a mitad no llega a entregarse.
+
+        Returns:
+            Dict, optional: Reporte de este envío (mensajes, conexiones,
+                tiempos), si la implementación lo lleva.
+
+        Raises:
+            EmailError: Si falla la conexión, la autenticación, la lectura o
+                preparación del adjunto, o el envío a algún destinatario.
+            OperationCancelled: Si se canceló antes de terminar.
+        """
+        pass
+
+
+class ILabelCatalog(ABC):
+    """
+    Define la interfaz (el "contrato") para el catálogo de etiquetas.
+    """
+    @abstractmethod
+    def refresh(self, full: bool = False) -> Dict[str, List[LabelInfo]]:
+        """
+        Actualiza el catálogo y devuelve las etiquetas agrupadas por categoría.
+
+        Args:
+            full (bool): Si es True, vuelve a revisar todos los archivos
+                aunque sus carpetas no hayan cambiado.
+
+        Returns:
+            Dict[str, List[LabelInfo]]: Categorías (ordenadas) con sus
+                etiquetas ordenadas por nombre. Las categorías vacías se omiten.
+        """
+        pass
+
+    @abstractmethod
+    def refresh_category(self, category: str) -> List[LabelInfo]:
+        """
+        Revisa todos los archivos de una sola categoría, aunque el mtime de
+        su carpeta no haya cambiado, y devuelve sus etiquetas.
+
+        Args:
+            category (str): Nombre de la categoría (carpeta).
+
+        Returns:
+            List[LabelInfo]: Etiquetas ordenadas por nombre (vacía si la
+                carpeta ya no existe).
+        """
+        pass
+
+
+class ICatalogWatcher(ABC):
+    """
+    Define la interfaz (el "contrato") para observar cambios en el catálogo.
+    """
+    @abstractmethod
+    def start(self, on_events: Callable[[List[CatalogEvent]], None]) -> None:
+        """
+        Comienza a observar en segundo plano.
+
+        Args:
+            on_events (Callable): Se invoca desde el hilo del observador con
+                cada lote de eventos. Quien lo recibe debe pasar al hilo de
+                la interfaz si necesita tocar widgets.
+        """
+        pass
+
+    @abstractmethod
+    def stop(self) -> None:
+        """Detiene la observación y espera a que termine el hilo."""
+        pass
+
+
+class IEmailOutbox(ABC):
+    """
+    Define la interfaz (el "contrato") para una cola de salida de emails.
+
+    Encolar es inmediato; el envío, con sus reintentos, ocurre en segundo
+    plano y sobrevive a un reinicio de la aplicación.
+    """
+    @abstractmethod
+    def enqueue(self, config: Dict[str, str], file_path: str) -> List[str]:
+        """
+        Encola el envío de un PDF a los destinatarios de la configuración.
+
+        Args:
+            config (Dict[str, str]): Igual que en IEmailService. La
+                contraseña no se guarda en la cola.
+            file_path (str): PDF a adjuntar (la cola guarda su propia copia).
+
+        Returns:
+            List[str]: Identificadores de los envíos encolados.
+        """
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, float]:
+        """
+        Estado de la cola: 'pending', 'in_flight', 'sent', 'failed',
+        'retries' y 'sent_per_minute'.
+        """
+        pass
+
+    @abstractmethod
+    def subscribe(self, listener: Callable[[Dict[str, float]], None]) -> None:
+        """
+        Registra una función que recibe `stats()` tras cada cambio. Se llama
+        desde los hilos de la cola.
+        """
+        pass
+
+
+class IPreflightIndex(ABC):
+    """
+    Define la interfaz (el "contrato") para validar etiquetas antes de
+    fusionarlas: páginas, contraseña y si el archivo está dañado.
+
+    Los resultados se guardan y solo se vuelven a calcular para los
+    archivos que cambiaron, así que validar una selección ya revisada en
+    segundo plano no abre ningún PDF.
+    """
+    @abstractmethod
+    def validate(self, pdf_paths: List[str],
+                 on_progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, PreflightResult]:
+        """
+        Valida los archivos que lo necesiten y devuelve el resultado de todos.
+
+        Args:
+            pdf_paths (List[str]): Rutas a validar.
+            on_progress (Callable, optional): Recibe (validados, a_validar).
+
+        Returns:
+            Dict[str, PreflightResult]: Un resultado por ruta pedida (la
+                clave es la ruta tal como se pasó).
+        """
+        pass
+
+
+class IThumbnailProvider(ABC):
+    """
+    Define la interfaz (el "contrato") para obtener vistas previas de las
+    etiquetas sin bloquear a quien las pide.
+    """
+    @abstractmethod
+    def request(self, pdf_path: str, on_ready: Callable[[str, Optional[str]], None]) -> None:
+        """
+        Pide la miniatura de la primera página de un PDF.
+
+        Vuelve enseguida; `on_ready(pdf_path, png_path)` se llama desde otro
+        hilo cuando la imagen está lista (png_path es None si no se pudo
+        generar). Los pedidos más recientes se atienden primero.
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """Descarta los pedidos pendientes y libera los trabajadores."""
+        pass
+
+
+class IPresetStore(ABC):
+    """
+    Define la interfaz (el "contrato") para guardar selecciones con nombre
+    y compilarlas en planes de fusión.
+    """
+    @abstractmethod
+    def list_presets(self) -> List[SelectionPreset]:
+        """Devuelve los presets guardados, ordenados por nombre."""
+        pass
+
+    @abstractmethod
+    def save_preset(self, preset: SelectionPreset) -> None:
+        """Guarda (o reemplaza) un preset."""
+        pass
+
+    @abstractmethod
+    def delete_preset(self, name: str) -> None:
+        """Borra un preset; no hace nada si no existe."""
+        pass
+
+    @abstractmethod
+    def compile_plan(self, name: str) -> MergePlan:
+        """
+        Resuelve un preset en rutas, hashes y páginas.
+
+        El plan se reutiliza mientras no cambie el preset ni ninguna de sus
+        fuentes (ni aparezcan etiquetas nuevas en sus categorías).
+
         Raises:
-            ValueError: Si la configuración es inválida.
-            RuntimeError: Si falla la conexión o la autenticación.
+            ValueError: Si el preset no existe o no resuelve ninguna etiqueta.
         """
-        pass
\ No newline at end of file
+        pass
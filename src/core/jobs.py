@@ -0,0 +1,271 @@
+# src/core/jobs.py
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+from src.core.exceptions import OperationCancelled
+
+# Carriles de trabajo, en orden de prioridad
+LANE_QUICK = "quick"  # validaciones, encolar emails: segundos como mucho
+LANE_HEAVY = "heavy"  # fusiones e imposiciones
+LANES = (LANE_QUICK, LANE_HEAVY)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+
+class CancellationToken:
+    """
+    Aviso de cancelación compartido entre quien lanza un trabajo y el
+    trabajo mismo.
+
+    Cancelar no interrumpe nada por la fuerza: el trabajo consulta el token
+    en puntos seguros (entre archivo y archivo, entre bloque y bloque) y
+    corta con OperationCancelled, dejando todo como estaba.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        """Pide la cancelación (se puede llamar desde cualquier hilo)."""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Raises:
+            OperationCancelled: Si se pidió la cancelación.
+        """
+        if self._event.is_set():
+            raise OperationCancelled("La operación fue cancelada.")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Espera hasta `timeout` segundos; devuelve True si se canceló."""
+        return self._event.wait(timeout)
+
+
+def check_cancelled(token: Optional[CancellationToken]) -> None:
+    """`token.raise_if_cancelled()` tolerando que no haya token."""
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+class Job:
+    """
+    Un trabajo enviado a un JobScheduler.
+
+    Attributes:
+        id (int): Número correlativo.
+        name (str): Descripción para mostrar.
+        lane (str): Carril en el que corre.
+        token (CancellationToken): Se le pasa a la función del trabajo.
+        state (str): 'pending', 'running', 'done', 'failed' o 'cancelled'.
+        result (Any): Lo que devolvió la función (si terminó bien).
+        error (Exception): La excepción que la cortó (si falló).
+    """
+
+    def __init__(self, job_id: int, name: str, lane: str, fn: Callable[[CancellationToken], Any],
+                 on_done: Optional[Callable[["Job"], None]], scheduler: "JobScheduler"):
+        self.id = job_id
+        self.name = name
+        self.lane = lane
+        self.token = CancellationToken()
+        self.state = JOB_PENDING
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+        self._fn = fn
+        self._on_done = on_done
+        self._scheduler = scheduler
+        self._finished = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        """True si ya terminó, de la forma que sea."""
+        return self._finished.is_set()
+
+    def cancel(self) -> None:
+        """Cancela el trabajo: si no empezó, no corre; si está corriendo, se le avisa."""
+        self.token.cancel()
+        self._scheduler._discard_pending(self)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que termine; devuelve False si venció `timeout`."""
+        return self._finished.wait(timeout)
+
+    def __repr__(self) -> str:
+        return f"Job({self.id}, {self.name!r}, {self.lane}, {self.state})"
+
+
+class JobScheduler:
+    """
+    Ejecuta trabajos en un grupo acotado de hilos, con carriles de prioridad.
+
+    Un hilo libre toma siempre el trabajo más antiguo del carril de mayor
+    prioridad que tenga lugar. Cada carril tiene un tope de trabajos
+    simultáneos: por defecto el carril pesado deja un hilo libre, así una
+    validación o un email no esperan detrás de una fusión de 2.000
+    etiquetas.
+
+    Cada trabajo recibe un CancellationToken. Los hilos se crean con el
+    primer trabajo.
+    """
+
+    def __init__(self, workers: int = 2, lane_limits: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            workers (int): Hilos del grupo (trabajos simultáneos en total).
+            lane_limits (Dict[str, int], optional): Trabajos simultáneos por
+                carril. Por defecto `workers` para el rápido y `workers - 1`
+                (al menos 1) para el pesado.
+
+        Raises:
+            ValueError: Si `workers` es menor que 1 o un carril no existe.
+        """
+        if workers < 1:
+            raise ValueError("El planificador necesita al menos un hilo.")
+        limits = {LANE_QUICK: workers, LANE_HEAVY: max(1, workers - 1)}
+        for lane, limit in (lane_limits or {}).items():
+            if lane not in LANES:
+                raise ValueError(f"Carril desconocido: '{lane}' (opciones: {', '.join(LANES)}).")
+            limits[lane] = max(1, limit)
+        self.workers = workers
+        self.lane_limits = limits
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Deque[Job]] = {lane: deque() for lane in LANES}
+        self._running: Dict[str, List[Job]] = {lane: [] for lane in LANES}
+        self._threads: List[threading.Thread] = []
+        self._ids = itertools.count(1)
+        self._closed = False
+
+    def submit(self, fn: Callable[[CancellationToken], Any], name: str = "", lane: str = LANE_QUICK,
+               on_done: Optional[Callable[[Job], None]] = None) -> Job:
+        """
+        Encola un trabajo.
+
+        Args:
+            fn (Callable): Recibe el CancellationToken del trabajo; lo que
+                devuelve queda en `job.result`.
+            name (str): Descripción para mostrar.
+            lane (str): LANE_QUICK o LANE_HEAVY.
+            on_done (Callable, optional): Recibe el Job al terminar (bien,
+                con error o cancelado). Se llama desde el hilo del trabajo.
+
+        Returns:
+            Job: El trabajo encolado.
+
+        Raises:
+            ValueError: Si el carril no existe.
+            RuntimeError: Si el planificador ya se cerró.
+        """
+        if lane not in LANES:
+            raise ValueError(f"Carril desconocido: '{lane}' (opciones: {', '.join(LANES)}).")
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("El planificador de trabajos está cerrado.")
+            job = Job(next(self._ids), name, lane, fn, on_done, self)
+            self._queues[lane].append(job)
+            if not self._threads:
+                for index in range(self.workers):
+                    thread = threading.Thread(target=self._run, name=f"JobScheduler-{index}", daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+            self._cond.notify_all()
+        return job
+
+    def jobs(self) -> List[Job]:
+        """Trabajos en curso y pendientes, por carril y en orden de llegada."""
+        with self._cond:
+            return [job for lane in LANES for job in self._running[lane] + list(self._queues[lane])]
+
+    def cancel_all(self) -> None:
+        """Cancela todos los trabajos pendientes y en curso."""
+        for job in self.jobs():
+            job.cancel()
+
+    def shutdown(self, cancel: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Cierra el planificador: no acepta más trabajos y los hilos terminan
+        al vaciarse las colas.
+
+        Args:
+            cancel (bool): Cancelar lo pendiente y lo que está corriendo.
+            timeout (float, optional): Cuánto esperar a los hilos en total
+                (0 = no esperar).
+
+        Returns:
+            bool: True si todos los hilos terminaron.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if cancel:
+            self.cancel_all()
+        if timeout == 0:
+            return not any(thread.is_alive() for thread in self._threads)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(thread.is_alive() for thread in self._threads)
+
+    # --- Hilos ---
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    if self._closed and not any(self._queues.values()):
+                        return
+                    self._cond.wait()
+                    job = self._next_job()
+                job.state = JOB_RUNNING
+                self._running[job.lane].append(job)
+
+            try:
+                job.token.raise_if_cancelled()
+                job.result = job._fn(job.token)
+                state = JOB_DONE
+            except OperationCancelled:
+                state = JOB_CANCELLED
+            except Exception as e:
+                job.error = e
+                state = JOB_FAILED
+
+            with self._cond:
+                self._running[job.lane].remove(job)
+                self._cond.notify_all()  # quedó lugar en el carril
+            self._finish(job, state)
+
+    def _next_job(self) -> Optional[Job]:
+        """Saca el próximo trabajo que puede correr (con el lock tomado)."""
+        for lane in LANES:
+            if self._queues[lane] and len(self._running[lane]) < self.lane_limits[lane]:
+                return self._queues[lane].popleft()
+        return None
+
+    def _discard_pending(self, job: Job) -> None:
+        with self._cond:
+            try:
+                self._queues[job.lane].remove(job)
+            except ValueError:
+                return  # ya empezó o terminó
+            self._cond.notify_all()
+        self._finish(job, JOB_CANCELLED)
+
+    @staticmethod
+    def _finish(job: Job, state: str) -> None:
+        job.state = state
+        if job._on_done is not None:
+            try:
+                job._on_done(job)
+            except Exception as e:
+                print(f"Error al avisar el fin del trabajo '{job.name}': {e}")
+        job._finished.set()
@@ -0,0 +1,86 @@
+# src/core/metrics.py
+import time
+from typing import Any, Callable, Dict, List, Optional
+from src.core.interfaces import IMetricsSink
+
+
+class ThroughputMeter(IMetricsSink):
+    """
+    Acumula los eventos "file" de una fusión y calcula el ritmo (páginas y
+    MB por segundo) y el tiempo restante estimado.
+
+    La estimación supone que los archivos que faltan cuestan, en promedio,
+    lo mismo que los ya procesados.
+    """
+
+    def __init__(self, total_files: int = 0, clock: Callable[[], float] = time.perf_counter):
+        """
+        Args:
+            total_files (int): Archivos esperados (se actualiza con "merge_start").
+            clock (Callable): Reloj en segundos (reemplazable en los tests).
+        """
+        self.clock = clock
+        self.total_files = total_files
+        self.files = 0
+        self.pages = 0
+        self.bytes = 0
+        self.started = clock()
+
+    def record(self, event: str, fields: Dict[str, Any]) -> None:
+        if event == "merge_start":
+            self.total_files = fields.get("files", self.total_files)
+            self.files = self.pages = self.bytes = 0
+            self.started = self.clock()
+        elif event == "file":
+            self.files += 1
+            self.pages += fields.get("pages", 0)
+            self.bytes += fields.get("bytes", 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: files, total_files, pages, bytes, seconds,
+                pages_per_second, mb_per_second y eta_seconds (None mientras
+                no haya ningún archivo procesado).
+        """
+        seconds = self.clock() - self.started
+        eta = None
+        if self.files:
+            eta = max(0, self.total_files - self.files) * seconds / self.files
+        return {
+            "files": self.files,
+            "total_files": self.total_files,
+            "pages": self.pages,
+            "bytes": self.bytes,
+            "seconds": seconds,
+            "pages_per_second": self.pages / seconds if seconds > 0 else 0.0,
+            "mb_per_second": self.bytes / 1024 / 1024 / seconds if seconds > 0 else 0.0,
+            "eta_seconds": eta,
+        }
+
+
+class MetricsFanout(IMetricsSink):
+    """
+    Reenvía cada evento a varios destinos. Un destino que falla se informa
+    y se ignora: las métricas nunca interrumpen una fusión.
+    """
+
+    def __init__(self, sinks: List[Optional[IMetricsSink]]):
+        self.sinks = [sink for sink in sinks if sink is not None]
+
+    def record(self, event: str, fields: Dict[str, Any]) -> None:
+        for sink in self.sinks:
+            try:
+                sink.record(event, fields)
+            except Exception as e:
+                print(f"Error al registrar la métrica '{event}': {e}")
+
+
+def format_throughput(snapshot: Dict[str, Any]) -> str:
+    """Texto corto para la interfaz: "120 pág/s · 3.4 MB/s · faltan 12 s"."""
+    text = f"{snapshot['pages_per_second']:.0f} pág/s · {snapshot['mb_per_second']:.1f} MB/s"
+    eta = snapshot.get("eta_seconds")
+    if eta is not None:
+        minutes, seconds = divmod(int(round(eta)), 60)
+        text += f" · faltan {minutes} min {seconds:02d} s" if minutes else f" · faltan {seconds} s"
+    return text
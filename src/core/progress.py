@@ -0,0 +1,162 @@
+# src/core/progress.py
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from src.core.entities import ProgressUpdate
+from src.core.metrics import ThroughputMeter
+
+# Entregas por segundo como mucho: más de lo que se nota a simple vista
+DEFAULT_MAX_HZ = 30.0
+
+
+class ProgressChannel:
+    """
+    Lleva el progreso de un trabajo largo desde sus hilos hasta la interfaz.
+
+    Los hilos informan cuanto quieran (`update` solo guarda el último
+    estado, bajo un lock); quien muestra el progreso lo retira con `poll`,
+    que entrega únicamente el estado más reciente y como mucho `max_hz`
+    veces por segundo. Así una fusión de miles de archivos no llena el
+    bucle de Tk con una llamada por archivo.
+
+    Con `wakeup`, el canal avisa cuándo conviene volver a llamar a `poll`:
+    una sola vez por entrega, con la espera que falte para respetar el
+    límite (en la GUI, `lambda delay: app.after(int(delay * 1000), drenar)`).
+    `start` y `finish` no esperan: el final siempre se entrega enseguida.
+
+    Sirve para cualquier trabajo con avance (actual, total): el canal se
+    puede pasar directamente como `on_progress`.
+    """
+
+    def __init__(self, max_hz: float = DEFAULT_MAX_HZ,
+                 wakeup: Optional[Callable[[float], None]] = None,
+                 meter: Optional[ThroughputMeter] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_hz (float): Entregas por segundo como mucho.
+            wakeup (Callable, optional): Recibe la espera en segundos hasta
+                el próximo `poll` útil. Se llama desde el hilo que informa.
+            meter (ThroughputMeter, optional): Si está, cada entrega lleva
+                su `snapshot()` (páginas y MB por segundo, ETA de la fusión).
+                Se calcula al entregar, no en cada `update`.
+            clock (Callable): Reloj en segundos (reemplazable en los tests).
+
+        Raises:
+            ValueError: Si `max_hz` no es positivo.
+        """
+        if max_hz <= 0:
+            raise ValueError("La frecuencia máxima de progreso debe ser positiva.")
+        self.min_interval = 1.0 / max_hz
+        self.wakeup = wakeup
+        self.meter = meter
+        self.clock = clock
+        self.updates = 0
+        self.delivered = 0
+        self._lock = threading.Lock()
+        self._current = 0
+        self._total = 0
+        self._message = ""
+        self._fields: Dict[str, Any] = {}
+        self._done = False
+        self._ok = True
+        self._started = clock()
+        self._last_delivery: Optional[float] = None
+        self._dirty = False
+        self._urgent = False
+        self._wakeup_pending = False
+
+    # --- Lado del trabajo (cualquier hilo) ---
+
+    def start(self, total: int = 0, message: str = "", **fields) -> None:
+        """Reinicia el canal para un trabajo nuevo de `total` unidades."""
+        with self._lock:
+            self._current, self._total, self._message = 0, total, message
+            self._fields = dict(fields)
+            self._done, self._ok = False, True
+            self._started = self.clock()
+        self._changed(urgent=True)
+
+    def update(self, current: Optional[int] = None, total: Optional[int] = None,
+               message: Optional[str] = None, **fields) -> None:
+        """Informa el avance; lo que no se pasa conserva su valor anterior."""
+        with self._lock:
+            if current is not None:
+                self._current = current
+            if total is not None:
+                self._total = total
+            if message is not None:
+                self._message = message
+            self._fields.update(fields)
+        self._changed(urgent=False)
+
+    def __call__(self, current: int, total: int) -> None:
+        """Permite usar el canal como callback `on_progress(actual, total)`."""
+        self.update(current, total)
+
+    def finish(self, message: str = "", ok: bool = True, **fields) -> None:
+        """Marca el fin del trabajo (bien o mal); se entrega sin esperar."""
+        with self._lock:
+            self._message = message
+            self._fields.update(fields)
+            self._done, self._ok = True, ok
+        self._changed(urgent=True)
+
+    # --- Lado de la interfaz ---
+
+    def poll(self) -> Optional[ProgressUpdate]:
+        """
+        Devuelve el último estado si cambió desde la entrega anterior y ya
+        pasó el intervalo mínimo (o es el inicio o el final); si no, None.
+        """
+        rearm = None
+        with self._lock:
+            self._wakeup_pending = False
+            if not self._dirty:
+                return None
+            now = self.clock()
+            if (not self._urgent and self._last_delivery is not None
+                    and now - self._last_delivery < self.min_interval):
+                rearm = self._last_delivery + self.min_interval - now
+                self._wakeup_pending = self.wakeup is not None
+                update = None
+            else:
+                self._dirty = self._urgent = False
+                self._last_delivery = now
+                self.delivered += 1
+                update = self._snapshot(now)
+        if rearm is not None and self.wakeup is not None:
+            self.wakeup(rearm)
+        return update
+
+    def _changed(self, urgent: bool) -> None:
+        with self._lock:
+            self.updates += 1
+            self._dirty = True
+            self._urgent = self._urgent or urgent
+            if self.wakeup is None or self._wakeup_pending:
+                return
+            self._wakeup_pending = True
+            delay = 0.0
+            if not self._urgent and self._last_delivery is not None:
+                delay = max(0.0, self._last_delivery + self.min_interval - self.clock())
+        self.wakeup(delay)
+
+    def _snapshot(self, now: float) -> ProgressUpdate:
+        seconds = now - self._started
+        rate = self._current / seconds if seconds > 0 else 0.0
+        eta = None
+        if self._current and self._total and rate > 0:
+            eta = max(0, self._total - self._current) / rate
+        return ProgressUpdate(
+            current=self._current,
+            total=self._total,
+            message=self._message,
+            seconds=seconds,
+            items_per_second=rate,
+            eta_seconds=eta,
+            done=self._done,
+            ok=self._ok,
+            fields=dict(self._fields),
+            throughput=self.meter.snapshot() if self.meter is not None else None,
+        )
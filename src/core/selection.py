@@ -0,0 +1,188 @@
+# src/core/selection.py
+from typing import Callable, Dict, Hashable, Iterable, List, Set, Tuple, Union
+
+# Una entrada de selección: una ruta sola (1 copia) o un par (ruta, copias)
+SelectionEntry = Union[str, Tuple[str, int]]
+
+
+def normalize_selection(entries: List[SelectionEntry]) -> List[Tuple[str, int]]:
+    """
+    Convierte una selección en una lista de pares (ruta, copias).
+
+    Args:
+        entries (List[SelectionEntry]): Rutas sueltas o pares (ruta, copias).
+
+    Returns:
+        List[Tuple[str, int]]: Un par por entrada, en el mismo orden.
+
+    Raises:
+        ValueError: Si alguna entrada pide menos de una copia.
+    """
+    normalized = []
+    for entry in entries:
+        if isinstance(entry, (tuple, list)):
+            path, copies = entry
+        else:
+            path, copies = entry, 1
+        if not isinstance(copies, int) or copies < 1:
+            raise ValueError(f"La cantidad de copias de '{path}' debe ser un entero mayor a 0.")
+        normalized.append((str(path), copies))
+    return normalized
+
+
+class SelectionModel:
+    """
+    Estado de selección de etiquetas, independiente de la interfaz.
+
+    Lleva la cuenta de seleccionadas por categoría de forma incremental,
+    así marcar o desmarcar una etiqueta, consultar el total o saber si una
+    categoría está completa cuesta O(1). Las operaciones masivas (toda una
+    categoría, limpiar todo) avisan a los observadores una sola vez.
+
+    Los elementos pueden ser cualquier valor hashable y ordenable (rutas).
+    """
+
+    def __init__(self):
+        self._members: Dict[str, Set[Hashable]] = {}
+        self._category_of: Dict[Hashable, str] = {}
+        self._selected: Dict[str, Set[Hashable]] = {}
+        self._total = 0
+        self._listeners: List[Callable[["SelectionModel"], None]] = []
+
+    # --- Observadores ---
+
+    def subscribe(self, listener: Callable[["SelectionModel"], None]) -> None:
+        """Registra una función que se llama con el modelo tras cada cambio."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[["SelectionModel"], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self) -> None:
+        for listener in list(self._listeners):
+            listener(self)
+
+    # --- Catálogo ---
+
+    def set_categories(self, catalog: Dict[str, Iterable[Hashable]]) -> None:
+        """
+        Reemplaza las categorías conocidas conservando la selección de los
+        elementos que siguen existiendo.
+        """
+        previous = [item for selected in self._selected.values() for item in selected]
+        self._members = {category: set(items) for category, items in catalog.items()}
+        self._category_of = {
+            item: category for category, items in self._members.items() for item in items
+        }
+        self._selected = {}
+        self._total = 0
+        for item in previous:
+            category = self._category_of.get(item)
+            if category is not None:
+                self._selected.setdefault(category, set()).add(item)
+                self._total += 1
+        self._notify()
+
+    def add_item(self, category: str, item: Hashable) -> None:
+        """Da de alta un elemento (sin seleccionar)."""
+        if item in self._category_of:
+            return
+        self._members.setdefault(category, set()).add(item)
+        self._category_of[item] = category
+        self._notify()
+
+    def remove_item(self, item: Hashable) -> None:
+        """Da de baja un elemento, quitándolo también de la selección."""
+        category = self._category_of.pop(item, None)
+        if category is None:
+            return
+        self._members[category].discard(item)
+        if not self._members[category]:
+            del self._members[category]
+        self._discard(category, item)
+        self._notify()
+
+    # --- Selección ---
+
+    def set_selected(self, item: Hashable, selected: bool) -> None:
+        """Marca o desmarca un elemento. O(1)."""
+        category = self._category_of.get(item)
+        if category is None:
+            return
+        changed = self._add(category, item) if selected else self._discard(category, item)
+        if changed:
+            self._notify()
+
+    def set_category_selected(self, category: str, selected: bool) -> None:
+        """Marca o desmarca todos los elementos de una categoría de una vez."""
+        members = self._members.get(category)
+        if not members:
+            return
+        before = len(self._selected.get(category, ()))
+        if selected:
+            self._selected[category] = set(members)
+        else:
+            self._selected.pop(category, None)
+        self._total += len(self._selected.get(category, ())) - before
+        self._notify()
+
+    def select_only(self, items: Iterable[Hashable]) -> None:
+        """Deja seleccionados exactamente `items` (los desconocidos se ignoran), avisando una vez."""
+        self._selected = {}
+        self._total = 0
+        for item in items:
+            category = self._category_of.get(item)
+            if category is not None:
+                self._add(category, item)
+        self._notify()
+
+    def clear(self) -> None:
+        """Deselecciona todo."""
+        if self._total == 0:
+            return
+        self._selected.clear()
+        self._total = 0
+        self._notify()
+
+    def is_selected(self, item: Hashable) -> bool:
+        category = self._category_of.get(item)
+        return category is not None and item in self._selected.get(category, ())
+
+    def count(self) -> int:
+        """Total de elementos seleccionados. O(1)."""
+        return self._total
+
+    def category_count(self, category: str) -> int:
+        """Seleccionados dentro de una categoría. O(1)."""
+        return len(self._selected.get(category, ()))
+
+    def is_category_selected(self, category: str) -> bool:
+        """True si todos los elementos de la categoría están seleccionados. O(1)."""
+        members = self._members.get(category)
+        return bool(members) and len(self._selected.get(category, ())) == len(members)
+
+    def selected_items(self) -> List[Hashable]:
+        """Seleccionados ordenados por categoría y luego por elemento."""
+        return [
+            item for category in sorted(self._selected)
+            for item in sorted(self._selected[category])
+        ]
+
+    def _add(self, category: str, item: Hashable) -> bool:
+        selected = self._selected.setdefault(category, set())
+        if item in selected:
+            return False
+        selected.add(item)
+        self._total += 1
+        return True
+
+    def _discard(self, category: str, item: Hashable) -> bool:
+        selected = self._selected.get(category)
+        if not selected or item not in selected:
+            return False
+        selected.discard(item)
+        if not selected:
+            del self._selected[category]
+        self._total -= 1
+        return True
@@ -1,21 +1,40 @@
 # src/core/use_cases.py
-from typing import List, Dict
-from src.core.interfaces import IPdfRepository, IEmailService # <--- MODIFICADO
+import re
+from typing import Callable, List, Dict, Optional
+from src.core.entities import PREFLIGHT_OK, MergePlan, PreflightReport
+from src.core.exceptions import MergeError
+from src.core.interfaces import IPdfRepository, IEmailService, IEmailOutbox, IMetricsSink, IPreflightIndex, IPresetStore # <--- MODIFICADO
+from src.core.jobs import CancellationToken
+from src.core.metrics import MetricsFanout, ThroughputMeter
+from src.core.selection import SelectionEntry, normalize_selection
 from pathlib import Path
 
 def merge_pdfs_use_case(
-    pdf_files: List[str], 
+    pdf_files: List[SelectionEntry], 
     output_path: str, 
     pdf_repository: IPdfRepository,
-    on_progress: callable = None
-) -> None:
+    on_progress: callable = None,
+    metrics: Optional[IMetricsSink] = None,
+    cancel: Optional[CancellationToken] = None
+) -> Optional[Dict]:
     """
     Caso de uso para fusionar múltiples archivos PDF en uno solo.
     
     Args:
-        pdf_files (List[str]): La lista de rutas de archivo a fusionar.
+        pdf_files (List[SelectionEntry]): La lista de rutas de archivo a
+            fusionar, o pares (ruta, copias) para imprimir varias copias.
         output_path (str): La ruta del archivo de salida.
         pdf_repository (IPdfRepository): Una implementación de IPdfRepository.
+        metrics (IMetricsSink, optional): Recibe los eventos de la fusión,
+            enmarcados por "merge_start" y "merge_end" (con el ritmo total).
+        cancel (CancellationToken, optional): Permite cortar la fusión; la
+            salida anterior queda intacta.
+
+    Returns:
+        Dict, optional: El reporte que devuelve el repositorio.
+
+    Raises:
+        OperationCancelled: Si se canceló antes de terminar.
     """
     if not pdf_files:
         raise ValueError("La lista de archivos PDF no puede estar vacía.")
@@ -23,15 +42,216 @@ def merge_pdfs_use_case(
     if not output_path.lower().endswith('.pdf'):
         raise ValueError("La ruta de salida debe ser un archivo .pdf")
 
-    pdf_repository.merge_pdfs(pdf_file_paths=pdf_files, output_path=output_path, on_progress=on_progress)
+    entries = normalize_selection(pdf_files)
+
+    return _measured(
+        lambda sink: pdf_repository.merge_pdfs(pdf_file_paths=pdf_files, output_path=output_path,
+                                               on_progress=on_progress, metrics=sink, cancel=cancel),
+        len(entries), output_path, metrics
+    )
+
+
+def _measured(run: Callable[[Optional[IMetricsSink]], Optional[Dict]], files: int,
+              output_path: str, metrics: Optional[IMetricsSink]) -> Optional[Dict]:
+    """Llama a `run` con las métricas enmarcadas por "merge_start" y "merge_end"."""
+    if metrics is None:
+        return run(None)
+
+    meter = ThroughputMeter()
+    sink = MetricsFanout([meter, metrics])
+    sink.record("merge_start", {"files": files, "output": output_path})
+    try:
+        report = run(sink)
+    except Exception as e:
+        sink.record("merge_end", {**_totals(meter), "ok": False, "error": str(e)})
+        raise
+    sink.record("merge_end", {**_totals(meter), "ok": True})
+    return report
+
+
+def _totals(meter: ThroughputMeter) -> Dict:
+    snapshot = meter.snapshot()
+    del snapshot["eta_seconds"], snapshot["total_files"]
+    return snapshot
+
+
+# Qué hacer con las etiquetas que no pasan la validación previa
+PREFLIGHT_POLICIES = ("fail", "skip", "repair")
+
+
+def preflight_pdfs_use_case(
+    pdf_files: List[SelectionEntry],
+    preflight: IPreflightIndex,
+    on_invalid: str = "fail",
+    on_progress: callable = None
+) -> PreflightReport:
+    """
+    Caso de uso para validar una selección antes de fusionarla.
+
+    Una etiqueta con contraseña, vacía, ilegible o borrada se detecta acá,
+    antes de abrir ningún archivo de la fusión, en lugar de cortarla a
+    mitad de camino.
+
+    Args:
+        pdf_files (List[SelectionEntry]): Rutas o pares (ruta, copias).
+        preflight (IPreflightIndex): Una implementación de IPreflightIndex.
+        on_invalid (str): "fail" (error si alguna no se puede usar; las que
+            solo necesitan reparación se reparan al abrirlas), "skip"
+            (omitir las inutilizables y las que necesitan reparación) o
+            "repair" (omitir solo las inutilizables).
+        on_progress (callable, optional): Callback (validadas, a_validar).
+
+    Returns:
+        PreflightReport: La selección a fusionar y lo que se omitió.
+
+    Raises:
+        ValueError: Si la política no es válida o no queda nada para fusionar.
+        MergeError: Con "fail", si alguna etiqueta no se puede usar.
+    """
+    if on_invalid not in PREFLIGHT_POLICIES:
+        raise ValueError(
+            f"Política inválida: '{on_invalid}' (opciones: {', '.join(PREFLIGHT_POLICIES)})."
+        )
+    entries = normalize_selection(pdf_files)
+    results = preflight.validate(list(dict.fromkeys(path for path, _ in entries)), on_progress)
+
+    unusable = {key: r for key, r in results.items() if not r.usable}
+    needs_repair = {key: r for key, r in results.items() if r.usable and r.status != PREFLIGHT_OK}
+    if unusable and on_invalid == "fail":
+        raise MergeError(
+            f"{len(unusable)} etiqueta(s) no se pueden fusionar:\n"
+            + "\n".join(f"- {Path(r.path).name}: {r.detail or r.status}" for r in unusable.values())
+        )
+
+    skipped = {**unusable, **(needs_repair if on_invalid == "skip" else {})}
+    kept = [(path, copies) for path, copies in entries if path not in skipped]
+    if not kept:
+        raise ValueError("Ninguna de las etiquetas seleccionadas se puede fusionar.")
+
+    return PreflightReport(
+        # Pares (ruta, copias) solo cuando hay más de una copia
+        entries=[path if copies == 1 else (path, copies) for path, copies in kept],
+        skipped=list(skipped.values()),
+        repaired=[] if on_invalid == "skip" else list(needs_repair.values()),
+        total_pages=sum(results[path].page_count * copies for path, copies in kept),
+    )
+
+
+def plan_preset_use_case(
+    name: str,
+    preset_store: IPresetStore,
+    on_invalid: str = "fail"
+) -> MergePlan:
+    """
+    Caso de uso para obtener el plan de fusión de un preset.
+
+    El plan ya trae las rutas resueltas y validadas, así que la fusión
+    puede empezar sin recorrer carpetas ni volver a validar.
+
+    Args:
+        name (str): Nombre del preset.
+        preset_store (IPresetStore): Una implementación de IPresetStore.
+        on_invalid (str): Como en `preflight_pdfs_use_case`. Un plan ya
+            omite las etiquetas inutilizables, así que "skip" y "repair"
+            lo usan tal cual (las dañadas se reparan al abrirlas); "fail"
+            lo rechaza si omitió alguna.
+
+    Returns:
+        MergePlan: El plan, posiblemente tomado del caché.
+
+    Raises:
+        ValueError: Si la política no es válida, el preset no existe o no
+            queda nada para fusionar.
+        MergeError: Con "fail", si alguna etiqueta no se puede usar.
+    """
+    if on_invalid not in PREFLIGHT_POLICIES:
+        raise ValueError(
+            f"Política inválida: '{on_invalid}' (opciones: {', '.join(PREFLIGHT_POLICIES)})."
+        )
+    plan = preset_store.compile_plan(name)
+    if plan.skipped and on_invalid == "fail":
+        raise MergeError(
+            f"{len(plan.skipped)} etiqueta(s) del preset '{name}' no se pueden fusionar:\n"
+            + "\n".join(f"- {Path(r.path).name}: {r.detail or r.status}" for r in plan.skipped)
+        )
+    if not plan.entries:
+        raise ValueError(f"Ninguna etiqueta del preset '{name}' se puede fusionar.")
+    return plan
+
+
+def impose_pdfs_use_case(
+    pdf_files: List[SelectionEntry],
+    output_path: str,
+    pdf_repository: IPdfRepository,
+    columns: int,
+    rows: int,
+    paper_size: str = "a4",
+    margin: float = 18,
+    gap: float = 6,
+    on_progress: callable = None,
+    metrics: Optional[IMetricsSink] = None,
+    cancel: Optional[CancellationToken] = None
+) -> Optional[Dict]:
+    """
+    Caso de uso para imprimir varias etiquetas por hoja (por ejemplo 2x4 en A4).
+
+    Args:
+        pdf_files (List[SelectionEntry]): Las rutas a acomodar o pares (ruta, copias).
+        output_path (str): La ruta del archivo de salida.
+        pdf_repository (IPdfRepository): Una implementación de IPdfRepository.
+        columns (int): Etiquetas por fila.
+        rows (int): Filas por hoja.
+        paper_size (str): Tamaño de la hoja.
+        margin (float): Margen de la hoja, en puntos.
+        gap (float): Separación entre celdas, en puntos.
+        metrics (IMetricsSink, optional): Como en `merge_pdfs_use_case`.
+        cancel (CancellationToken, optional): Permite cortar la imposición;
+            la salida anterior queda intacta.
+
+    Returns:
+        Dict, optional: El reporte que devuelve el repositorio.
+
+    Raises:
+        OperationCancelled: Si se canceló antes de terminar.
+    """
+    if not pdf_files:
+        raise ValueError("La lista de archivos PDF no puede estar vacía.")
+
+    if not output_path.lower().endswith('.pdf'):
+        raise ValueError("La ruta de salida debe ser un archivo .pdf")
+
+    if columns < 1 or rows < 1:
+        raise ValueError("La grilla debe tener al menos una fila y una columna.")
+
+    if margin < 0 or gap < 0:
+        raise ValueError("El margen y la separación no pueden ser negativos.")
+
+    entries = normalize_selection(pdf_files)
+
+    return _measured(
+        lambda sink: pdf_repository.impose_pdfs(
+            pdf_file_paths=pdf_files,
+            output_path=output_path,
+            columns=columns,
+            rows=rows,
+            paper_size=paper_size,
+            margin=margin,
+            gap=gap,
+            on_progress=on_progress,
+            metrics=sink,
+            cancel=cancel
+        ),
+        len(entries), output_path, metrics
+    )
 
 
 # --- NUEVO CASO DE USO ---
 def send_pdf_by_email_use_case(
     config: Dict[str, str],
     pdf_path: str,
-    email_service: IEmailService
-) -> None:
+    email_service: IEmailService,
+    cancel: Optional[CancellationToken] = None
+) -> Optional[Dict]:
     """
     Caso de uso para enviar un PDF por email.
     
@@ -42,10 +262,50 @@ def send_pdf_by_email_use_case(
         config (Dict[str, str]): Diccionario de configuración del email.
         pdf_path (str): Ruta al PDF que se debe adjuntar.
         email_service (IEmailService): Una implementación de IEmailService.
+        cancel (CancellationToken, optional): Permite cortar el envío.
+
+    Returns:
+        Dict, optional: Reporte del envío, si el servicio lo lleva.
         
     Raises:
         ValueError: Si la configuración está incompleta o el archivo no existe.
+        OperationCancelled: Si se canceló antes de terminar.
+    """
+    # Validar el archivo y la configuración antes de tocar la red
+    _validate_email_request(config, pdf_path)
+
+    # Delegar el trabajo técnico al servicio de infraestructura
+    return email_service.send_email_with_attachment(config, pdf_path, cancel=cancel)
+
+
+def queue_pdf_email_use_case(
+    config: Dict[str, str],
+    pdf_path: str,
+    email_outbox: IEmailOutbox
+) -> List[str]:
+    """
+    Caso de uso para encolar el envío de un PDF por email.
+
+    Valida lo mismo que `send_pdf_by_email_use_case`, pero vuelve de
+    inmediato: el envío y sus reintentos quedan a cargo de la cola.
+
+    Args:
+        config (Dict[str, str]): Diccionario de configuración del email.
+        pdf_path (str): Ruta al PDF que se debe adjuntar.
+        email_outbox (IEmailOutbox): Una implementación de IEmailOutbox.
+
+    Returns:
+        List[str]: Identificadores de los envíos encolados.
+
+    Raises:
+        ValueError: Si la configuración está incompleta, no hay ningún
+            destinatario o el archivo no existe.
     """
+    _validate_email_request(config, pdf_path)
+    return email_outbox.enqueue(config, pdf_path)
+
+
+def _validate_email_request(config: Dict[str, str], pdf_path: str) -> None:
     # 1. Validar que el archivo PDF exista
     if not Path(pdf_path).exists():
         raise ValueError(f"El archivo PDF no se encontró en: {pdf_path}")
@@ -55,5 +315,6 @@ def send_pdf_by_email_use_case(
     if not all(key in config and config[key] for key in required_keys):
         raise ValueError("La configuración de email (config.ini) está incompleta.")
 
-    # 3. Delegar el trabajo técnico al servicio de infraestructura
-    email_service.send_email_with_attachment(config, pdf_path)
\ No newline at end of file
+    # 3. Validar que haya al menos una dirección (", ;" solos no cuentan)
+    if not any(re.split(r"[,;\s]+", config['EMAIL_RECEPTOR'])):
+        raise ValueError("No hay destinatarios en EMAIL_RECEPTOR.")
\ No newline at end of file
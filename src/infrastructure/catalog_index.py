@@ -0,0 +1,213 @@
+# src/infrastructure/catalog_index.py
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.core.entities import LabelInfo
+from src.core.interfaces import ILabelCatalog
+from src.infrastructure.merge_manifest import file_sha256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS labels (
+    path TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    page_count INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS labels_by_category ON labels (category, name);
+"""
+
+
+def _page_count(pdf_path: str) -> int:
+    """Cuenta las páginas de un PDF; 0 si no se puede abrir."""
+    # Import diferido: PyMuPDF tarda en cargar y un índice al día no lo necesita
+    import fitz  # PyMuPDF
+    try:
+        with fitz.open(pdf_path) as doc:
+            return doc.page_count
+    except Exception:
+        return 0
+
+
+def _is_category(entry: os.DirEntry) -> bool:
+    # Las carpetas ocultas (".algo") son internas y no son categorías
+    return entry.is_dir() and not entry.name.startswith(".")
+
+
+def _is_label(entry: os.DirEntry) -> bool:
+    return entry.is_file() and entry.name.lower().endswith(".pdf")
+
+
+class SQLiteCatalogIndex(ILabelCatalog):
+    """
+    Índice persistente del catálogo `_ETIQUETAS_PDFS` guardado en SQLite.
+
+    Guarda por etiqueta: categoría, ruta, tamaño, mtime, páginas y hash.
+    Un refresco solo lista de nuevo las carpetas cuyo mtime cambió (es lo
+    que ocurre al agregar, quitar o renombrar archivos); el resto de las
+    categorías se leen directamente del índice, sin tocar el disco. Esto
+    mantiene el arranque y el "Refrescar Lista" en pocos milisegundos
+    aun en recursos de red con miles de etiquetas.
+    """
+
+    def __init__(self, input_dir: Path, index_path: Path):
+        """
+        Args:
+            input_dir (Path): Carpeta raíz con una subcarpeta por categoría.
+            index_path (Path): Archivo SQLite donde se persiste el índice.
+        """
+        self.input_dir = Path(input_dir)
+        self.index_path = Path(index_path)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def refresh(self, full: bool = False) -> Dict[str, List[LabelInfo]]:
+        """
+        Sincroniza el índice con el disco y devuelve el catálogo.
+
+        Args:
+            full (bool): Si es True, revisa el `stat` de cada archivo aunque
+                su carpeta no haya cambiado (detecta ediciones en el lugar).
+        """
+        with self._lock, self._connect() as conn:
+            known_dirs = dict(conn.execute("SELECT path, mtime_ns FROM dirs"))
+            root = str(self.input_dir)
+
+            try:
+                root_mtime = os.stat(root).st_mtime_ns
+            except OSError:
+                conn.execute("DELETE FROM dirs")
+                conn.execute("DELETE FROM labels")
+                return {}
+
+            if full or known_dirs.get(root) != root_mtime:
+                with os.scandir(root) as it:
+                    categories = {e.name for e in it if _is_category(e)}
+                conn.execute(
+                    "INSERT OR REPLACE INTO dirs (path, mtime_ns) VALUES (?, ?)", (root, root_mtime)
+                )
+            else:
+                categories = {
+                    os.path.basename(path) for path in known_dirs if path != root
+                }
+
+            # Categorías que ya no existen
+            for path in known_dirs:
+                if path != root and os.path.basename(path) not in categories:
+                    conn.execute("DELETE FROM dirs WHERE path = ?", (path,))
+                    conn.execute(
+                        "DELETE FROM labels WHERE category = ?", (os.path.basename(path),)
+                    )
+
+            for category in categories:
+                self._refresh_category(conn, category, known_dirs, full)
+
+            return self._load(conn)
+
+    def refresh_category(self, category: str) -> List[LabelInfo]:
+        """
+        Revisa el `stat` de cada archivo de una categoría, sin importar el
+        mtime de su carpeta. Es lo que usa el observador cuando el sistema
+        operativo avisa de un cambio puntual.
+        """
+        category_dir = os.path.join(str(self.input_dir), category)
+        with self._lock, self._connect() as conn:
+            if not os.path.isdir(category_dir):
+                conn.execute("DELETE FROM dirs WHERE path = ?", (category_dir,))
+                conn.execute("DELETE FROM labels WHERE category = ?", (category,))
+                return []
+            self._refresh_category(conn, category, {}, full=True)
+            return [
+                LabelInfo(*row) for row in conn.execute(
+                    "SELECT category, path, size, mtime_ns, page_count, content_hash "
+                    "FROM labels WHERE category = ? ORDER BY name", (category,)
+                )
+            ]
+
+    def lookup(self, pdf_path: str) -> Optional[LabelInfo]:
+        """Devuelve la información indexada de una etiqueta, si existe."""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT category, path, size, mtime_ns, page_count, content_hash "
+                "FROM labels WHERE path = ?", (os.path.abspath(pdf_path),)
+            ).fetchone()
+        return LabelInfo(*row) if row else None
+
+    def _refresh_category(self, conn: sqlite3.Connection, category: str,
+                          known_dirs: Dict[str, int], full: bool) -> None:
+        """Re-lista una categoría solo si su carpeta cambió (o si `full`)."""
+        category_dir = os.path.join(str(self.input_dir), category)
+        try:
+            dir_mtime = os.stat(category_dir).st_mtime_ns
+        except OSError:
+            return
+        if not full and known_dirs.get(category_dir) == dir_mtime:
+            return
+
+        indexed: Dict[str, Tuple[int, int]] = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in conn.execute(
+                "SELECT path, size, mtime_ns FROM labels WHERE category = ?", (category,)
+            )
+        }
+
+        seen = set()
+        with os.scandir(category_dir) as it:
+            for entry in it:
+                if not _is_label(entry):
+                    continue
+                path = os.path.abspath(entry.path)
+                seen.add(path)
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if indexed.get(path) == (st.st_size, st.st_mtime_ns):
+                    continue
+                conn.execute(
+                    "INSERT OR REPLACE INTO labels "
+                    "(path, category, name, size, mtime_ns, page_count, content_hash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (path, category, entry.name, st.st_size, st.st_mtime_ns,
+                     _page_count(path), file_sha256(path))
+                )
+
+        for path in indexed.keys() - seen:
+            conn.execute("DELETE FROM labels WHERE path = ?", (path,))
+
+        conn.execute(
+            "INSERT OR REPLACE INTO dirs (path, mtime_ns) VALUES (?, ?)", (category_dir, dir_mtime)
+        )
+
+    @staticmethod
+    def _load(conn: sqlite3.Connection) -> Dict[str, List[LabelInfo]]:
+        catalog: Dict[str, List[LabelInfo]] = {}
+        rows = conn.execute(
+            "SELECT category, path, size, mtime_ns, page_count, content_hash "
+            "FROM labels ORDER BY category, name"
+        )
+        for row in rows:
+            catalog.setdefault(row[0], []).append(LabelInfo(*row))
+        return catalog
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Abre una conexión, confirma la transacción al salir y la cierra."""
+        conn = sqlite3.connect(self.index_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
@@ -0,0 +1,236 @@
+# src/infrastructure/catalog_watcher.py
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from src.core.entities import CatalogEvent, LabelInfo
+from src.core.interfaces import ICatalogWatcher, ILabelCatalog
+
+# Constantes de <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0)
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def diff_labels(before: Iterable[LabelInfo], after: Iterable[LabelInfo]) -> List[CatalogEvent]:
+    """Compara dos estados del catálogo y devuelve los eventos que los separan."""
+    old = {label.path: label for label in before}
+    new = {label.path: label for label in after}
+    events = []
+    for path in sorted(old.keys() - new.keys()):
+        events.append(CatalogEvent("removed", old[path]))
+    for path in sorted(new.keys() - old.keys()):
+        events.append(CatalogEvent("added", new[path]))
+    for path in sorted(old.keys() & new.keys()):
+        if (old[path].size, old[path].mtime_ns) != (new[path].size, new[path].mtime_ns):
+            events.append(CatalogEvent("modified", new[path]))
+    return events
+
+
+class _Inotify:
+    """Envoltorio mínimo de inotify(7) con ctypes (solo Linux)."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        self.paths_by_wd: Dict[int, str] = {}
+
+    def add_watch(self, path: str) -> None:
+        wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"No se pudo observar '{path}'")
+        self.paths_by_wd[wd] = path
+
+    def read_events(self):
+        """Devuelve [(directorio, máscara, nombre)] de lo que haya pendiente."""
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            path = self.paths_by_wd.get(wd)
+            if mask & IN_IGNORED:
+                self.paths_by_wd.pop(wd, None)
+            events.append((path, mask, name))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class CatalogWatcher(ICatalogWatcher):
+    """
+    Observa `_ETIQUETAS_PDFS` y emite eventos de alta, baja y modificación.
+
+    En Linux usa inotify: cada aviso del kernel marca su categoría como
+    sucia y, tras una breve pausa para agrupar ráfagas (por ejemplo una
+    copia de muchos archivos), solo esa categoría se vuelve a revisar en
+    el índice. En otros sistemas (o si inotify no está disponible) cae a
+    un sondeo periódico que revisa el `stat` de cada archivo: el mtime de
+    una carpeta no cambia cuando se edita una etiqueta en el lugar, así
+    que el atajo por directorio del índice no alcanza para detectarlas.
+    """
+
+    def __init__(self, catalog: ILabelCatalog, poll_interval: float = 2.0,
+                 debounce: float = 0.2, use_inotify: Optional[bool] = None):
+        """
+        Args:
+            catalog (ILabelCatalog): Índice del catálogo a mantener al día.
+            poll_interval (float): Segundos entre sondeos (modo sin inotify).
+            debounce (float): Segundos para agrupar avisos seguidos.
+            use_inotify (bool, optional): Forzar (o evitar) inotify. Por
+                defecto se usa si la plataforma lo soporta.
+        """
+        self.catalog = catalog
+        self.input_dir = str(getattr(catalog, "input_dir", ""))
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.use_inotify = sys.platform.startswith("linux") if use_inotify is None else use_inotify
+        self.backend: Optional[str] = None
+        self._snapshot: Dict[str, List[LabelInfo]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._on_events: Optional[Callable[[List[CatalogEvent]], None]] = None
+        self._listeners: List[Callable[[List[CatalogEvent]], None]] = []
+
+    def start(self, on_events: Callable[[List[CatalogEvent]], None]) -> None:
+        if self._thread is not None:
+            return
+        self._on_events = on_events
+        self._snapshot = self.catalog.refresh()
+        self._stop.clear()
+
+        inotify = None
+        if self.use_inotify and self.input_dir:
+            try:
+                inotify = _Inotify()
+                inotify.add_watch(self.input_dir)
+                for category in os.listdir(self.input_dir):
+                    category_dir = os.path.join(self.input_dir, category)
+                    if os.path.isdir(category_dir) and not category.startswith("."):
+                        inotify.add_watch(category_dir)
+            except (OSError, AttributeError):
+                if inotify is not None:
+                    inotify.close()
+                inotify = None
+
+        if inotify is not None:
+            self.backend = "inotify"
+            target = lambda: self._run_inotify(inotify)
+        else:
+            self.backend = "polling"
+            target = self._run_polling
+
+        self._thread = threading.Thread(target=target, name="CatalogWatcher", daemon=True)
+        self._thread.start()
+
+    def subscribe(self, listener: Callable[[List[CatalogEvent]], None]) -> None:
+        """Registra otro destinatario de los eventos (además del de `start`)."""
+        self._listeners.append(listener)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run_polling(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                current = self.catalog.refresh(full=True)
+            except Exception as e:
+                print(f"Error al sondear el catálogo: {e}")
+                continue
+            events = []
+            for category in self._snapshot.keys() | current.keys():
+                events += diff_labels(self._snapshot.get(category, []), current.get(category, []))
+            self._snapshot = current
+            self._emit(events)
+
+    def _run_inotify(self, inotify: _Inotify) -> None:
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([inotify.fd], [], [], 0.5)
+                if not ready:
+                    continue
+                dirty: Set[str] = set()
+                rescan_all = False
+                # Agrupar la ráfaga antes de tocar el índice
+                while True:
+                    for directory, mask, name in inotify.read_events():
+                        if mask & IN_Q_OVERFLOW or directory is None:
+                            rescan_all = True
+                        elif directory == self.input_dir:
+                            if mask & IN_ISDIR and not name.startswith("."):
+                                dirty.add(name)
+                                if mask & (IN_CREATE | IN_MOVED_TO):
+                                    try:
+                                        inotify.add_watch(os.path.join(directory, name))
+                                    except OSError:
+                                        pass
+                        else:
+                            dirty.add(os.path.basename(directory))
+                    ready, _, _ = select.select([inotify.fd], [], [], self.debounce)
+                    if not ready or self._stop.is_set():
+                        break
+
+                if rescan_all:
+                    dirty |= set(self._snapshot) | {
+                        name for name in os.listdir(self.input_dir)
+                        if os.path.isdir(os.path.join(self.input_dir, name)) and not name.startswith(".")
+                    }
+                self._refresh_categories(dirty)
+        finally:
+            inotify.close()
+
+    def _refresh_categories(self, categories: Set[str]) -> None:
+        events = []
+        for category in sorted(categories):
+            try:
+                labels = self.catalog.refresh_category(category)
+            except Exception as e:
+                print(f"Error al actualizar la categoría '{category}': {e}")
+                continue
+            events += diff_labels(self._snapshot.get(category, []), labels)
+            if labels:
+                self._snapshot[category] = labels
+            else:
+                self._snapshot.pop(category, None)
+        self._emit(events)
+
+    def _emit(self, events: List[CatalogEvent]) -> None:
+        if not events:
+            return
+        for listener in [self._on_events] + self._listeners:
+            if listener is None:
+                continue
+            try:
+                listener(events)
+            except Exception as e:
+                print(f"Error al notificar cambios del catálogo: {e}")
@@ -0,0 +1,287 @@
+# src/infrastructure/category_bundles.py
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+BUNDLES_DIR_NAME = ".bundles"  # oculta: el catálogo ignora las carpetas con punto
+MANIFEST_VERSION = 1
+
+
+def build_bundle(member_paths: List[str], bundle_path: str) -> List[int]:
+    """
+    Fusiona las etiquetas de una categoría en un único PDF optimizado.
+
+    Corre en un proceso aparte (PyMuPDF no es seguro entre hilos). Con
+    garbage=4 los recursos que comparten las etiquetas (fuentes, logos) se
+    guardan una sola vez.
+
+    Returns:
+        List[int]: Páginas de cada etiqueta, en orden.
+    """
+    import fitz  # PyMuPDF
+    pages = []
+    tmp_path = f"{bundle_path}.{os.getpid()}.tmp"
+    with fitz.open() as bundle:
+        for member_path in member_paths:
+            with fitz.open(member_path) as member:
+                pages.append(member.page_count)
+                bundle.insert_pdf(member)
+        bundle.save(tmp_path, garbage=4, deflate=True, deflate_images=True,
+                    deflate_fonts=True, no_new_id=True)
+    os.replace(tmp_path, bundle_path)
+    return pages
+
+
+def _stamp(path: str) -> List[int]:
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+class CategoryBundles:
+    """
+    PDFs pre-fusionados de cada categoría, en `_ETIQUETAS_PDFS/.bundles`.
+
+    Seleccionar una categoría completa es lo más común; con su paquete al
+    día, la fusión abre un archivo en lugar de uno por etiqueta. Cada
+    paquete tiene al lado un JSON con el tamaño, mtime y páginas de sus
+    etiquetas: si alguna cambia, se agrega o se borra, el paquete deja de
+    usarse (la fusión vuelve a los archivos sueltos) y se reconstruye en
+    segundo plano.
+    """
+
+    def __init__(self, input_dir: Path, min_members: int = 8, auto_rebuild: bool = True,
+                 use_processes: bool = True):
+        """
+        Args:
+            input_dir (Path): Carpeta `_ETIQUETAS_PDFS`.
+            min_members (int): Categorías con menos etiquetas no se empaquetan.
+            auto_rebuild (bool): Reconstruir en segundo plano los paquetes
+                vencidos que una fusión no pudo usar.
+            use_processes (bool): Armar los paquetes en un proceso aparte
+                (False solo para los tests: se arman en el hilo que llama).
+        """
+        self.input_dir = os.path.abspath(str(input_dir))
+        self.bundles_dir = os.path.join(self.input_dir, BUNDLES_DIR_NAME)
+        self.min_members = min_members
+        self.auto_rebuild = auto_rebuild
+        self.use_processes = use_processes
+        self.rebuilt = 0
+        self._manifests: Dict[str, Tuple[List[int], Dict]] = {}
+        self._lock = threading.Condition()
+        self._pending: List[str] = []
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[Executor] = None
+        self._closed = False
+
+    # --- Uso desde la fusión ---
+
+    def substitute(self, entries: List[Tuple[str, int]]) -> List[Tuple[Tuple[str, int], Optional[List[int]]]]:
+        """
+        Reemplaza cada tramo que cubre una categoría completa por su paquete.
+
+        Un tramo se reemplaza si son exactamente las etiquetas del paquete,
+        en el mismo orden, con una copia cada una, y ninguna cambió.
+
+        Returns:
+            List: Pares (entrada, páginas). Para un paquete, la entrada es
+                (ruta del paquete, 1) y páginas la lista de páginas de cada
+                etiqueta que reemplaza; para el resto, páginas es None.
+        """
+        normalized = [(os.path.abspath(path), copies) for path, copies in entries]
+        result = []
+        i = 0
+        while i < len(normalized):
+            path, copies = normalized[i]
+            category = self._category_of(path)
+            if category is not None and copies == 1:
+                run = 1
+                while (i + run < len(normalized) and normalized[i + run][1] == 1
+                       and self._category_of(normalized[i + run][0]) == category):
+                    run += 1
+                members = self._fresh_members(category)
+                # Solo dentro del tramo de copias simples: una etiqueta con más
+                # copias en el medio no puede salir del paquete
+                if members is not None and len(members) <= run and [
+                    p for p, _ in normalized[i:i + len(members)]
+                ] == [m["path"] for m in members]:
+                    result.append(((self._bundle_path(category), 1), [m["pages"] for m in members]))
+                    if run > len(members) and self.auto_rebuild:
+                        self.schedule([category])  # hay etiquetas nuevas en la categoría
+                    i += len(members)
+                    continue
+                if run >= self.min_members and self.auto_rebuild:
+                    # Parece la categoría completa, pero el paquete no sirve: se rehace
+                    self.schedule([category])
+            result.append((entries[i], None))
+            i += 1
+        return result
+
+    # --- Reconstrucción ---
+
+    def schedule(self, categories: Iterable[str]) -> None:
+        """Encola categorías para reconstruir en segundo plano (si están vencidas)."""
+        with self._lock:
+            if self._closed:
+                return
+            for category in categories:
+                if category not in self._pending:
+                    self._pending.append(category)
+            if self._thread is None and self._pending:
+                self._thread = threading.Thread(target=self._run, name="CategoryBundles", daemon=True)
+                self._thread.start()
+            self._lock.notify()
+
+    def categories(self) -> List[str]:
+        """Categorías de la carpeta de etiquetas (sin las ocultas)."""
+        return sorted(
+            entry.name for entry in os.scandir(self.input_dir)
+            if entry.is_dir() and not entry.name.startswith(".")
+        )
+
+    def rebuild_stale(self) -> List[str]:
+        """Reconstruye ahora, en este hilo, los paquetes vencidos. Devuelve las categorías rehechas."""
+        return [category for category in self.categories() if self.rebuild(category)]
+
+    def rebuild(self, category: str) -> bool:
+        """
+        Reconstruye el paquete de una categoría si está vencido.
+
+        Returns:
+            bool: True si se armó un paquete nuevo.
+        """
+        category_dir = os.path.join(self.input_dir, category)
+        try:
+            members = sorted(
+                (e.path for e in os.scandir(category_dir)
+                 if e.is_file() and e.name.lower().endswith(".pdf")),
+                key=Path
+            )
+        except OSError:
+            members = []
+        if len(members) < self.min_members:
+            self._remove(category)
+            return False
+
+        current = self._fresh_members(category)
+        if current is not None and [m["path"] for m in current] == members:
+            return False
+
+        # Las marcas se toman antes de leer: un cambio durante el armado lo deja vencido
+        try:
+            stamps = [_stamp(path) for path in members]
+            os.makedirs(self.bundles_dir, exist_ok=True)
+            bundle_path = self._bundle_path(category)
+            if self.use_processes:
+                pages = self._get_pool().submit(build_bundle, members, bundle_path).result()
+            else:
+                pages = build_bundle(members, bundle_path)
+        except Exception as e:
+            print(f"No se pudo armar el paquete de '{category}': {e}")
+            self._remove(category)
+            return False
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "bundle": _stamp(bundle_path),
+            "members": [
+                {"path": path, "size": stamp[0], "mtime_ns": stamp[1], "pages": count}
+                for path, stamp, count in zip(members, stamps, pages)
+            ],
+        }
+        manifest_path = self._manifest_path(category)
+        with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(manifest_path + ".tmp", manifest_path)
+        self.rebuilt += 1
+        print(f"Paquete de '{category}' listo: {len(members)} etiquetas, {sum(pages)} páginas.")
+        return True
+
+    def close(self) -> None:
+        """Descarta lo pendiente y libera el proceso de armado."""
+        with self._lock:
+            self._closed = True
+            self._pending.clear()
+            self._lock.notify_all()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._lock.wait()
+                if self._closed:
+                    return
+                category = self._pending.pop(0)
+            try:
+                self.rebuild(category)
+            except Exception as e:
+                print(f"Error al armar el paquete de '{category}': {e}")
+
+    def _get_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    # --- Manifiestos ---
+
+    def _fresh_members(self, category: str) -> Optional[List[Dict]]:
+        """Etiquetas del paquete de `category`, o None si no existe o alguna cambió."""
+        manifest = self._manifest(category)
+        if manifest is None:
+            return None
+        try:
+            if _stamp(self._bundle_path(category)) != manifest["bundle"]:
+                return None
+            for member in manifest["members"]:
+                if _stamp(member["path"]) != [member["size"], member["mtime_ns"]]:
+                    return None
+        except OSError:
+            return None
+        return manifest["members"]
+
+    def _manifest(self, category: str) -> Optional[Dict]:
+        manifest_path = self._manifest_path(category)
+        try:
+            stamp = _stamp(manifest_path)
+        except OSError:
+            return None
+        cached = self._manifests.get(category)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+        self._manifests[category] = (stamp, manifest)
+        return manifest
+
+    def _remove(self, category: str) -> None:
+        for path in (self._manifest_path(category), self._bundle_path(category)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _category_of(self, pdf_path: str) -> Optional[str]:
+        category_dir = os.path.dirname(pdf_path)
+        if os.path.dirname(category_dir) != self.input_dir:
+            return None
+        category = os.path.basename(category_dir)
+        return None if category.startswith(".") else category
+
+    def _bundle_path(self, category: str) -> str:
+        return os.path.join(self.bundles_dir, f"{category}.pdf")
+
+    def _manifest_path(self, category: str) -> str:
+        return os.path.join(self.bundles_dir, f"{category}.json")
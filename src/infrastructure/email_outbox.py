@@ -0,0 +1,453 @@
+# src/infrastructure/email_outbox.py
+import heapq
+import json
+import os
+import random
+import shutil
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from src.core.exceptions import EmailError, OperationCancelled
+from src.core.interfaces import IEmailOutbox, IEmailService
+from src.core.jobs import CancellationToken
+from src.infrastructure.smtp_email_service import parse_recipients
+
+# Claves de la configuración que se guardan con cada envío (nunca la contraseña)
+_STORED_KEYS = ("EMAIL_EMISOR", "EMAIL_RECEPTOR", "ASUNTO",
+                "SMTP_HOST", "SMTP_PORT", "SMTP_SSL", "SMTP_STARTTLS")
+
+
+def _pid_alive(pid: int) -> bool:
+    """True si el proceso `pid` de esta máquina sigue vivo."""
+    if os.name == "nt":
+        # os.kill(pid, 0) en Windows termina el proceso: se consulta sin tocarlo
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # existe, aunque sea de otro usuario
+    return True
+
+
+class TokenBucket:
+    """
+    Limitador de tasa: `rate` envíos por segundo con ráfagas de hasta
+    `capacity`. `acquire` bloquea hasta que hay un permiso disponible.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop: Optional[threading.Event] = None) -> bool:
+        """Toma un permiso; devuelve False si `stop` se activó mientras esperaba."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if stop is None:
+                time.sleep(wait)
+            elif stop.wait(wait):
+                return False
+
+
+class FileEmailOutbox(IEmailOutbox):
+    """
+    Cola de salida de emails persistida en disco (`_SALIDA/outbox`).
+
+    Cada envío es un JSON en `pending/` con una copia del PDF al lado, así
+    un reinicio no pierde nada y una fusión posterior no cambia lo que ya
+    se encoló. Los envíos se separan por destinatario, para que un
+    reintento no vuelva a mandar a quien ya lo recibió.
+
+    Varios procesos pueden despachar la misma carpeta (la ventana y
+    `cli.py outbox --drain`): antes de enviar, el JSON se mueve con
+    `os.replace` a `in_flight/`, con el proceso dueño en el nombre. Solo
+    uno de los procesos logra moverlo; los demás lo descartan. Si el dueño
+    muere a mitad de un envío, el siguiente que revisa la carpeta lo
+    devuelve a `pending/`.
+
+    Unos pocos hilos despachan los envíos vencidos a través de un
+    IEmailService. Un fallo reprograma el envío con espera exponencial
+    (con algo de azar); agotados los intentos pasa a `failed/`. Un token
+    bucket limita el ritmo para no chocar con las cuotas de Gmail. La
+    contraseña no se guarda: se pide a `secrets` al momento de enviar.
+    """
+
+    def __init__(self, directory: Path, email_service: IEmailService,
+                 secrets: Callable[[], Dict[str, str]],
+                 max_concurrency: int = 2, max_attempts: int = 8,
+                 base_delay: float = 30.0, max_delay: float = 3600.0,
+                 rate_per_minute: float = 20.0, burst: int = 5, keep_sent_days: float = 7,
+                 claim_timeout: float = 3600.0):
+        """
+        Args:
+            directory (Path): Carpeta de la cola (se crea si no existe).
+            email_service (IEmailService): Servicio que hace el envío real.
+            secrets (Callable): Devuelve la configuración vigente; de ahí se
+                toma APP_PASSWORD al enviar.
+            max_concurrency (int): Envíos simultáneos.
+            max_attempts (int): Intentos antes de dar un envío por fallido.
+            base_delay (float): Espera tras el primer fallo, en segundos;
+                se duplica en cada reintento.
+            max_delay (float): Tope de la espera entre reintentos.
+            rate_per_minute (float): Mensajes por minuto como máximo.
+            burst (int): Mensajes que pueden salir seguidos sin esperar.
+            keep_sent_days (float): Días que se conservan los registros de
+                `sent/` (se limpian al crear la cola).
+            claim_timeout (float): Segundos tras los cuales un envío tomado
+                por un proceso de otra máquina se da por abandonado (los de
+                esta máquina se recuperan apenas muere su proceso).
+        """
+        self.directory = Path(directory)
+        self.email_service = email_service
+        self.secrets = secrets
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate_limiter = TokenBucket(rate_per_minute / 60.0, burst)
+        self.claim_timeout = claim_timeout
+        self._host = socket.gethostname().replace("@", "_")
+        self._owner = f"{os.getpid()}@{self._host}"
+
+        for name in ("pending", "in_flight", "sent", "failed"):
+            (self.directory / name).mkdir(parents=True, exist_ok=True)
+
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        # Corta los envíos en curso al detener la cola (vuelven a `pending/`)
+        self._cancel = CancellationToken()
+        self._threads: List[threading.Thread] = []
+        self._queue: List[Tuple[float, float, str]] = []  # (vence, creado, id)
+        self._in_flight = 0
+        self._sent = 0
+        self._failed = len(list((self.directory / "failed").glob("*.json")))
+        self._retries = 0
+        self._sent_times: Deque[float] = deque()
+        self._listeners: List[Callable[[Dict[str, float]], None]] = []
+        self._prune_sent(keep_sent_days)
+        self._recover_claims()
+        self._load_pending()
+
+    # --- IEmailOutbox ---
+
+    def enqueue(self, config: Dict[str, str], file_path: str) -> List[str]:
+        stored = {key: config[key] for key in _STORED_KEYS if config.get(key)}
+        ids = []
+        for recipient in parse_recipients(config.get("EMAIL_RECEPTOR", "")):
+            job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+            # El adjunto se copia con su nombre original en una carpeta propia
+            attachment = Path(job_id) / Path(file_path).name
+            (self._pending_dir / job_id).mkdir()
+            shutil.copyfile(file_path, self._pending_dir / attachment)
+            job = {
+                "id": job_id,
+                "config": {**stored, "EMAIL_RECEPTOR": recipient},
+                "attachment": attachment.as_posix(),
+                "created": time.time(),
+                "attempts": 0,
+                "next_attempt": time.time(),
+                "last_error": None,
+            }
+            self._write_job(self._pending_dir, job)
+            with self._cond:
+                heapq.heappush(self._queue, (job["next_attempt"], job["created"], job_id))
+                self._cond.notify()
+            ids.append(job_id)
+        self._notify()
+        return ids
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            now = time.monotonic()
+            while self._sent_times and now - self._sent_times[0] > 60:
+                self._sent_times.popleft()
+            oldest = min((created for _, created, _ in self._queue), default=None)
+            return {
+                "pending": len(self._queue),
+                "in_flight": self._in_flight,
+                "sent": self._sent,
+                "failed": self._failed,
+                "retries": self._retries,
+                "sent_per_minute": len(self._sent_times),
+                "oldest_pending_seconds": time.time() - oldest if oldest else 0.0,
+            }
+
+    def subscribe(self, listener: Callable[[Dict[str, float]], None]) -> None:
+        self._listeners.append(listener)
+
+    # --- Despacho ---
+
+    def start(self) -> None:
+        """Arranca los hilos que despachan la cola."""
+        if self._threads:
+            return
+        self.rescan()
+        self._stop.clear()
+        self._cancel = CancellationToken()
+        for index in range(self.max_concurrency):
+            thread = threading.Thread(target=self._run, name=f"EmailOutbox-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Detiene el despacho; lo pendiente queda en disco para la próxima vez.
+        Un envío a medio transmitir se corta y queda pendiente, sin contar
+        como intento.
+        """
+        self._stop.set()
+        self._cancel.cancel()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Despacha en este hilo hasta que no queden envíos vencidos.
+
+        Pensado para la línea de comandos y los tests. Devuelve True si la
+        cola quedó vacía (los reintentos programados a futuro no se esperan).
+        """
+        self.rescan()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while deadline is None or time.monotonic() < deadline:
+            job_id = self._take_due(block=False)
+            if job_id is None:
+                break
+            self._process(job_id)
+        return self.stats()["pending"] == 0
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            job_id = self._take_due(block=True)
+            if job_id is not None:
+                self._process(job_id)
+
+    def _take_due(self, block: bool) -> Optional[str]:
+        """Saca de la cola el próximo envío vencido (esperándolo si `block`)."""
+        with self._cond:
+            while not self._stop.is_set():
+                if self._queue:
+                    due = self._queue[0][0] - time.time()
+                    if due <= 0:
+                        _, _, job_id = heapq.heappop(self._queue)
+                        self._in_flight += 1
+                        return job_id
+                    if not block:
+                        return None
+                    self._cond.wait(min(due, 60))
+                elif not block:
+                    return None
+                else:
+                    self._cond.wait()
+        return None
+
+    def _process(self, job_id: str) -> None:
+        """Hace un intento de envío; pase lo que pase, libera su lugar en `in_flight`."""
+        try:
+            self._attempt(job_id)
+        except Exception as e:
+            # Un error al guardar el resultado no debe matar al hilo despachante
+            print(f"Cola de email: error inesperado con el envío '{job_id}': {e}")
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+            self._notify()
+
+    def _attempt(self, job_id: str) -> None:
+        job = self._claim(job_id)
+        if job is None:
+            return
+
+        if not self.rate_limiter.acquire(self._stop):
+            self._release(job)
+            return
+
+        started = time.perf_counter()
+        error = None
+        try:
+            config = {**job["config"], "APP_PASSWORD": self.secrets().get("APP_PASSWORD", "")}
+            self.email_service.send_email_with_attachment(
+                config, str(self._pending_dir / job["attachment"]), cancel=self._cancel
+            )
+        except OperationCancelled:
+            self._release(job)
+            return
+        except EmailError as e:
+            error = str(e)
+        except Exception as e:
+            # PDF dañado al preparar el adjunto, configuración ilegible, etc.
+            error = f"{type(e).__name__}: {e}"
+
+        job["attempts"] += 1
+        if error is None:
+            job["sent_at"] = time.time()
+            job["seconds"] = time.perf_counter() - started
+            self._finish(job, "sent")
+            with self._cond:
+                self._sent += 1
+                self._sent_times.append(time.monotonic())
+            print(f"Cola de email: enviado a {job['config']['EMAIL_RECEPTOR']} "
+                  f"en {job['seconds']:.2f}s (intento {job['attempts']}).")
+        elif job["attempts"] >= self.max_attempts:
+            job["last_error"] = error
+            self._finish(job, "failed")
+            with self._cond:
+                self._failed += 1
+            print(f"Cola de email: se abandona el envío a {job['config']['EMAIL_RECEPTOR']}: {error}")
+        else:
+            job["last_error"] = error
+            delay = min(self.max_delay, self.base_delay * 2 ** (job["attempts"] - 1))
+            job["next_attempt"] = time.time() + delay * random.uniform(0.8, 1.2)
+            with self._cond:
+                self._retries += 1
+            print(f"Cola de email: falló el envío a {job['config']['EMAIL_RECEPTOR']} "
+                  f"({error}); reintento en {delay:.0f}s.")
+            self._release(job)
+
+    def _claim(self, job_id: str) -> Optional[Dict]:
+        """
+        Toma el envío para este proceso moviendo su JSON a `in_flight/`.
+
+        Returns:
+            Dict: El envío, o None si otro proceso ya lo tomó (o terminó).
+        """
+        claim_path = self._claim_path(job_id)
+        try:
+            os.replace(self._pending_dir / f"{job_id}.json", claim_path)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"Cola de email: no se pudo tomar '{job_id}': {e}")
+            return None
+        try:
+            os.utime(claim_path)  # el plazo de `claim_timeout` corre desde ahora
+            with open(claim_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Cola de email: no se pudo leer '{job_id}.json': {e}")
+            os.replace(claim_path, self._pending_dir / f"{job_id}.json")
+            return None
+
+    def _release(self, job: Dict) -> None:
+        """Devuelve un envío tomado a `pending/` (con sus cambios) y a la cola."""
+        claim_path = self._claim_path(job["id"])
+        self._write_job(claim_path.parent, job, claim_path.name)
+        os.replace(claim_path, self._pending_dir / f"{job['id']}.json")
+        with self._cond:
+            heapq.heappush(self._queue, (job["next_attempt"], job["created"], job["id"]))
+            self._cond.notify()
+
+    def _finish(self, job: Dict, outcome: str) -> None:
+        """Cierra un envío tomado: el JSON pasa a `outcome/` y el adjunto se borra."""
+        self._write_job(self.directory / outcome, job)
+        try:
+            os.remove(self._claim_path(job["id"]))
+        except OSError:
+            pass
+        shutil.rmtree(self._pending_dir / job["id"], ignore_errors=True)
+
+    # --- Persistencia ---
+
+    @property
+    def _pending_dir(self) -> Path:
+        return self.directory / "pending"
+
+    @property
+    def _in_flight_dir(self) -> Path:
+        return self.directory / "in_flight"
+
+    def _claim_path(self, job_id: str) -> Path:
+        return self._in_flight_dir / f"{job_id}@{self._owner}.json"
+
+    def rescan(self) -> None:
+        """
+        Vuelve a leer la carpeta: recupera los envíos de procesos muertos y
+        suma los que encoló otro proceso.
+        """
+        self._recover_claims()
+        self._load_pending()
+
+    def _recover_claims(self) -> None:
+        """Devuelve a `pending/` los envíos tomados por procesos que ya no existen."""
+        now = time.time()
+        for claim_path in self._in_flight_dir.glob("*.json"):
+            try:
+                job_id, pid, host = claim_path.name[:-len(".json")].split("@", 2)
+                if host == self._host:
+                    if int(pid) == os.getpid() or _pid_alive(int(pid)):
+                        continue
+                elif now - claim_path.stat().st_mtime < self.claim_timeout:
+                    continue
+                os.replace(claim_path, self._pending_dir / f"{job_id}.json")
+            except (OSError, ValueError) as e:
+                print(f"Cola de email: no se pudo recuperar '{claim_path.name}': {e}")
+                continue
+            print(f"Cola de email: se recupera el envío '{job_id}' (su proceso {pid} ya no está).")
+
+    def _load_pending(self) -> None:
+        with self._cond:
+            known = {job_id for _, _, job_id in self._queue}
+        for job_path in sorted(self._pending_dir.glob("*.json")):
+            if job_path.stem in known:
+                continue
+            try:
+                with open(job_path, "r", encoding="utf-8") as f:
+                    job = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Cola de email: se ignora '{job_path.name}': {e}")
+                continue
+            with self._cond:
+                heapq.heappush(self._queue, (job["next_attempt"], job["created"], job["id"]))
+                self._cond.notify()
+
+    def _prune_sent(self, keep_days: float) -> None:
+        limit = time.time() - keep_days * 86400
+        for job_path in (self.directory / "sent").glob("*.json"):
+            try:
+                if job_path.stat().st_mtime < limit:
+                    job_path.unlink()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _write_job(directory: Path, job: Dict, name: Optional[str] = None) -> None:
+        path = directory / (name or f"{job['id']}.json")
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+    def _notify(self) -> None:
+        if not self._listeners:
+            return
+        stats = self.stats()
+        for listener in list(self._listeners):
+            try:
+                listener(stats)
+            except Exception as e:
+                print(f"Error al notificar el estado de la cola de email: {e}")
@@ -0,0 +1,119 @@
+# src/infrastructure/merge_manifest.py
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+MANIFEST_VERSION = 1
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Calcula el SHA-256 de un archivo leyéndolo por bloques."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MergeManifest:
+    """
+    Describe cómo se armó un PDF fusionado: qué fuentes contiene, con qué
+    hash y en qué rango de páginas. Se guarda como JSON junto a la salida
+    (por ejemplo `_SALIDA/etiquetas_imprimir.pdf.manifest.json`).
+
+    Cada fuente es un dict con las claves 'path', 'size', 'mtime_ns',
+    'sha256', 'copies', 'start' y 'pages' (páginas totales, copias incluidas).
+    """
+
+    def __init__(self, sources: List[Dict], output_size: int = 0,
+                 output_mtime_ns: int = 0, increments: int = 0):
+        self.sources = sources
+        self.output_size = output_size
+        self.output_mtime_ns = output_mtime_ns
+        self.increments = increments
+
+    @staticmethod
+    def path_for(output_path: str) -> Path:
+        """Ruta del manifiesto asociado a un PDF de salida."""
+        return Path(f"{output_path}.manifest.json")
+
+    @classmethod
+    def load(cls, output_path: str) -> Optional["MergeManifest"]:
+        """
+        Carga el manifiesto de una salida existente.
+
+        Devuelve None si no existe, está dañado o ya no corresponde al PDF
+        en disco (por ejemplo, si alguien lo reemplazó a mano).
+        """
+        try:
+            with open(cls.path_for(output_path), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != MANIFEST_VERSION:
+                return None
+            st = os.stat(output_path)
+            if st.st_size != data["output_size"] or st.st_mtime_ns != data["output_mtime_ns"]:
+                return None
+            return cls(
+                sources=data["sources"],
+                output_size=data["output_size"],
+                output_mtime_ns=data["output_mtime_ns"],
+                increments=data.get("increments", 0),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, output_path: str) -> None:
+        """Escribe el manifiesto, sellándolo con el tamaño y mtime actuales de la salida."""
+        st = os.stat(output_path)
+        self.output_size = st.st_size
+        self.output_mtime_ns = st.st_mtime_ns
+        data = {
+            "version": MANIFEST_VERSION,
+            "output_size": self.output_size,
+            "output_mtime_ns": self.output_mtime_ns,
+            "increments": self.increments,
+            "sources": self.sources,
+        }
+        manifest_path = self.path_for(output_path)
+        tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, manifest_path)
+
+    @staticmethod
+    def discard(output_path: str) -> None:
+        """Elimina el manifiesto (si existe) para forzar una reconstrucción."""
+        try:
+            os.remove(MergeManifest.path_for(output_path))
+        except OSError:
+            pass
+
+    @staticmethod
+    def describe_sources(entries: List[Tuple[str, int]],
+                         previous: Optional["MergeManifest"] = None) -> List[Dict]:
+        """
+        Arma las entradas (sin rango de páginas) para los pares (ruta, copias).
+
+        El hash solo se recalcula si el tamaño o el mtime cambiaron respecto
+        del manifiesto anterior, así un archivo intacto no se vuelve a leer.
+        """
+        known = {}
+        if previous is not None:
+            for source in previous.sources:
+                known[(source["path"], source["size"], source["mtime_ns"])] = source["sha256"]
+
+        described = []
+        for pdf_path, copies in entries:
+            st = os.stat(pdf_path)
+            key = (os.path.abspath(pdf_path), st.st_size, st.st_mtime_ns)
+            content_hash = known.get(key) or file_sha256(pdf_path)
+            described.append({
+                "path": key[0],
+                "size": key[1],
+                "mtime_ns": key[2],
+                "sha256": content_hash,
+                "copies": copies,
+            })
+        return described
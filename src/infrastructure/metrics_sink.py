@@ -0,0 +1,50 @@
+# src/infrastructure/metrics_sink.py
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+from src.core.interfaces import IMetricsSink
+
+
+class JsonLinesMetricsSink(IMetricsSink):
+    """
+    Implementación de IMetricsSink que agrega una línea JSON por evento a un
+    archivo (formato JSON Lines), lista para analizar con otra herramienta.
+
+    Cada línea lleva "ts" (epoch), "event", los `tags` fijos del destino
+    (por ejemplo el nombre del trabajo) y los campos del evento. El archivo
+    se abre en modo "append" y cada línea se escribe de una sola vez, así
+    que varios procesos pueden compartirlo.
+    """
+
+    def __init__(self, path: Path, tags: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            path (Path): Archivo de destino (se crea si no existe).
+            tags (Dict[str, Any], optional): Campos que se agregan a todas las líneas.
+        """
+        self.path = Path(path)
+        self.tags = dict(tags or {})
+        self._file = None
+        self._lock = threading.Lock()
+
+    def record(self, event: str, fields: Dict[str, Any]) -> None:
+        line = json.dumps(
+            {"ts": round(time.time(), 6), "event": event, **self.tags, **fields},
+            ensure_ascii=False, default=str
+        )
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            # Un evento por escritura: no se mezclan líneas entre procesos
+            self._file.flush()
+
+    def close(self) -> None:
+        """Cierra el archivo (se vuelve a abrir si llega otro evento)."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,101 @@
+# src/infrastructure/mime_stream.py
+import base64
+import os
+import re
+import uuid
+from email.header import Header
+from email.utils import encode_rfc2231, formatdate, make_msgid
+from pathlib import Path
+from typing import Iterator, Optional
+
+# 57 bytes de entrada = una línea de 76 caracteres en base64
+_LINE_BYTES = 57
+_READ_BYTES = _LINE_BYTES * 1024
+_LEADING_DOT = re.compile(rb"(?m)^\.")
+
+
+def _encode_header(value: str) -> str:
+    try:
+        value.encode("ascii")
+        return value
+    except UnicodeEncodeError:
+        return Header(value, "utf-8").encode()
+
+
+def _filename_param(name: str) -> str:
+    try:
+        name.encode("ascii")
+        return f'filename="{name}"'
+    except UnicodeEncodeError:
+        return f"filename*={encode_rfc2231(name, 'utf-8')}"
+
+
+class StreamingAttachmentMessage:
+    """
+    Mensaje MIME (texto + un adjunto) que se genera por partes.
+
+    En vez de armar el mensaje completo en memoria (el PDF, su versión en
+    base64 y el mensaje serializado), `iter_chunks` lee el archivo por
+    bloques y entrega las líneas base64 ya listas para escribir en el
+    socket SMTP. La memoria usada no depende del tamaño del adjunto.
+
+    Los bloques ya vienen con el "dot-stuffing" de SMTP aplicado (una línea
+    base64 nunca empieza con punto, así que solo hace falta en el texto).
+    """
+
+    def __init__(self, sender: str, subject: str, body: str, file_path: str,
+                 filename: Optional[str] = None):
+        self.sender = sender
+        self.subject = subject
+        self.body = body
+        self.file_path = str(file_path)
+        self.filename = filename or Path(file_path).name
+        self.boundary = f"=={uuid.uuid4().hex}=="
+
+    def encoded_size(self) -> int:
+        """Tamaño aproximado del mensaje en bytes (adjunto en base64 incluido)."""
+        size = os.path.getsize(self.file_path)
+        lines = -(-size // _LINE_BYTES)
+        return lines * 78 + len(self.body) + 1024
+
+    def iter_chunks(self, recipient: str) -> Iterator[bytes]:
+        """
+        Genera el mensaje para `recipient`, terminado en CRLF.
+
+        Raises:
+            OSError: Si no se puede leer el adjunto.
+        """
+        head = (
+            f"From: {self.sender}\r\n"
+            f"To: {recipient}\r\n"
+            f"Subject: {_encode_header(self.subject)}\r\n"
+            f"Date: {formatdate(localtime=True)}\r\n"
+            f"Message-ID: {make_msgid()}\r\n"
+            "MIME-Version: 1.0\r\n"
+            f'Content-Type: multipart/mixed; boundary="{self.boundary}"\r\n'
+            "\r\n"
+            f"--{self.boundary}\r\n"
+            'Content-Type: text/plain; charset="utf-8"\r\n'
+            "Content-Transfer-Encoding: 8bit\r\n"
+            "\r\n"
+            f"{self.body}\r\n"
+            f"--{self.boundary}\r\n"
+            "Content-Type: application/octet-stream\r\n"
+            "Content-Transfer-Encoding: base64\r\n"
+            f"Content-Disposition: attachment; {_filename_param(self.filename)}\r\n"
+            "\r\n"
+        )
+        head = head.replace("\r\n", "\n").replace("\n", "\r\n")
+        yield _LEADING_DOT.sub(b"..", head.encode("utf-8"))
+
+        with open(self.file_path, "rb") as f:
+            while True:
+                block = f.read(_READ_BYTES)
+                if not block:
+                    break
+                encoded = base64.b64encode(block)
+                yield b"".join(
+                    encoded[i:i + 76] + b"\r\n" for i in range(0, len(encoded), 76)
+                )
+
+        yield f"--{self.boundary}--\r\n".encode("ascii")
@@ -0,0 +1,101 @@
+# src/infrastructure/pdf_attachment.py
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from src.core.exceptions import EmailError
+
+OVERSIZE_MODES = ("split", "compress", "compress_then_split", "error")
+
+
+def _compress(src: str, dst: str) -> None:
+    import fitz  # PyMuPDF (import diferido: el envío normal no lo necesita)
+    with fitz.open(src) as doc:
+        doc.save(dst, garbage=4, deflate=True, deflate_images=True,
+                 deflate_fonts=True, no_new_id=True)
+
+
+def _split(src: str, workdir: str, max_bytes: int) -> List[str]:
+    """
+    Parte el PDF en tramos de páginas consecutivas que no superen `max_bytes`.
+
+    Arranca con tantos tramos como haga falta según el tamaño total y
+    divide a la mitad los que igual queden grandes. Una sola página que
+    ya supera el límite no se puede partir más y se devuelve tal cual.
+    """
+    import fitz  # PyMuPDF
+    stem = Path(src).stem
+    with fitz.open(src) as doc:
+        total = doc.page_count
+        parts = max(1, -(-os.path.getsize(src) // max_bytes))
+        step = -(-total // parts)
+        pending = [(start, min(start + step, total)) for start in range(0, total, step)]
+        ranges = []
+        while pending:
+            start, end = pending.pop(0)
+            path = os.path.join(workdir, f"{stem}_{start + 1:04d}-{end:04d}.pdf")
+            with fitz.open() as part:
+                part.insert_pdf(doc, from_page=start, to_page=end - 1)
+                part.save(path, garbage=4, deflate=True, no_new_id=True)
+            if os.path.getsize(path) > max_bytes and end - start > 1:
+                os.remove(path)
+                middle = (start + end) // 2
+                pending[:0] = [(start, middle), (middle, end)]
+                continue
+            ranges.append(path)
+    return ranges
+
+
+@contextmanager
+def prepare_attachments(file_path: str, max_bytes: Optional[int] = None,
+                        mode: str = "compress_then_split") -> Iterator[List[str]]:
+    """
+    Devuelve los archivos a adjuntar para `file_path`, respetando un tamaño
+    máximo por mensaje. Los archivos temporales se borran al salir.
+
+    Args:
+        file_path (str): PDF a enviar.
+        max_bytes (int, optional): Tamaño máximo de cada adjunto (sin
+            codificar). None desactiva el control.
+        mode (str): Qué hacer si el PDF supera el límite: "compress"
+            (recomprimir), "split" (partir por páginas en varios mensajes),
+            "compress_then_split" (recomprimir y, si no alcanza, partir) o
+            "error".
+
+    Raises:
+        EmailError: Si el adjunto no se puede llevar por debajo del límite.
+        ValueError: Si `mode` no es válido.
+    """
+    if mode not in OVERSIZE_MODES:
+        raise ValueError(f"Modo de adjunto inválido: '{mode}' (opciones: {', '.join(OVERSIZE_MODES)}).")
+    if max_bytes is None or os.path.getsize(file_path) <= max_bytes:
+        yield [file_path]
+        return
+    if mode == "error":
+        raise EmailError(
+            f"El PDF pesa {os.path.getsize(file_path) / 1024 / 1024:.1f} MB y supera "
+            f"el máximo de {max_bytes / 1024 / 1024:.1f} MB por mensaje."
+        )
+
+    workdir = tempfile.mkdtemp(prefix="adjuntos_")
+    try:
+        current = file_path
+        if mode in ("compress", "compress_then_split"):
+            compressed = os.path.join(workdir, Path(file_path).name)
+            _compress(file_path, compressed)
+            if os.path.getsize(compressed) < os.path.getsize(file_path):
+                current = compressed
+            if os.path.getsize(current) <= max_bytes:
+                yield [current]
+                return
+            if mode == "compress":
+                raise EmailError(
+                    f"Aun comprimido, el PDF pesa {os.path.getsize(current) / 1024 / 1024:.1f} MB "
+                    f"y supera el máximo de {max_bytes / 1024 / 1024:.1f} MB por mensaje."
+                )
+        yield _split(current, workdir, max_bytes)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,133 @@
+# src/infrastructure/pdf_cache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+# (ruta absoluta, mtime en ns, tamaño en bytes)
+SourceKey = Tuple[str, int, int]
+
+
+class PdfSourceCache:
+    """
+    Caché en memoria de etiquetas PDF ya leídas/preparadas.
+
+    Las entradas se direccionan por contenido (SHA-256): dos archivos
+    idénticos en carpetas distintas comparten una única copia. Un índice
+    (ruta, mtime, tamaño) -> hash permite resolver un acierto con un
+    simple `stat`, sin volver a leer el archivo del disco.
+
+    La memoria está acotada por `max_bytes` y se libera con política LRU.
+    Es seguro usarla desde varios hilos.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            max_bytes (int): Memoria máxima que pueden ocupar los documentos.
+        """
+        if max_bytes <= 0:
+            raise ValueError("El tamaño máximo de la caché debe ser positivo.")
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._index: Dict[SourceKey, str] = {}
+        self._keys_by_hash: Dict[str, Set[SourceKey]] = {}
+        self._key_by_path: Dict[str, SourceKey] = {}
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def key_for(pdf_path: str) -> Optional[SourceKey]:
+        """Devuelve la clave (ruta, mtime, tamaño) o None si el archivo no existe."""
+        try:
+            st = os.stat(pdf_path)
+        except OSError:
+            return None
+        return (os.path.abspath(pdf_path), st.st_mtime_ns, st.st_size)
+
+    def get(self, key: Optional[SourceKey]) -> Optional[bytes]:
+        """Busca un documento preparado. Cuenta el acierto o el fallo."""
+        with self._lock:
+            content_hash = self._index.get(key) if key else None
+            if content_hash is None or content_hash not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(content_hash)
+            data = self._entries[content_hash]
+            self.hits += 1
+            self.bytes_saved += key[2]
+            return data
+
+    def put(self, key: Optional[SourceKey], data: bytes) -> None:
+        """Guarda un documento preparado bajo la clave dada."""
+        if key is None or len(data) > self.max_bytes:
+            return
+        content_hash = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            # Una nueva versión del mismo archivo reemplaza a la anterior
+            previous = self._key_by_path.get(key[0])
+            if previous is not None and previous != key:
+                self._forget_key(previous)
+
+            self._index[key] = content_hash
+            self._key_by_path[key[0]] = key
+            self._keys_by_hash.setdefault(content_hash, set()).add(key)
+
+            if content_hash in self._entries:
+                self._entries.move_to_end(content_hash)
+                return
+
+            self._entries[content_hash] = data
+            self._current_bytes += len(data)
+            while self._current_bytes > self.max_bytes:
+                self._evict_oldest()
+
+    def stats(self) -> Dict[str, int]:
+        """Devuelve contadores de uso para medir el ahorro."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._current_bytes,
+                "bytes_saved": self.bytes_saved,
+            }
+
+    def clear(self) -> None:
+        """Vacía la caché (los contadores se conservan)."""
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+            self._keys_by_hash.clear()
+            self._key_by_path.clear()
+            self._current_bytes = 0
+
+    def _forget_key(self, key: SourceKey) -> None:
+        content_hash = self._index.pop(key, None)
+        if content_hash is None:
+            return
+        keys = self._keys_by_hash.get(content_hash)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_hash[content_hash]
+                data = self._entries.pop(content_hash, None)
+                if data is not None:
+                    self._current_bytes -= len(data)
+
+    def _evict_oldest(self) -> None:
+        content_hash, data = self._entries.popitem(last=False)
+        self._current_bytes -= len(data)
+        self.evictions += 1
+        for key in self._keys_by_hash.pop(content_hash, set()):
+            self._index.pop(key, None)
+            if self._key_by_path.get(key[0]) == key:
+                del self._key_by_path[key[0]]
@@ -1,55 +1,833 @@
 # src/infrastructure/pdf_repository.py
+import difflib
+import hashlib
+import mmap
+import os
+import shutil
+import threading
+import time
 import fitz  # PyMuPDF
-from typing import List
-from src.core.interfaces import IPdfRepository
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.core.interfaces import IMetricsSink, IPdfRepository
+from src.core.jobs import CancellationToken, check_cancelled
+from src.infrastructure.category_bundles import CategoryBundles
+from src.infrastructure.pdf_cache import PdfSourceCache
+from src.infrastructure.merge_manifest import MergeManifest
+from src.core.selection import SelectionEntry, normalize_selection
 
 from src.core.exceptions import MergeError
 
+
+def _read_source(pdf_path: str) -> bytes:
+    """Lee el archivo completo en memoria (etapa de E/S, apta para hilos)."""
+    with open(pdf_path, "rb") as f:
+        return f.read()
+
+
+def _bulk_read_source(pdf_path: str) -> memoryview:
+    """
+    Lee el archivo con un único pedido del tamaño exacto, sin buffer
+    intermedio. En un recurso de red cada pedido es un viaje de ida y
+    vuelta, así que no se lee de más para detectar el fin de archivo.
+
+    Devuelve una vista sobre el buffer: PyMuPDF la abre sin copiarla.
+    """
+    with open(pdf_path, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        read = 0
+        while read < size:
+            chunk = f.readinto(view[read:])
+            if not chunk:
+                break
+            read += chunk
+        return view[:read]
+
+
+def _mmap_source(pdf_path: str) -> memoryview:
+    """
+    Mapea el archivo en memoria; las páginas se traen del disco a medida
+    que MuPDF las lee. El mapeo se libera cuando nadie usa la vista.
+    """
+    with open(pdf_path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mmap, "MADV_WILLNEED"):
+        # Pide al sistema que empiece a traerlo ya, en este hilo de lectura
+        mapped.madvise(mmap.MADV_WILLNEED)
+    return memoryview(mapped)
+
+
+# Formas de cargar una etiqueta en memoria (ver `loader` en PyMuPDFRepository)
+LOADERS = ("read", "bulk", "mmap")
+
+
+def _normalize_source(pdf_path: str) -> bytes:
+    """
+    Abre, parsea y re-serializa un PDF (etapa de CPU, apta para procesos).
+
+    El documento devuelto ya está reparado y validado, por lo que el
+    escritor solo tiene que insertarlo.
+    """
+    with fitz.open(stream=_read_source(pdf_path), filetype="pdf") as pdf_doc:
+        return pdf_doc.tobytes(no_new_id=True)
+
+
+def _work_path(output_path: str) -> str:
+    """
+    Archivo temporal junto a la salida. Todo se escribe ahí y al final se
+    renombra sobre la salida: un corte a mitad de camino (cancelación,
+    error, cierre de la aplicación) nunca deja la salida truncada.
+    """
+    return f"{output_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+
+
+def _discard(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _timed(prepare, pdf_path: str) -> Tuple[bytes, float]:
+    """Ejecuta `prepare` y devuelve también cuánto tardó (en el trabajador)."""
+    started = time.perf_counter()
+    data = prepare(pdf_path)
+    return data, time.perf_counter() - started
+
+
+class _MergeRun:
+    """
+    Estado de una sola llamada a `merge_pdfs` o `impose_pdfs`.
+
+    Se crea en cada llamada y viaja por los métodos que la atienden: dos
+    fusiones simultáneas sobre el mismo repositorio no comparten métricas,
+    aviso de cancelación ni reporte.
+    """
+
+    def __init__(self, files: int, metrics: Optional[IMetricsSink] = None,
+                 cancel: Optional[CancellationToken] = None):
+        self.metrics = metrics
+        self.cancel = cancel
+        self.report: Dict = {"files": files, "input_bytes": 0, "save_seconds": 0.0}
+        # Tiempo de preparación de cada archivo, para el evento "file"
+        self.read_timings: Dict[str, Tuple[float, bool]] = {}
+        self.file_index = 0
+        self.started = time.perf_counter()
+
+
 class PyMuPDFRepository(IPdfRepository):
     """
     Implementación concreta de IPdfRepository usando la librería PyMuPDF.
-    
+
     Esta capa SÍ conoce los detalles de las librerías externas (Pilar 1).
+
+    La preparación de los documentos fuente (lectura y, opcionalmente,
+    parseo) puede repartirse en un pool de hilos o de procesos; la
+    inserción siempre se hace en un único escritor y en el orden pedido,
+    por lo que el resultado es idéntico byte a byte sin importar el
+    paralelismo elegido.
     """
 
-    def merge_pdfs(self, pdf_file_paths: List[str], output_path: str, on_progress: callable = None) -> None:
+    def __init__(
+        self,
+        workers: int = 1,
+        use_processes: bool = False,
+        cache: Optional[PdfSourceCache] = None,
+        incremental: bool = False,
+        incremental_max_changes: float = 0.5,
+        incremental_max_saves: int = 20,
+        max_memory_bytes: Optional[int] = None,
+        garbage: int = 0,
+        deflate: bool = False,
+        compression_effort: int = 0,
+        bundles: Optional[CategoryBundles] = None,
+        loader: str = "read",
+        prefetch: int = 0
+    ):
+        """
+        Args:
+            workers (int): Cantidad de trabajadores para preparar los PDFs.
+                Con 1 (por defecto) todo se hace en el hilo que llama.
+            use_processes (bool): Si es True, los trabajadores son procesos
+                que además parsean y normalizan cada PDF. Si es False, son
+                hilos que solo leen los archivos (PyMuPDF no es thread-safe).
+            cache (PdfSourceCache, optional): Caché compartida entre fusiones.
+                Los archivos sin cambios se toman de memoria sin leer el disco.
+            incremental (bool): Si es True, se guarda un manifiesto junto a la
+                salida y las fusiones siguientes solo tocan las fuentes que
+                cambiaron.
+            incremental_max_changes (float): Fracción de fuentes modificadas a
+                partir de la cual conviene reconstruir en lugar de actualizar.
+            incremental_max_saves (int): Guardados incrementales acumulados
+                antes de compactar la salida con una reconstrucción completa.
+            max_memory_bytes (int, optional): Techo aproximado de memoria para
+                las páginas pendientes. Si se indica, la salida se escribe por
+                lotes a medida que avanza la fusión en lugar de al final.
+            garbage (int): Nivel de recolección de basura de PyMuPDF al
+                guardar (0-4). 3 fusiona objetos duplicados y 4 además
+                compara streams, deduplicando fuentes e imágenes compartidas.
+            deflate (bool): Comprime los streams sin comprimir (incluidas
+                imágenes y fuentes).
+            compression_effort (int): Esfuerzo de compresión (0 = por
+                defecto de MuPDF, 100 = máximo).
+            bundles (CategoryBundles, optional): Paquetes pre-fusionados por
+                categoría. En las fusiones completas, cada categoría entera
+                con su paquete al día se inserta abriendo un solo archivo.
+            loader (str): Cómo se cargan las etiquetas (en modo hilos):
+                "read" (lectura normal), "bulk" (un único pedido del tamaño
+                exacto, sin copias) o "mmap" (mapeo en memoria, sin copias;
+                lo mapeado no se guarda en la caché).
+            prefetch (int): Etiquetas que se cargan por adelantado en hilos
+                mientras se inserta la actual (0 = solo lo que den los
+                trabajadores). Oculta la latencia de un disco de red.
+        """
+        if workers < 1:
+            raise ValueError("La cantidad de trabajadores debe ser al menos 1.")
+        if not 0 <= garbage <= 4:
+            raise ValueError("El nivel de garbage debe estar entre 0 y 4.")
+        if loader not in LOADERS:
+            raise ValueError(f"Modo de carga desconocido: '{loader}' (opciones: {', '.join(LOADERS)}).")
+        if prefetch < 0:
+            raise ValueError("La cantidad de etiquetas a adelantar no puede ser negativa.")
+        self.workers = workers
+        self.use_processes = use_processes
+        self.cache = cache
+        self.incremental = incremental
+        self.incremental_max_changes = incremental_max_changes
+        self.incremental_max_saves = incremental_max_saves
+        self.max_memory_bytes = max_memory_bytes
+        self.garbage = garbage
+        self.deflate = deflate
+        self.compression_effort = compression_effort
+        self.bundles = bundles
+        self.loader = loader
+        self.prefetch = prefetch
+
+    def merge_pdfs(self, pdf_file_paths: List[SelectionEntry], output_path: str, on_progress: callable = None,
+                   metrics: Optional[IMetricsSink] = None,
+                   cancel: Optional[CancellationToken] = None) -> Dict:
         """
         Fusiona PDFs usando PyMuPDF (fitz) por su alta eficiencia.
-        
+
+        En modo incremental se intenta primero actualizar la salida anterior
+        (ver `_merge_incremental`) y solo si no es posible se reconstruye.
+        En ambos casos se trabaja sobre un archivo temporal que reemplaza a
+        la salida recién al terminar.
+
         Args:
-            pdf_file_paths (List[str]): Lista de rutas a los archivos PDF.
+            pdf_file_paths (List[SelectionEntry]): Rutas a los PDFs o pares
+                (ruta, copias). Cada fuente se abre una sola vez y sus copias
+                se agregan duplicando las páginas ya insertadas.
             output_path (str): Ruta al archivo PDF de salida.
             on_progress (callable, optional): Callback (actual, total).
-            
+            metrics (IMetricsSink, optional): Recibe por cada fuente los
+                tiempos de lectura, parseo e inserción, sus bytes y páginas,
+                y por cada guardado su tiempo y los bytes escritos.
+            cancel (CancellationToken, optional): Se consulta antes de cada
+                fuente y de cada guardado.
+
+        Returns:
+            Dict: Reporte de la fusión: modo, archivos, bytes de entrada y de
+                salida, segundos de guardado y totales (y los paquetes usados).
+
         Raises:
             MergeError: Si ocurre un error al procesar o guardar un PDF.
+            OperationCancelled: Si se canceló; la salida anterior queda intacta.
         """
+        entries = normalize_selection(pdf_file_paths)
+        run = _MergeRun(len(entries), metrics, cancel)
+
+        sources = None
+        if self.incremental:
+            previous = MergeManifest.load(output_path)
+            try:
+                sources = MergeManifest.describe_sources(entries, previous)
+            except OSError:
+                # El archivo faltante se reporta como MergeError en la fusión completa
+                sources = None
+            if previous is not None and sources is not None:
+                if self._merge_incremental(previous, sources, output_path, on_progress, run):
+                    return self._finish_report(run, output_path, "incremental")
+            MergeManifest.discard(output_path)
+
+        work_path = _work_path(output_path)
+        try:
+            page_counts = self._merge_full(entries, work_path, on_progress, run)
+            self._commit_output(work_path, output_path, run)
+        finally:
+            _discard(work_path)
+
+        if sources is not None:
+            self._stamp_page_ranges(sources, page_counts)
+            MergeManifest(sources).save(output_path)
+
+        return self._finish_report(run, output_path, "streaming" if self.max_memory_bytes else "full")
+
+    @staticmethod
+    def _finish_report(run: _MergeRun, output_path: str, mode: str) -> Dict:
+        """Completa el reporte de la fusión y lo devuelve (quien llama decide si lo muestra)."""
+        report = run.report
+        report["mode"] = mode
+        report["output_bytes"] = os.path.getsize(output_path)
+        report["total_seconds"] = time.perf_counter() - run.started
+        return report
+
+    def impose_pdfs(
+        self,
+        pdf_file_paths: List[SelectionEntry],
+        output_path: str,
+        columns: int,
+        rows: int,
+        paper_size: str = "a4",
+        margin: float = 18,
+        gap: float = 6,
+        on_progress: callable = None,
+        metrics: Optional[IMetricsSink] = None,
+        cancel: Optional[CancellationToken] = None
+    ) -> Dict:
+        """
+        Acomoda las etiquetas en una grilla de `columns` x `rows` por hoja.
+
+        Cada página fuente se coloca como vector con `show_pdf_page` (nunca
+        se rasteriza). Las fuentes repetidas se abren una sola vez y PyMuPDF
+        reutiliza el XObject ya colocado, por lo que una etiqueta repetida
+        solo agrega una referencia a la hoja.
+
+        Args:
+            pdf_file_paths (List[SelectionEntry]): Rutas de las etiquetas, en
+                orden, o pares (ruta, copias).
+            output_path (str): Ruta al archivo PDF de salida.
+            columns (int): Etiquetas por fila.
+            rows (int): Filas por hoja.
+            paper_size (str): Tamaño de hoja de PyMuPDF ('a4', 'letter', 'a4-l'...).
+            margin (float): Margen de la hoja, en puntos.
+            gap (float): Separación entre celdas, en puntos.
+            on_progress (callable, optional): Callback (actual, total).
+            metrics (IMetricsSink, optional): Recibe un evento "file" por
+                entrada colocada y uno "save" por guardado, como en `merge_pdfs`.
+            cancel (CancellationToken, optional): Se consulta antes de cada
+                fuente y antes de guardar; la salida anterior queda intacta.
+
+        Returns:
+            Dict: Reporte como el de `merge_pdfs`, con etiquetas y hojas.
+
+        Raises:
+            ValueError: Si la grilla no tiene filas o columnas, o si el margen
+                o la separación son negativos.
+            MergeError: Si ocurre un error al procesar o guardar un PDF.
+            OperationCancelled: Si se canceló antes de terminar.
+        """
+        if columns < 1 or rows < 1:
+            raise ValueError("La grilla debe tener al menos una fila y una columna.")
+        if margin < 0 or gap < 0:
+            raise ValueError("El margen y la separación no pueden ser negativos.")
+        entries = normalize_selection(pdf_file_paths)
+        run = _MergeRun(len(entries), metrics, cancel)
+        report = run.report
+
+        sheet = fitz.paper_rect(paper_size)
+        cell_width = (sheet.width - 2 * margin - (columns - 1) * gap) / columns
+        cell_height = (sheet.height - 2 * margin - (rows - 1) * gap) / rows
+        if cell_width <= 0 or cell_height <= 0:
+            raise MergeError("La grilla no entra en la hoja con el margen indicado.")
+
         result_pdf = fitz.open()
-        total_files = len(pdf_file_paths)
+        # Un documento abierto por contenido: es la clave de reutilización de XObjects
+        sources_by_hash: Dict[str, fitz.Document] = {}
+        sources_by_path: Dict[str, fitz.Document] = {}
+        # Bytes y segundos de parseo de cada ruta, para el evento "file"
+        loaded: Dict[str, Tuple[int, float]] = {}
+        total_files = len(entries)
+        unique_paths = list(dict.fromkeys(path for path, _ in entries))
+        per_sheet = columns * rows
+        placed = 0
+        work_path = _work_path(output_path)
 
         try:
-            for i, pdf_path in enumerate(pdf_file_paths):
+            for pdf_path, data, error in self._prepare_sources(unique_paths, run):
+                check_cancelled(run.cancel)
+                try:
+                    if error is not None:
+                        raise error
+                    opened = time.perf_counter()
+                    content_hash = hashlib.sha256(data).hexdigest()
+                    if content_hash not in sources_by_hash:
+                        sources_by_hash[content_hash] = fitz.open(stream=data, filetype="pdf")
+                        report["input_bytes"] += len(data)
+                    sources_by_path[pdf_path] = sources_by_hash[content_hash]
+                    loaded[pdf_path] = (len(data), time.perf_counter() - opened)
+                except Exception as e:
+                    raise MergeError(
+                        f"Error al procesar el archivo '{pdf_path}': {e}"
+                    )
+
+            sheet_page = None
+            for i, (pdf_path, copies) in enumerate(entries):
+                check_cancelled(run.cancel)
                 if on_progress:
                     on_progress(i, total_files)
+                src_doc = sources_by_path[pdf_path]
+                placing = time.perf_counter()
                 try:
-                    # Usamos 'with' para asegurar el cierre del descriptor del archivo
-                    with fitz.open(pdf_path) as pdf_doc:
-                        result_pdf.insert_pdf(pdf_doc)
+                    for pno in list(range(src_doc.page_count)) * copies:
+                        slot = placed % per_sheet
+                        if slot == 0:
+                            sheet_page = result_pdf.new_page(width=sheet.width, height=sheet.height)
+                        row, col = divmod(slot, columns)
+                        x0 = margin + col * (cell_width + gap)
+                        y0 = margin + row * (cell_height + gap)
+                        cell = fitz.Rect(x0, y0, x0 + cell_width, y0 + cell_height)
+                        sheet_page.show_pdf_page(cell, src_doc, pno)
+                        placed += 1
                 except Exception as e:
-                    # El 'finally' general se encargará de cerrar result_pdf
                     raise MergeError(
                         f"Error al procesar el archivo '{pdf_path}': {e}"
                     )
-            
+                if run.metrics is not None:
+                    size, parse_seconds = loaded.pop(pdf_path, (0, 0.0))
+                    read_seconds, cached = run.read_timings.pop(pdf_path, (0.0, False))
+                    run.metrics.record("file", {
+                        "index": i,
+                        "path": pdf_path,
+                        "pages": src_doc.page_count * copies,
+                        "copies": copies,
+                        "bytes": size,
+                        "cached": cached,
+                        "read_seconds": read_seconds,
+                        "parse_seconds": parse_seconds,
+                        "insert_seconds": time.perf_counter() - placing,
+                    })
+
             if on_progress:
                 on_progress(total_files, total_files)
 
-            try:
-                result_pdf.save(output_path)
-            except Exception as e:
-                raise MergeError(
-                    f"Error al guardar el archivo de salida '{output_path}': {e}"
-                )
+            self._save(result_pdf, work_path, run)
+        finally:
+            for src_doc in sources_by_hash.values():
+                src_doc.close()
+            result_pdf.close()
+        try:
+            self._commit_output(work_path, output_path, run)
+        finally:
+            _discard(work_path)
+
+        report["labels"] = placed
+        report["sheets"] = -(-placed // per_sheet)
+        return self._finish_report(run, output_path, f"{columns}x{rows}")
+
+    def _merge_full(self, entries: List[Tuple[str, int]], output_path: str,
+                    on_progress: callable, run: _MergeRun) -> List[int]:
+        """
+        Reconstruye la salida desde cero. Devuelve las páginas de cada entrada.
+
+        Con paquetes por categoría, los tramos que cubren una categoría
+        completa se insertan desde su paquete y sus páginas se reparten
+        después entre las etiquetas que reemplazó. Si un paquete cambió
+        mientras se leía, el reporte lo indica en "stale_bundle".
+        """
+        if self.bundles is None:
+            return self._merge_entries(entries, output_path, on_progress, run)
+
+        report = run.report
+        plan = self.bundles.substitute(entries)
+        report["bundles"] = sum(1 for _, member_pages in plan if member_pages is not None)
+        report["opened"] = len(plan)
+        if not report["bundles"]:
+            return self._merge_entries(entries, output_path, on_progress, run)
+
+        counts = self._merge_entries([entry for entry, _ in plan], output_path, on_progress, run)
+        page_counts = []
+        for (entry, member_pages), pages in zip(plan, counts):
+            if member_pages is None:
+                page_counts.append(pages)
+            elif sum(member_pages) == pages:
+                page_counts.extend(member_pages)
+            else:
+                # Se rehízo mientras se leía: se vuelve a fusionar con los archivos sueltos
+                report["stale_bundle"] = entry[0]
+                report["bundles"] = 0
+                report["opened"] = len(entries)
+                return self._merge_entries(entries, output_path, on_progress, run)
+        return page_counts
+
+    def _merge_entries(self, entries: List[Tuple[str, int]], output_path: str,
+                       on_progress: callable, run: _MergeRun) -> List[int]:
+        if self.max_memory_bytes:
+            return self._merge_streaming(entries, output_path, on_progress, run)
+
+        result_pdf = fitz.open()
+        total_files = len(entries)
+
+        try:
+            page_counts = self._insert_sources(result_pdf, entries, 0, on_progress, run)
+
+            if on_progress:
+                on_progress(total_files, total_files)
+
+            self._save(result_pdf, output_path, run)
+            return page_counts
         finally:
             # Aseguramos que siempre se liberen los recursos de memoria
-            result_pdf.close()
\ No newline at end of file
+            result_pdf.close()
+
+    def _merge_streaming(self, entries: List[Tuple[str, int]], output_path: str,
+                         on_progress: callable, run: _MergeRun) -> List[int]:
+        """
+        Fusiona por lotes acotados en memoria.
+
+        Las fuentes se acumulan hasta rozar `max_memory_bytes`; entonces el
+        lote se vuelca al archivo de salida (el primero con un guardado
+        completo, los siguientes con guardados incrementales) y se libera.
+        Al reabrir la salida, PyMuPDF carga los objetos bajo demanda, así que
+        las páginas ya escritas no vuelven a ocupar memoria.
+        """
+        total_files = len(entries)
+        page_counts = []
+        result_pdf = fitz.open()
+        batch_bytes = 0
+        flushed = False
+
+        def flush(reopen: bool = True):
+            nonlocal result_pdf, batch_bytes, flushed
+            self._save(result_pdf, output_path, run, incremental=flushed)
+            flushed = True
+            result_pdf.close()
+            result_pdf = fitz.open(output_path) if reopen else fitz.open()
+            batch_bytes = 0
+
+        try:
+            prepared = self._prepare_sources([path for path, _ in entries], run)
+            for i, ((pdf_path, data, error), (_, copies)) in enumerate(zip(prepared, entries)):
+                check_cancelled(run.cancel)
+                if on_progress:
+                    on_progress(i, total_files)
+                if batch_bytes and batch_bytes + len(data or b"") > self.max_memory_bytes:
+                    flush()
+                page_counts.append(
+                    self._insert_one(result_pdf, pdf_path, data, error, -1, run, copies)
+                )
+                batch_bytes += len(data)
+
+            if on_progress:
+                on_progress(total_files, total_files)
+
+            if batch_bytes or not flushed:
+                flush(reopen=False)
+            return page_counts
+        finally:
+            result_pdf.close()
+
+    def _save(self, result_pdf, output_path: str, run: _MergeRun, incremental: bool = False) -> None:
+        """
+        Guarda la salida traduciendo cualquier falla a MergeError.
+
+        Los guardados completos aplican la optimización configurada: con
+        `garbage` >= 3 los objetos idénticos (fuentes, logos y fondos que
+        comparten todas las etiquetas de una categoría) se guardan una sola
+        vez. Los guardados incrementales no admiten recolección de basura.
+        """
+        check_cancelled(run.cancel)
+        save_started = time.perf_counter()
+        size_before = os.path.getsize(output_path) if incremental and run.metrics else 0
+        try:
+            if incremental:
+                result_pdf.save(
+                    output_path,
+                    incremental=True,
+                    encryption=fitz.PDF_ENCRYPT_KEEP,
+                    deflate=self.deflate,
+                    no_new_id=True
+                )
+            else:
+                # Sin /ID aleatorio: la misma entrada produce siempre los mismos bytes
+                result_pdf.save(
+                    output_path,
+                    garbage=self.garbage,
+                    deflate=self.deflate,
+                    deflate_images=self.deflate,
+                    deflate_fonts=self.deflate,
+                    compression_effort=self.compression_effort,
+                    no_new_id=True
+                )
+        except Exception as e:
+            raise MergeError(
+                f"Error al guardar el archivo de salida '{output_path}': {e}"
+            )
+        finally:
+            run.report["save_seconds"] += time.perf_counter() - save_started
+        if run.metrics is not None:
+            run.metrics.record("save", {
+                "seconds": time.perf_counter() - save_started,
+                "bytes_written": os.path.getsize(output_path) - size_before,
+                "incremental": incremental,
+            })
+
+    @staticmethod
+    def _commit_output(work_path: str, output_path: str, run: _MergeRun) -> None:
+        """Reemplaza la salida por el archivo temporal ya cerrado (última oportunidad de cancelar)."""
+        check_cancelled(run.cancel)
+        try:
+            os.replace(work_path, output_path)
+        except OSError as e:
+            raise MergeError(
+                f"Error al guardar el archivo de salida '{output_path}': {e}"
+            )
+
+    def _merge_incremental(self, previous: MergeManifest, sources: List[Dict],
+                           output_path: str, on_progress: callable, run: _MergeRun) -> bool:
+        """
+        Actualiza la salida anterior borrando, insertando o reemplazando solo
+        los rangos de páginas de las fuentes que cambiaron, y la guarda con
+        un guardado incremental (se agrega al final del archivo). El
+        guardado se hace sobre una copia que después reemplaza a la salida.
+
+        Si la selección no cambió, reutiliza la salida sin tocarla.
+
+        Devuelve False si conviene reconstruir: demasiados cambios, demasiados
+        guardados incrementales acumulados o una salida que no se puede
+        actualizar en el lugar.
+        """
+        old_ids = [(s["path"], s["sha256"], s.get("copies", 1)) for s in previous.sources]
+        new_ids = [(s["path"], s["sha256"], s["copies"]) for s in sources]
+        matcher = difflib.SequenceMatcher(a=old_ids, b=new_ids, autojunk=False)
+        opcodes = [op for op in matcher.get_opcodes() if op[0] != "equal"]
+
+        if not opcodes:
+            # Nada cambió: la salida sirve tal cual, sin copiarla ni sumar un
+            # guardado. El manifiesto se reescribe para conservar los mtimes
+            # nuevos de fuentes tocadas pero idénticas
+            self._stamp_page_ranges(sources, [s["pages"] for s in previous.sources])
+            if on_progress:
+                on_progress(0, 0)
+            MergeManifest(sources, increments=previous.increments).save(output_path)
+            return True
+
+        changed = sum(max(i2 - i1, j2 - j1) for _, i1, i2, j1, j2 in opcodes)
+        if changed > max(1, len(sources)) * self.incremental_max_changes:
+            return False
+        if previous.increments >= self.incremental_max_saves:
+            return False
+
+        old_starts = [s["start"] for s in previous.sources]
+        old_end = old_starts[-1] + previous.sources[-1]["pages"] if old_starts else 0
+        to_insert = sum(j2 - j1 for _, _, _, j1, j2 in opcodes)
+        inserted = 0
+
+        work_path = _work_path(output_path)
+        try:
+            try:
+                shutil.copyfile(output_path, work_path)
+                result_pdf = fitz.open(work_path)
+            except Exception:
+                return False
+
+            try:
+                if not result_pdf.can_save_incrementally() or result_pdf.page_count != old_end:
+                    return False
+
+                new_pages = [0] * len(sources)
+                # Se aplican de atrás hacia adelante para no correr los índices pendientes
+                for tag, i1, i2, j1, j2 in reversed(opcodes):
+                    start = old_starts[i1] if i1 < len(old_starts) else old_end
+                    if i2 > i1:
+                        end = old_starts[i2] if i2 < len(old_starts) else old_end
+                        result_pdf.delete_pages(from_page=start, to_page=end - 1)
+                    if j2 > j1:
+                        batch = [(s["path"], s["copies"]) for s in sources[j1:j2]]
+
+                        def progress(current, _total):
+                            if on_progress:
+                                on_progress(inserted + current, to_insert)
+
+                        counts = self._insert_sources(result_pdf, batch, start, progress, run)
+                        new_pages[j1:j2] = counts
+                        inserted += len(batch)
+
+                # Las fuentes sin cambios conservan su cantidad de páginas
+                for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                    if tag == "equal":
+                        for k in range(i2 - i1):
+                            new_pages[j1 + k] = previous.sources[i1 + k]["pages"]
+
+                if on_progress:
+                    on_progress(to_insert, to_insert)
+
+                self._save(result_pdf, work_path, run, incremental=True)
+            finally:
+                result_pdf.close()
+            self._commit_output(work_path, output_path, run)
+        finally:
+            _discard(work_path)
+
+        self._stamp_page_ranges(sources, new_pages)
+        MergeManifest(sources, increments=previous.increments + 1).save(output_path)
+        return True
+
+    def _insert_sources(self, result_pdf, entries: List[Tuple[str, int]], start_at: int,
+                        on_progress: callable, run: _MergeRun) -> List[int]:
+        """
+        Inserta las entradas (ruta, copias) en `result_pdf` a partir de la
+        página `start_at` (-1 o el final para agregar). Devuelve las páginas
+        aportadas por cada una, copias incluidas.
+        """
+        total_files = len(entries)
+        page_counts = []
+        position = start_at
+
+        prepared = self._prepare_sources([path for path, _ in entries], run)
+        for i, ((pdf_path, data, error), (_, copies)) in enumerate(zip(prepared, entries)):
+            check_cancelled(run.cancel)
+            if on_progress:
+                on_progress(i, total_files)
+            pages = self._insert_one(result_pdf, pdf_path, data, error, position, run, copies)
+            page_counts.append(pages)
+            position += pages
+        return page_counts
+
+    def _insert_one(self, result_pdf, pdf_path: str, data: bytes, error: Exception,
+                    position: int, run: _MergeRun, copies: int = 1) -> int:
+        """
+        Inserta una fuente preparada en `position` y luego sus copias.
+
+        Las copias se hacen con `fullcopy_page` sobre las páginas ya
+        insertadas: comparten fuentes e imágenes con la original, así que
+        ni se vuelve a leer el archivo ni crecen los recursos de la salida.
+        Devuelve la cantidad total de páginas agregadas.
+        """
+        try:
+            if error is not None:
+                raise error
+            opened = time.perf_counter()
+            # Usamos 'with' para asegurar el cierre del documento fuente
+            with fitz.open(stream=data, filetype="pdf") as pdf_doc:
+                pages = pdf_doc.page_count
+                parsed = time.perf_counter()
+                at_end = position < 0 or position >= result_pdf.page_count
+                first = result_pdf.page_count if at_end else position
+                result_pdf.insert_pdf(pdf_doc, start_at=-1 if at_end else position)
+                run.report["input_bytes"] += len(data)
+
+            insert_at = first + pages
+            for _ in range(copies - 1):
+                for pno in range(first, first + pages):
+                    to = -1 if insert_at >= result_pdf.page_count else insert_at
+                    result_pdf.fullcopy_page(pno, to)
+                    insert_at += 1
+
+            if run.metrics is not None:
+                read_seconds, cached = run.read_timings.pop(pdf_path, (0.0, False))
+                run.metrics.record("file", {
+                    "index": run.file_index,
+                    "path": pdf_path,
+                    "pages": pages * copies,
+                    "copies": copies,
+                    "bytes": len(data),
+                    "cached": cached,
+                    "read_seconds": read_seconds,
+                    "parse_seconds": parsed - opened,
+                    "insert_seconds": time.perf_counter() - parsed,
+                })
+                run.file_index += 1
+            return pages * copies
+        except Exception as e:
+            # Quien llama se encarga de cerrar result_pdf
+            raise MergeError(
+                f"Error al procesar el archivo '{pdf_path}': {e}"
+            )
+
+    @staticmethod
+    def _stamp_page_ranges(sources: List[Dict], page_counts: List[int]) -> None:
+        """Completa 'start' y 'pages' de cada entrada del manifiesto."""
+        start = 0
+        for source, pages in zip(sources, page_counts):
+            source["start"] = start
+            source["pages"] = pages
+            start += pages
+
+    def _prepare_sources(self, pdf_file_paths: List[str],
+                         run: _MergeRun) -> Iterator[Tuple[str, bytes, Exception]]:
+        """
+        Genera (ruta, bytes, error) en el mismo orden de entrada.
+
+        Los aciertos de caché se resuelven en el acto; el resto se prepara
+        en el pool manteniendo una ventana acotada de tareas en vuelo para
+        que la memoria no crezca con el total de archivos.
+
+        Con `prefetch` se usa un pool de hilos aunque haya un solo
+        trabajador: las próximas etiquetas se leen mientras se inserta la
+        actual. En modo "mmap" lo mapeado no va a la caché, para no dejar
+        archivos abiertos (en Windows impedirían reemplazarlos).
+
+        Si hay métricas, el tiempo de preparación de cada archivo (medido en
+        el trabajador) queda en `run.read_timings` para el evento "file".
+        """
+        if self.use_processes:
+            prepare = _normalize_source
+        else:
+            prepare = {"read": _read_source, "bulk": _bulk_read_source, "mmap": _mmap_source}[self.loader]
+        cacheable = self.cache is not None and (self.use_processes or self.loader != "mmap")
+        timed = run.metrics is not None
+
+        if self.workers == 1 and not self.prefetch:
+            for pdf_path in pdf_file_paths:
+                key = self.cache.key_for(pdf_path) if self.cache else None
+                data = self.cache.get(key) if self.cache else None
+                try:
+                    if data is None:
+                        data, seconds = _timed(prepare, pdf_path)
+                        if cacheable:
+                            self.cache.put(key, data)
+                        if timed:
+                            run.read_timings[pdf_path] = (seconds, False)
+                    elif timed:
+                        run.read_timings[pdf_path] = (0.0, True)
+                    yield pdf_path, data, None
+                except Exception as e:
+                    yield pdf_path, None, e
+            return
+
+        executor: Executor
+        if self.use_processes:
+            executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            executor = ThreadPoolExecutor(max_workers=max(self.workers, self.prefetch))
+
+        def submit(pdf_path: str):
+            key = self.cache.key_for(pdf_path) if self.cache else None
+            data = self.cache.get(key) if self.cache else None
+            if data is not None:
+                future = Future()
+                future.set_result((data, 0.0))
+                return pdf_path, key, future, True
+            return pdf_path, key, executor.submit(_timed, prepare, pdf_path), False
+
+        try:
+            pending = deque()
+            paths = iter(pdf_file_paths)
+            window = max(self.workers * 2, self.prefetch)
+
+            for pdf_path in paths:
+                pending.append(submit(pdf_path))
+                if len(pending) >= window:
+                    break
+
+            while pending:
+                pdf_path, key, future, cached = pending.popleft()
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append(submit(next_path))
+                try:
+                    data, seconds = future.result()
+                except Exception as e:
+                    yield pdf_path, None, e
+                    continue
+                if cacheable and not cached:
+                    self.cache.put(key, data)
+                if timed:
+                    run.read_timings[pdf_path] = (seconds, cached)
+                yield pdf_path, data, None
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
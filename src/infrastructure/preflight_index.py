@@ -0,0 +1,163 @@
+# src/infrastructure/preflight_index.py
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from src.core.entities import (
+    PREFLIGHT_CORRUPT, PREFLIGHT_EMPTY, PREFLIGHT_ENCRYPTED, PREFLIGHT_MISSING,
+    PREFLIGHT_NEEDS_REPAIR, PREFLIGHT_OK, PreflightResult
+)
+from src.core.interfaces import IPreflightIndex
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS preflight (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    page_count INTEGER NOT NULL,
+    detail TEXT NOT NULL,
+    checked_at REAL NOT NULL
+);
+"""
+
+# Por debajo de esta cantidad no vale la pena levantar procesos
+_MIN_BATCH_FOR_POOL = 16
+
+
+def inspect_pdf(pdf_path: str) -> Tuple[str, int, str]:
+    """
+    Abre un PDF y determina si se puede fusionar.
+
+    Se ejecuta en los procesos del pool (PyMuPDF no es seguro entre hilos).
+
+    Returns:
+        Tuple[str, int, str]: (estado, páginas, detalle).
+    """
+    import fitz  # PyMuPDF
+    try:
+        with fitz.open(pdf_path) as doc:
+            if doc.needs_pass:
+                return PREFLIGHT_ENCRYPTED, 0, "protegido con contraseña"
+            if doc.page_count == 0:
+                return PREFLIGHT_EMPTY, 0, "no tiene páginas"
+            # Cargar cada página detecta árboles de páginas rotos
+            for page in doc:
+                page.get_contents()
+            if doc.is_repaired:
+                return PREFLIGHT_NEEDS_REPAIR, doc.page_count, "dañado, se reconstruye al abrirlo"
+            return PREFLIGHT_OK, doc.page_count, ""
+    except Exception as e:
+        return PREFLIGHT_CORRUPT, 0, str(e) or type(e).__name__
+
+
+class SQLitePreflightIndex(IPreflightIndex):
+    """
+    Validación previa de etiquetas con los resultados guardados en SQLite.
+
+    Cada resultado queda asociado al tamaño y mtime del archivo: mientras no
+    cambien, `validate` lo devuelve con un `stat` y una consulta, sin abrir
+    el PDF. Los que sí hay que revisar se reparten en un pool de procesos.
+    Pensado para correr en segundo plano sobre todo el catálogo, de modo
+    que al fusionar ya esté todo validado.
+    """
+
+    def __init__(self, index_path: Path, workers: int = 1):
+        """
+        Args:
+            index_path (Path): Archivo SQLite (puede ser el del catálogo).
+            workers (int): Procesos para validar. Con 1 se valida en el
+                hilo que llama.
+        """
+        self.index_path = Path(index_path)
+        self.workers = workers
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def validate(self, pdf_paths: List[str],
+                 on_progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, PreflightResult]:
+        results: Dict[str, PreflightResult] = {}
+        stale: Dict[str, Tuple[str, int, int]] = {}  # ruta absoluta -> (clave, tamaño, mtime)
+
+        with self._lock, self._connect() as conn:
+            for key in pdf_paths:
+                path = os.path.abspath(key)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    results[key] = PreflightResult(path, PREFLIGHT_MISSING, 0, "el archivo no existe")
+                    continue
+                row = conn.execute(
+                    "SELECT size, mtime_ns, status, page_count, detail FROM preflight WHERE path = ?",
+                    (path,)
+                ).fetchone()
+                if row and row[:2] == (st.st_size, st.st_mtime_ns):
+                    results[key] = PreflightResult(path, row[2], row[3], row[4])
+                else:
+                    stale[path] = (key, st.st_size, st.st_mtime_ns)
+
+        if stale:
+            started = time.perf_counter()
+            checked = self._inspect_all(list(stale), on_progress)
+            with self._lock, self._connect() as conn:
+                for path, (status, pages, detail) in checked.items():
+                    key, size, mtime_ns = stale[path]
+                    conn.execute(
+                        "INSERT OR REPLACE INTO preflight "
+                        "(path, size, mtime_ns, status, page_count, detail, checked_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (path, size, mtime_ns, status, pages, detail, time.time())
+                    )
+                    results[key] = PreflightResult(path, status, pages, detail)
+            problems = sum(1 for status, _, _ in checked.values() if status != PREFLIGHT_OK)
+            print(f"Validación previa: {len(checked)} etiqueta(s) revisada(s) en "
+                  f"{time.perf_counter() - started:.2f}s, {problems} con problemas.")
+        return results
+
+    def forget(self, pdf_paths: List[str]) -> None:
+        """Descarta los resultados guardados (por ejemplo, de etiquetas borradas)."""
+        with self._lock, self._connect() as conn:
+            conn.executemany("DELETE FROM preflight WHERE path = ?",
+                             [(os.path.abspath(path),) for path in pdf_paths])
+
+    def _inspect_all(self, paths: List[str],
+                     on_progress: Optional[Callable[[int, int], None]]) -> Dict[str, Tuple[str, int, str]]:
+        total = len(paths)
+        if self.workers == 1 or total < _MIN_BATCH_FOR_POOL:
+            checked = {}
+            for done, path in enumerate(paths, start=1):
+                checked[path] = inspect_pdf(path)
+                if on_progress:
+                    on_progress(done, total)
+            return checked
+
+        checked = {}
+        chunksize = max(1, min(64, total // (self.workers * 4)))
+        # "spawn": no heredar hilos ni el estado de Tk del proceso que llama
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+            for done, (path, result) in enumerate(
+                zip(paths, pool.map(inspect_pdf, paths, chunksize=chunksize)), start=1
+            ):
+                checked[path] = result
+                if on_progress:
+                    on_progress(done, total)
+        return checked
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Abre una conexión, confirma la transacción al salir y la cierra."""
+        conn = sqlite3.connect(self.index_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
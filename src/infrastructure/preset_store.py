@@ -0,0 +1,261 @@
+# src/infrastructure/preset_store.py
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from src.core.entities import MergePlan, PreflightResult, SelectionPreset
+from src.core.interfaces import IPreflightIndex, IPresetStore
+from src.core.selection import normalize_selection
+from src.infrastructure.merge_manifest import file_sha256
+
+PRESETS_VERSION = 1
+PLANS_VERSION = 1
+
+
+def _pdfs_in(directory: str) -> List[str]:
+    return sorted(
+        entry.path for entry in os.scandir(directory)
+        if entry.is_file() and entry.name.lower().endswith(".pdf")
+    )
+
+
+def resolve_preset(input_dir: Path, preset: SelectionPreset) -> Tuple[List[Tuple[str, int]], Dict[str, int]]:
+    """
+    Convierte un preset en pares (ruta, copias) y las carpetas a vigilar.
+
+    Las carpetas a vigilar son las que, si cambian (se agrega o quita una
+    etiqueta), pueden cambiar el resultado: la de cada categoría y, para
+    los patrones, la raíz y todas las categorías. Su mtime se toma antes de
+    listarlas, así un cambio durante la lectura invalida el plan.
+
+    Raises:
+        ValueError: Si una categoría no existe o un patrón no encuentra nada.
+    """
+    root = str(input_dir)
+    entries: List[Tuple[str, int]] = []
+    watched: Dict[str, int] = {}
+    for category in preset.categories:
+        category_dir = os.path.join(root, category)
+        if not os.path.isdir(category_dir):
+            raise ValueError(f"La categoría '{category}' del preset '{preset.name}' no existe.")
+        watched[category_dir] = os.stat(category_dir).st_mtime_ns
+        entries += [(path, 1) for path in _pdfs_in(category_dir)]
+    if preset.globs:
+        watched[root] = os.stat(root).st_mtime_ns
+        for entry in os.scandir(root):
+            if entry.is_dir() and not entry.name.startswith("."):
+                watched[entry.path] = entry.stat().st_mtime_ns
+    for pattern in preset.globs:
+        matches = sorted(
+            p for p in Path(root).glob(pattern)
+            if p.is_file() and p.suffix.lower() == ".pdf"
+            and not any(part.startswith(".") for part in p.relative_to(root).parts)
+        )
+        if not matches:
+            raise ValueError(f"El patrón '{pattern}' del preset '{preset.name}' no coincide con ninguna etiqueta.")
+        entries += [(str(p), 1) for p in matches]
+    for path, copies in normalize_selection([
+        tuple(entry) if isinstance(entry, list) else entry for entry in preset.files
+    ]):
+        entries.append((os.path.join(root, path), copies))  # las absolutas se conservan
+    return entries, watched
+
+
+class JsonPresetStore(IPresetStore):
+    """
+    Presets de selección guardados en un JSON junto a `config.ini`, con sus
+    planes de fusión compilados en caché (`_SALIDA/.planes.json`).
+
+    Compilar un preset recorre sus categorías, calcula el SHA-256 de cada
+    etiqueta y la valida (páginas, contraseña, daños) con el índice de
+    validación previa. El plan guarda el tamaño y mtime de cada fuente y de
+    las carpetas involucradas; mientras ninguno cambie, usarlo de nuevo solo
+    cuesta un `stat` por archivo.
+    """
+
+    def __init__(self, presets_file: Path, input_dir: Path, plans_file: Path,
+                 preflight: IPreflightIndex):
+        """
+        Args:
+            presets_file (Path): JSON con los presets (se crea al guardar).
+            input_dir (Path): Carpeta `_ETIQUETAS_PDFS`.
+            plans_file (Path): JSON con los planes compilados.
+            preflight (IPreflightIndex): Valida las etiquetas al compilar.
+        """
+        self.presets_file = Path(presets_file)
+        self.input_dir = Path(input_dir)
+        self.plans_file = Path(plans_file)
+        self.preflight = preflight
+        self._lock = threading.Lock()
+
+    # --- Presets ---
+
+    def list_presets(self) -> List[SelectionPreset]:
+        with self._lock:
+            data = self._read_presets()
+        return [self._from_dict(name, spec) for name, spec in sorted(data.items())]
+
+    def save_preset(self, preset: SelectionPreset) -> None:
+        if not preset.name.strip():
+            raise ValueError("El preset necesita un nombre.")
+        if not (preset.categories or preset.globs or preset.files):
+            raise ValueError("El preset no incluye ninguna etiqueta.")
+        with self._lock:
+            data = self._read_presets()
+            data[preset.name] = self._to_dict(preset)
+            self._write_json(self.presets_file, {"version": PRESETS_VERSION, "presets": data})
+
+    def delete_preset(self, name: str) -> None:
+        with self._lock:
+            data = self._read_presets()
+            if data.pop(name, None) is None:
+                return
+            self._write_json(self.presets_file, {"version": PRESETS_VERSION, "presets": data})
+            plans = self._read_plans()
+            if plans.pop(name, None) is not None:
+                self._write_json(self.plans_file, {"version": PLANS_VERSION, "plans": plans})
+
+    # --- Planes ---
+
+    def compile_plan(self, name: str) -> MergePlan:
+        with self._lock:
+            spec = self._read_presets().get(name)
+            if spec is None:
+                raise ValueError(f"No existe el preset '{name}'.")
+            plans = self._read_plans()
+            cached = plans.get(name)
+            if cached is not None and cached["preset"] == spec and self._is_fresh(cached):
+                return self._to_plan(name, cached, reused=True)
+
+            entries, watched = resolve_preset(self.input_dir, self._from_dict(name, spec))
+            if not entries:
+                raise ValueError(f"El preset '{name}' no incluye ninguna etiqueta.")
+            compiled = self._compile(spec, entries, watched, cached)
+            plans[name] = compiled
+            self._write_json(self.plans_file, {"version": PLANS_VERSION, "plans": plans})
+            return self._to_plan(name, compiled, reused=False)
+
+    def _compile(self, spec: Dict, entries: List[Tuple[str, int]], dirs: Dict[str, int],
+                 previous: Optional[Dict]) -> Dict:
+        # Hashes del plan anterior para las fuentes que no cambiaron
+        known = {}
+        for source in (previous or {}).get("sources", []):
+            known[(source["path"], source["size"], source["mtime_ns"])] = source["sha256"]
+
+        paths = list(dict.fromkeys(path for path, _ in entries))
+        results = self.preflight.validate(paths)
+        sources, skipped = [], []
+        for path, copies in entries:
+            result = results[path]
+            if not result.usable:
+                skipped.append({"path": path, "status": result.status, "detail": result.detail})
+                continue
+            st = os.stat(path)
+            key = (path, st.st_size, st.st_mtime_ns)
+            sources.append({
+                "path": path, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                "sha256": known.get(key) or file_sha256(path),
+                "pages": result.page_count, "status": result.status, "copies": copies,
+            })
+
+        # Los omitidos también se vigilan: si los arreglan, el plan se recompila
+        stamps = {}
+        for item in skipped:
+            try:
+                st = os.stat(item["path"])
+                stamps[item["path"]] = [st.st_size, st.st_mtime_ns]
+            except OSError:
+                stamps[item["path"]] = None
+
+        fingerprint = hashlib.sha256("\n".join(
+            f"{source['sha256']}:{source['copies']}" for source in sources
+        ).encode("utf-8")).hexdigest()
+        return {"preset": spec, "dirs": dirs, "sources": sources, "skipped": skipped,
+                "skipped_stamps": stamps, "fingerprint": fingerprint}
+
+    @staticmethod
+    def _is_fresh(plan: Dict) -> bool:
+        """True si ninguna carpeta ni fuente del plan cambió desde que se compiló."""
+        try:
+            for directory, mtime_ns in plan["dirs"].items():
+                if os.stat(directory).st_mtime_ns != mtime_ns:
+                    return False
+            for source in plan["sources"]:
+                st = os.stat(source["path"])
+                if (st.st_size, st.st_mtime_ns) != (source["size"], source["mtime_ns"]):
+                    return False
+        except OSError:
+            return False
+        for path, stamp in plan["skipped_stamps"].items():
+            try:
+                st = os.stat(path)
+                current = [st.st_size, st.st_mtime_ns]
+            except OSError:
+                current = None
+            if current != stamp:
+                return False
+        return True
+
+    @staticmethod
+    def _to_plan(name: str, plan: Dict, reused: bool) -> MergePlan:
+        return MergePlan(
+            name=name,
+            # Pares (ruta, copias) solo cuando hay más de una copia
+            entries=[s["path"] if s["copies"] == 1 else (s["path"], s["copies"]) for s in plan["sources"]],
+            skipped=[PreflightResult(s["path"], s["status"], 0, s["detail"]) for s in plan["skipped"]],
+            total_pages=sum(s["pages"] * s["copies"] for s in plan["sources"]),
+            fingerprint=plan["fingerprint"],
+            reused=reused,
+        )
+
+    # --- Persistencia ---
+
+    @staticmethod
+    def _to_dict(preset: SelectionPreset) -> Dict:
+        return {
+            "categories": list(preset.categories),
+            "globs": list(preset.globs),
+            "files": [list(entry) if isinstance(entry, tuple) else entry for entry in preset.files],
+        }
+
+    @staticmethod
+    def _from_dict(name: str, spec: Dict) -> SelectionPreset:
+        return SelectionPreset(
+            name=name,
+            categories=tuple(spec.get("categories", ())),
+            globs=tuple(spec.get("globs", ())),
+            files=tuple(tuple(entry) if isinstance(entry, list) else entry for entry in spec.get("files", ())),
+        )
+
+    def _read_presets(self) -> Dict[str, Dict]:
+        data = self._read_json(self.presets_file)
+        presets = data.get("presets", {}) if isinstance(data, dict) else {}
+        # Normalizado igual que al guardar, para comparar con el plan en caché
+        return {name: self._to_dict(self._from_dict(name, spec)) for name, spec in presets.items()}
+
+    def _read_plans(self) -> Dict[str, Dict]:
+        data = self._read_json(self.plans_file)
+        if not isinstance(data, dict) or data.get("version") != PLANS_VERSION:
+            return {}
+        return data.get("plans", {})
+
+    @staticmethod
+    def _read_json(path: Path) -> Dict:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"No se pudo leer '{path.name}': {e}")
+            return {}
+
+    @staticmethod
+    def _write_json(path: Path, data: Dict) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
@@ -1,65 +1,291 @@
 # src/infrastructure/smtp_email_service.py
+import contextlib
+import re
 import smtplib
-import ssl
-from email.message import EmailMessage
-from email.mime.application import MIMEApplication
-from typing import Dict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from src.core.interfaces import IEmailService
+from src.core.jobs import CancellationToken, check_cancelled
+from src.infrastructure.mime_stream import StreamingAttachmentMessage
+from src.infrastructure.pdf_attachment import prepare_attachments
+from src.infrastructure.smtp_pool import SMTPConnectionPool
 from pathlib import Path
 
-from src.core.exceptions import EmailError
+from src.core.exceptions import EmailError, OperationCancelled
+
+
+def parse_recipients(value: str) -> List[str]:
+    """
+    Separa una lista de destinatarios escrita en una sola línea.
+
+    Acepta comas, punto y coma o espacios como separador y descarta
+    repetidos conservando el orden ("a@x.com, b@x.com; a@x.com").
+    """
+    recipients = []
+    for address in re.split(r"[,;\s]+", value or ""):
+        if address and address not in recipients:
+            recipients.append(address)
+    return recipients
+
 
 class SMTPEmailService(IEmailService):
     """
     Implementación concreta de IEmailService usando smtplib de Python.
-    
+
     Se especializa en conectarse a Gmail y enviar un adjunto.
+
+    `EMAIL_RECEPTOR` puede tener varios destinatarios separados por comas;
+    cada uno recibe su propio mensaje (las sucursales no ven las direcciones
+    de las demás). Los mensajes salen por conexiones autenticadas de un
+    `SMTPConnectionPool`, que se conservan entre envíos. Como mucho
+    `max_connections` mensajes viajan en paralelo.
+
+    El adjunto nunca se carga entero en memoria: se lee por bloques, se
+    codifica en base64 y se escribe en el socket a medida que se envía.
+    Si supera `max_attachment_bytes` se recomprime o se parte por páginas
+    en varios mensajes (ver `prepare_attachments`).
     """
 
-    def send_email_with_attachment(self, config: Dict[str, str], file_path: str) -> None:
+    def __init__(self, host: str = "smtp.gmail.com", port: int = 465, use_ssl: bool = True,
+                 starttls: bool = False, max_connections: int = 2,
+                 keepalive_interval: float = 10.0, idle_timeout: float = 120.0,
+                 timeout: float = 30.0, max_attachment_bytes: Optional[int] = None,
+                 oversize: str = "compress_then_split"):
+        """
+        Args:
+            host (str): Servidor SMTP (se puede cambiar con SMTP_HOST en config.ini).
+            port (int): Puerto (SMTP_PORT).
+            use_ssl (bool): SSL desde el inicio, como pide Gmail en el 465 (SMTP_SSL).
+            starttls (bool): STARTTLS tras conectar en claro (SMTP_STARTTLS).
+            max_connections (int): Conexiones (y envíos) simultáneos por servidor.
+            keepalive_interval (float): Ver `SMTPConnectionPool`.
+            idle_timeout (float): Ver `SMTPConnectionPool`.
+            timeout (float): Timeout de socket.
+            max_attachment_bytes (int, optional): Tamaño máximo del PDF por
+                mensaje (Gmail acepta 25 MB ya codificados, ~18 MB de PDF).
+            oversize (str): Qué hacer si se supera: "compress", "split",
+                "compress_then_split" o "error".
+        """
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.max_connections = max_connections
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.max_attachment_bytes = max_attachment_bytes
+        self.oversize = oversize
+        self._pools: Dict[Tuple, SMTPConnectionPool] = {}
+        self._lock = threading.Lock()
+
+    def send_email_with_attachment(self, config: Dict[str, str], file_path: str,
+                                   cancel: Optional[CancellationToken] = None) -> Dict:
         """
-        Envía un email con un archivo adjunto usando Gmail.
-        
+        Envía un email con un archivo adjunto a cada destinatario de
+        `EMAIL_RECEPTOR`.
+
         Args:
-            config (Dict[str, str]): Diccionario con credenciales y destinatario.
+            config (Dict[str, str]): Diccionario con credenciales y destinatario(s).
             file_path (str): Ruta al archivo que se debe adjuntar.
-            
+            cancel (CancellationToken, optional): Se consulta antes de cada
+                mensaje y entre bloque y bloque del adjunto. Un mensaje
+                cortado a mitad se descarta cerrando la conexión antes del
+                punto final, así que el servidor no lo entrega.
+
+        Returns:
+            Dict: Reporte de este envío (destinatarios, partes, conexiones
+                nuevas y la latencia de cada mensaje).
+
         Raises:
-            EmailError: Si falla la conexión, autenticación o envío.
+            EmailError: Si falla la conexión, autenticación o el envío a
+                algún destinatario (los demás se envían igual).
+            OperationCancelled: Si se canceló (lo ya entregado, entregado queda).
         """
-        
-        # Crear el objeto del mensaje
-        msg = EmailMessage()
-        msg['Subject'] = config['ASUNTO']
-        msg['From'] = config['EMAIL_EMISOR']
-        msg['To'] = config['EMAIL_RECEPTOR']
-        msg.set_content("Adjunto se encuentra el PDF de etiquetas generado.")
-
-        # Adjuntar el archivo PDF
+        started = time.perf_counter()
+        recipients = parse_recipients(config['EMAIL_RECEPTOR'])
+        if not recipients:
+            raise EmailError("No hay destinatarios en EMAIL_RECEPTOR.")
+
+        if not Path(file_path).is_file():
+            raise EmailError(f"Error al leer el archivo adjunto: '{file_path}' no existe.")
+        pool = self._pool_for(config)
+        opened_before = pool.connections_opened
+
         try:
-            with open(file_path, "rb") as f:
-                file_data = f.read()
-                file_name = Path(file_path).name
-                msg.add_attachment(file_data, 
-                                   maintype="application", 
-                                   subtype="octet-stream", 
-                                   filename=file_name)
-        except Exception as e:
+            with contextlib.ExitStack() as stack:
+                parts = self._prepare_attachments(stack, file_path)
+                messages = self._send_parts(pool, config, recipients, parts, cancel)
+        except OSError as e:
             raise EmailError(f"Error al leer el archivo adjunto: {e}")
 
-        # Enviar el correo usando un contexto SSL seguro
-        context = ssl.create_default_context()
-        
-        try:
-            with smtplib.SMTP_SSL("smtp.gmail.com", 465, context=context) as server:
-                server.login(config['EMAIL_EMISOR'], config['APP_PASSWORD'])
-                server.send_message(msg)
-                
-        except smtplib.SMTPAuthenticationError:
+        failed = [m for m in messages if not m["ok"]]
+        if len(failed) == len(messages):
+            raise EmailError(failed[0]["error"])
+        if failed:
             raise EmailError(
-                "Error de autenticación. Revisa EMAIL_EMISOR o APP_PASSWORD en config.ini"
+                "No se pudo enviar a: " + ", ".join(f"{m['to']} ({m['error']})" for m in failed)
             )
-        except smtplib.SMTPServerDisconnected:
-            raise EmailError("Se perdió la conexión con el servidor de Google.")
+        return {
+            "recipients": len(recipients),
+            "parts": max(m["part"] for m in messages),
+            "connections_opened": pool.connections_opened - opened_before,
+            "messages": messages,
+            "total_seconds": time.perf_counter() - started,
+        }
+
+    def _prepare_attachments(self, stack: contextlib.ExitStack, file_path: str) -> List[str]:
+        """
+        Prepara el adjunto (recomprimido o partido si hace falta) y deja su
+        limpieza a cargo de `stack`.
+
+        Raises:
+            EmailError: Si el PDF está dañado y PyMuPDF no puede recomprimirlo
+                o partirlo, o si el modo de `oversize` no es válido.
+        """
+        try:
+            return stack.enter_context(
+                prepare_attachments(file_path, self.max_attachment_bytes, self.oversize)
+            )
+        except (EmailError, OSError):
+            raise
         except Exception as e:
-            raise EmailError(f"Error desconocido al enviar el email: {e}")
+            # fitz lanza RuntimeError/ValueError con un PDF dañado
+            raise EmailError(f"No se pudo preparar el adjunto '{Path(file_path).name}': {e}")
+
+    def _send_parts(self, pool: SMTPConnectionPool, config: Dict[str, str],
+                    recipients: List[str], parts: List[str],
+                    cancel: Optional[CancellationToken] = None) -> List[Dict]:
+        """Envía cada parte a cada destinatario; devuelve la latencia de cada mensaje."""
+        body = "Adjunto se encuentra el PDF de etiquetas generado."
+        messages = []
+        for index, part in enumerate(parts, start=1):
+            subject = config['ASUNTO']
+            if len(parts) > 1:
+                subject = f"{subject} (parte {index} de {len(parts)})"
+            messages.append(StreamingAttachmentMessage(
+                config['EMAIL_EMISOR'], subject, body, part,
+                filename=Path(part).name if len(parts) > 1 else None
+            ))
+
+        jobs = [(recipient, index, message)
+                for recipient in recipients
+                for index, message in enumerate(messages, start=1)]
+
+        def send_one(job) -> Dict:
+            recipient, index, message = job
+            check_cancelled(cancel)
+            sent_at = time.perf_counter()
+            try:
+                self._send_with_retry(pool, config['EMAIL_EMISOR'], recipient, message, cancel)
+                return {"to": recipient, "part": index, "ok": True,
+                        "seconds": time.perf_counter() - sent_at}
+            except EmailError as e:
+                return {"to": recipient, "part": index, "ok": False, "error": str(e),
+                        "seconds": time.perf_counter() - sent_at}
+
+        workers = min(self.max_connections, len(jobs))
+        if workers == 1:
+            return [send_one(job) for job in jobs]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smtp") as executor:
+            return list(executor.map(send_one, jobs))
+
+    def close(self) -> None:
+        """Cierra las conexiones que quedaron abiertas."""
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close_all()
+
+    def _pool_for(self, config: Dict[str, str]) -> SMTPConnectionPool:
+        host = config.get('SMTP_HOST') or self.host
+        port = int(config.get('SMTP_PORT') or self.port)
+        use_ssl = _flag(config.get('SMTP_SSL'), self.use_ssl)
+        starttls = _flag(config.get('SMTP_STARTTLS'), self.starttls)
+        key = (host, port, use_ssl, starttls, config['EMAIL_EMISOR'], config['APP_PASSWORD'])
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = SMTPConnectionPool(
+                    host, port, config['EMAIL_EMISOR'], config['APP_PASSWORD'],
+                    use_ssl=use_ssl, starttls=starttls, max_size=self.max_connections,
+                    keepalive_interval=self.keepalive_interval,
+                    idle_timeout=self.idle_timeout, timeout=self.timeout
+                )
+                self._pools[key] = pool
+            return pool
+
+    @staticmethod
+    def _send_with_retry(pool: SMTPConnectionPool, sender: str, recipient: str,
+                         message: StreamingAttachmentMessage,
+                         cancel: Optional[CancellationToken] = None) -> None:
+        """Envía un mensaje; si la conexión prestada estaba muerta, reintenta una vez."""
+        for attempt in range(2):
+            try:
+                server = pool.acquire()
+            except smtplib.SMTPAuthenticationError:
+                raise EmailError(
+                    "Error de autenticación. Revisa EMAIL_EMISOR o APP_PASSWORD en config.ini"
+                )
+            except (smtplib.SMTPException, OSError) as e:
+                raise EmailError(f"No se pudo conectar con el servidor de correo: {e}")
+            try:
+                _stream_message(server, sender, recipient, message, cancel)
+            except OperationCancelled:
+                # A mitad del DATA: se corta el socket sin QUIT y el servidor descarta el mensaje
+                server.close()
+                pool.release(server, broken=True)
+                raise
+            except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                pool.release(server, broken=True)
+                if attempt == 0:
+                    continue
+                raise EmailError("Se perdió la conexión con el servidor de correo.")
+            except smtplib.SMTPRecipientsRefused:
+                pool.release(server)
+                raise EmailError(f"El servidor rechazó el destinatario '{recipient}'.")
+            except OSError as e:
+                # No se pudo leer el adjunto a mitad del DATA: la sesión quedó inservible
+                pool.release(server, broken=True)
+                raise EmailError(f"Error al leer el archivo adjunto: {e}")
+            except Exception as e:
+                pool.release(server, broken=True)
+                raise EmailError(f"Error desconocido al enviar el email: {e}")
+            pool.release(server)
+            return
+
+
+def _stream_message(server: smtplib.SMTP, sender: str, recipient: str,
+                    message: StreamingAttachmentMessage,
+                    cancel: Optional[CancellationToken] = None) -> None:
+    """
+    Equivalente a `server.sendmail`, pero escribe el cuerpo en el socket a
+    medida que se genera en lugar de recibirlo completo en memoria.
+    """
+    code, response = server.mail(sender)
+    if code != 250:
+        server.rset()
+        raise smtplib.SMTPSenderRefused(code, response, sender)
+    code, response = server.rcpt(recipient)
+    if code not in (250, 251):
+        server.rset()
+        raise smtplib.SMTPRecipientsRefused({recipient: (code, response)})
+    code, response = server.docmd("data")
+    if code != 354:
+        server.rset()
+        raise smtplib.SMTPDataError(code, response)
+    for chunk in message.iter_chunks(recipient):
+        check_cancelled(cancel)
+        server.send(chunk)
+    server.send(b".\r\n")
+    code, response = server.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, response)
+
+
+def _flag(value: Optional[str], default: bool) -> bool:
+    if value is None or value == "":
+        return default
+    return str(value).strip().lower() in ("1", "true", "yes", "si", "sí", "on")
@@ -0,0 +1,132 @@
+# src/infrastructure/smtp_pool.py
+import smtplib
+import ssl
+import threading
+import time
+from typing import List, Tuple
+
+
+class SMTPConnectionPool:
+    """
+    Conexiones SMTP autenticadas y reutilizables contra un mismo servidor.
+
+    Abrir una conexión con Gmail cuesta un handshake TLS más el `login`;
+    el pool las mantiene abiertas entre envíos. Antes de prestar una
+    conexión que estuvo ociosa más de `keepalive_interval` segundos le
+    manda un NOOP; si el servidor ya la cerró, la descarta y abre otra.
+    Las conexiones ociosas más de `idle_timeout` se cierran sin probarlas.
+    """
+
+    def __init__(self, host: str, port: int, user: str, password: str,
+                 use_ssl: bool = True, starttls: bool = False, max_size: int = 2,
+                 keepalive_interval: float = 10.0, idle_timeout: float = 120.0,
+                 timeout: float = 30.0):
+        """
+        Args:
+            host (str): Servidor SMTP.
+            port (int): Puerto (465 para SSL directo, 587 para STARTTLS).
+            user (str): Usuario para el `login`.
+            password (str): Contraseña (de aplicación, en Gmail).
+            use_ssl (bool): Conectar con SSL desde el inicio (SMTP_SSL).
+            starttls (bool): Pasar a TLS con STARTTLS tras conectar en claro.
+            max_size (int): Conexiones abiertas como máximo a la vez.
+            keepalive_interval (float): Segundos ociosa tras los que se
+                verifica con NOOP antes de reutilizarla.
+            idle_timeout (float): Segundos ociosa tras los que se cierra.
+            timeout (float): Timeout de socket de cada conexión.
+        """
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.max_size = max_size
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.connections_opened = 0
+
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> smtplib.SMTP:
+        """
+        Presta una conexión lista para enviar; si todas están en uso y se
+        llegó a `max_size`, espera a que se libere una.
+
+        Raises:
+            smtplib.SMTPException, OSError: Si no se puede conectar o autenticar.
+        """
+        with self._cond:
+            while not self._idle and self._in_use >= self.max_size:
+                self._cond.wait()
+            candidate = self._idle.pop() if self._idle else None
+            self._in_use += 1
+
+        try:
+            if candidate is not None:
+                conn, idle_since = candidate
+                if self._is_alive(conn, time.monotonic() - idle_since):
+                    return conn
+                self._close(conn)
+            return self._open()
+        except BaseException:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, conn: smtplib.SMTP, broken: bool = False) -> None:
+        """Devuelve una conexión al pool (o la cierra si quedó inutilizable)."""
+        if broken:
+            self._close(conn)
+        with self._cond:
+            self._in_use -= 1
+            if not broken:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self) -> None:
+        """Cierra las conexiones ociosas (las prestadas se cierran al devolverlas)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._close(conn)
+
+    def _is_alive(self, conn: smtplib.SMTP, idle_seconds: float) -> bool:
+        if idle_seconds > self.idle_timeout:
+            return False
+        if idle_seconds < self.keepalive_interval:
+            return True
+        try:
+            return conn.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _open(self) -> smtplib.SMTP:
+        context = ssl.create_default_context()
+        if self.use_ssl:
+            conn = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout, context=context)
+        else:
+            conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.ehlo()
+            if self.starttls:
+                conn.starttls(context=context)
+                conn.ehlo()
+            conn.login(self.user, self.password)
+        except BaseException:
+            self._close(conn)
+            raise
+        with self._cond:
+            self.connections_opened += 1
+        return conn
+
+    @staticmethod
+    def _close(conn: smtplib.SMTP) -> None:
+        try:
+            conn.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.close()
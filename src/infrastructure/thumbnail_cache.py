@@ -0,0 +1,197 @@
+# src/infrastructure/thumbnail_cache.py
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from src.core.interfaces import IThumbnailProvider
+from src.infrastructure.merge_manifest import file_sha256
+
+
+def render_thumbnail(pdf_path: str, png_path: str, max_side: int) -> int:
+    """
+    Dibuja la primera página de `pdf_path` en un PNG cuyo lado mayor mide
+    `max_side` píxeles. Corre en los procesos del pool.
+
+    Returns:
+        int: Tamaño del PNG en bytes.
+    """
+    import fitz  # PyMuPDF
+    with fitz.open(pdf_path) as doc:
+        page = doc[0]
+        zoom = max_side / max(page.rect.width, page.rect.height)
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    tmp_path = f"{png_path}.{os.getpid()}.tmp"
+    pixmap.save(tmp_path, output="png")
+    os.replace(tmp_path, png_path)
+    return os.path.getsize(png_path)
+
+
+class ThumbnailCache(IThumbnailProvider):
+    """
+    Miniaturas de etiquetas guardadas en disco, generadas en segundo plano.
+
+    Las imágenes se nombran por el SHA-256 del contenido del PDF, así que
+    sobreviven a renombres y se comparten entre copias idénticas. Cuando la
+    carpeta supera `max_bytes` se borran las menos usadas (cada acierto
+    actualiza la fecha del archivo, que ordena la expulsión también entre
+    sesiones).
+
+    Los pedidos se atienden en orden inverso (el último pedido, que es lo
+    que está en pantalla, primero) por unos pocos hilos; cada uno dibuja en
+    un proceso aparte porque PyMuPDF no es seguro entre hilos.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 64 * 1024 * 1024,
+                 max_side: int = 240, workers: int = 2, use_processes: bool = True):
+        """
+        Args:
+            cache_dir (Path): Carpeta de las miniaturas (se crea si no existe).
+            max_bytes (int): Tamaño máximo de la carpeta.
+            max_side (int): Lado mayor de cada miniatura, en píxeles.
+            workers (int): Miniaturas que se dibujan a la vez.
+            use_processes (bool): Dibujar en procesos aparte (False solo
+                para los tests: dibuja en los hilos).
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_side = max_side
+        self.workers = workers
+        self.use_processes = use_processes
+        self.rendered = 0
+        self.hits = 0
+
+        self._lock = threading.Condition()
+        self._queue: Deque[str] = deque()
+        self._waiting: Dict[str, List[Callable[[str, Optional[str]], None]]] = {}
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}  # ruta -> (tamaño, mtime, hash)
+        self._threads: List[threading.Thread] = []
+        self._pool: Optional[Executor] = None
+        self._closed = False
+
+        # Índice LRU de la carpeta: el más antiguo primero
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".png"):
+                st = entry.stat()
+                entries.append((st.st_mtime, entry.name, st.st_size))
+        self._files: "OrderedDict[str, int]" = OrderedDict(
+            (name, size) for _, name, size in sorted(entries)
+        )
+        self._total_bytes = sum(self._files.values())
+
+    # --- IThumbnailProvider ---
+
+    def request(self, pdf_path: str, on_ready: Callable[[str, Optional[str]], None]) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            if pdf_path in self._waiting:
+                self._waiting[pdf_path].append(on_ready)
+                # Volver a pedirlo lo adelanta en la fila
+                try:
+                    self._queue.remove(pdf_path)
+                    self._queue.append(pdf_path)
+                except ValueError:
+                    pass  # ya se está dibujando
+                return
+            self._waiting[pdf_path] = [on_ready]
+            self._queue.append(pdf_path)
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._run, name="Miniaturas", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._lock.notify()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._queue.clear()
+            self._waiting.clear()
+            self._lock.notify_all()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # --- Trabajo en segundo plano ---
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._queue and not self._closed:
+                    self._lock.wait()
+                if self._closed:
+                    return
+                pdf_path = self._queue.pop()  # LIFO: lo último pedido es lo visible
+            png_path = None
+            try:
+                png_path = self._thumbnail_for(pdf_path)
+            except Exception as e:
+                print(f"No se pudo generar la miniatura de '{Path(pdf_path).name}': {e}")
+            with self._lock:
+                callbacks = self._waiting.pop(pdf_path, [])
+            for callback in callbacks:
+                try:
+                    callback(pdf_path, png_path)
+                except Exception as e:
+                    print(f"Error al entregar la miniatura: {e}")
+
+    def _thumbnail_for(self, pdf_path: str) -> str:
+        name = f"{self._content_hash(pdf_path)}_{self.max_side}.png"
+        png_path = self.cache_dir / name
+        with self._lock:
+            cached = name in self._files
+            if cached:
+                self._files.move_to_end(name)
+        if cached and png_path.exists():
+            self.hits += 1
+            os.utime(png_path)
+            return str(png_path)
+
+        if self.use_processes:
+            size = self._get_pool().submit(render_thumbnail, pdf_path, str(png_path), self.max_side).result()
+        else:
+            size = render_thumbnail(pdf_path, str(png_path), self.max_side)
+        self.rendered += 1
+        with self._lock:
+            self._total_bytes += size - self._files.get(name, 0)
+            self._files[name] = size
+            self._files.move_to_end(name)
+            evicted = self._evict()
+        for old in evicted:
+            try:
+                os.remove(self.cache_dir / old)
+            except OSError:
+                pass
+        return str(png_path)
+
+    def _evict(self) -> List[str]:
+        """Saca del índice las miniaturas menos usadas hasta entrar en `max_bytes`."""
+        evicted = []
+        # La recién agregada (la última) nunca se expulsa
+        while self._total_bytes > self.max_bytes and len(self._files) > 1:
+            name, size = self._files.popitem(last=False)
+            self._total_bytes -= size
+            evicted.append(name)
+        return evicted
+
+    def _content_hash(self, pdf_path: str) -> str:
+        st = os.stat(pdf_path)
+        known = self._hashes.get(pdf_path)
+        if known and known[:2] == (st.st_size, st.st_mtime_ns):
+            return known[2]
+        content_hash = file_sha256(pdf_path)
+        self._hashes[pdf_path] = (st.st_size, st.st_mtime_ns, content_hash)
+        return content_hash
+
+    def _get_pool(self) -> Executor:
+        with self._lock:
+            if self._pool is None:
+                # "spawn": no heredar hilos ni el estado de Tk del proceso que llama
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
@@ -4,13 +4,24 @@ import os
 import sys
 import threading
 import subprocess
-import tkinter.messagebox
+import tkinter
+from tkinter import filedialog, messagebox, simpledialog
 import tkinter.ttk as ttk
 import configparser
-from PIL import Image
 from pathlib import Path
-from src.core.exceptions import MergeError, EmailError
-from typing import Callable, Dict, List, Tuple
+from src.core.exceptions import MergeError, EmailError, OperationCancelled
+from src.core.entities import CatalogEvent, MergePlan, PreflightReport
+from src.core.metrics import ThroughputMeter, format_throughput
+from src.core.interfaces import (
+    ICatalogWatcher, IEmailOutbox, ILabelCatalog, IPreflightIndex, IPresetStore, IThumbnailProvider
+)
+from src.core.jobs import JOB_CANCELLED, LANE_HEAVY, LANE_QUICK, Job, JobScheduler
+from src.core.progress import ProgressChannel
+from src.core.use_cases import plan_preset_use_case, preflight_pdfs_use_case
+from src.interface.catalog_list import VirtualCatalogList
+from src.interface.catalog_view_model import CatalogViewModel
+from src.interface.startup_profiler import StartupProfiler
+from typing import Callable, Dict, List, Optional
 
 # Paleta de colores
 PALETTE = {
@@ -24,18 +35,7 @@ PALETTE = {
     "error": "#FF0000"
 }
 CHECKBOX_COLUMNS = 3
-
-
-class CategoryCard(customtkinter.CTkFrame):
-    """
-    Una Tarjeta de widget personalizada que encapsula una categoría.
-    Se ha simplificado para mejorar el rendimiento del scroll.
-    """
-    def __init__(self, master, *args, **kwargs):
-        super().__init__(master, 
-                         fg_color=PALETTE["bg_light"], 
-                         corner_radius=10, 
-                         *args, **kwargs)
+PRESET_PLACEHOLDER = "Presets..."
 
 
 class App(customtkinter.CTk):
@@ -51,10 +51,30 @@ class App(customtkinter.CTk):
         output_dir: Path,
         logo_file: Path,
         config_file: Path,
+        label_catalog: Optional[ILabelCatalog] = None,
+        catalog_watcher: Optional[ICatalogWatcher] = None,
+        startup_profiler: Optional[StartupProfiler] = None,
+        on_ready: Optional[Callable] = None,
+        preflight_index: Optional[IPreflightIndex] = None,
+        thumbnails: Optional[IThumbnailProvider] = None,
+        preset_store: Optional[IPresetStore] = None,
+        scheduler: Optional[JobScheduler] = None,
         *args, 
         **kwargs
     ):
-        """Inicializa la ventana principal de la aplicación."""
+        """
+        Inicializa la ventana principal de la aplicación.
+
+        Solo se construyen los widgets; el logo, el catálogo y el observador
+        se cargan después de que la ventana aparece en pantalla, y al
+        terminar se llama a `on_ready`. Con `preflight_index`, después se
+        validan en segundo plano todas las etiquetas del catálogo. Con
+        `thumbnails`, la lista muestra una vista previa de cada etiqueta.
+        Con `preset_store`, la barra superior permite guardar la selección
+        como preset y volver a cargarla. Las fusiones y los envíos corren en
+        `scheduler` (si no se pasa, se crea uno de dos hilos) y la fusión en
+        curso se puede cancelar.
+        """
         super().__init__(*args, **kwargs)
 
         # Inyección de Dependencias
@@ -65,13 +85,37 @@ class App(customtkinter.CTk):
         self.output_file = output_dir / "etiquetas_imprimir.pdf"
         self.logo_file = logo_file
         self.config_file = config_file
+        self.label_catalog = label_catalog
+        self.catalog_watcher = catalog_watcher
+        self.preflight_index = preflight_index
+        self.thumbnails = thumbnails
+        self.preset_store = preset_store
+        self.scheduler = scheduler or JobScheduler(workers=2)
+        self._merge_job: Optional[Job] = None
+        # Plan del último preset cargado; se usa si la selección no cambió
+        self._active_plan: Optional[MergePlan] = None
+        self.startup_profiler = startup_profiler or StartupProfiler()
+        self.on_ready = on_ready
+        self._deferred_started = False
+        self._scanning = False
+        self._closing = False
+        self.email_outbox: Optional[IEmailOutbox] = None
+        self._merge_meter: Optional[ThroughputMeter] = None
+        # Progreso que llega desde otros hilos: se vuelca en Tk a 30 Hz como mucho
+        self._merge_progress: Optional[ProgressChannel] = None
+        self._outbox_progress = ProgressChannel(wakeup=self._wakeup(self._drain_outbox_progress))
         
         # Almacenamiento del estado de la UI
-        self.child_checkboxes: Dict[str, List[Tuple[Path, customtkinter.CTkCheckBox]]] = {}
-        self.master_checkboxes: Dict[str, customtkinter.CTkCheckBox] = {}
-        self.font_titulo_categoria = customtkinter.CTkFont(size=22, weight="bold")
-        self.font_checkbox_master = customtkinter.CTkFont(size=15, weight="normal")
-        self.font_checkbox_hijo = customtkinter.CTkFont(size=12)
+        # La selección vive en un modelo plano; la lista solo crea widgets
+        # para las filas visibles
+        self.catalog_model = CatalogViewModel(columns=CHECKBOX_COLUMNS)
+        self._output_exists = self.output_file.exists()
+        self._shown_selection_count: Optional[tuple] = None
+        self.fonts = {
+            "titulo": customtkinter.CTkFont(size=22, weight="bold"),
+            "master": customtkinter.CTkFont(size=15, weight="normal"),
+            "hijo": customtkinter.CTkFont(size=12),
+        }
         
         self.email_config: Dict[str, str] | None = None
 
@@ -81,30 +125,31 @@ class App(customtkinter.CTk):
         self.geometry("800x750")
         self.configure(fg_color=PALETTE["bg_dark"])
 
-        # Construir y poblar la UI
+        # Construir la UI; el contenido pesado se carga con la ventana visible
         self._setup_ui()
         self._load_email_config()
-        self._scan_and_display_files()
         self._update_button_states()
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.startup_profiler.mark("ventana_construida")
+
+        self.bind("<Map>", self._on_first_map, add="+")
+        # Por si el gestor de ventanas nunca avisa (ventana minimizada, etc.)
+        self.after(1000, self._start_deferred_loading)
 
     def _setup_ui(self):
         """Construye la interfaz de usuario estática (widgets principales)."""
         
-        try:
-            pil_image = Image.open(self.logo_file)
-            logo_image = customtkinter.CTkImage(light_image=pil_image, dark_image=pil_image, size=(300, 70))
-            logo_label = customtkinter.CTkLabel(self, text="", image=logo_image, fg_color="transparent")
-            logo_label.pack(pady=20)
-        except Exception as e:
-            print(f"Error al cargar el logo: {e}")
-            logo_label = customtkinter.CTkLabel(self, text="Animall Forrajería", font=("Arial", 24, "bold"), text_color=PALETTE["primary"])
-            logo_label.pack(pady=20)
-
-        self.scroll_frame = customtkinter.CTkScrollableFrame(
-            self, fg_color=PALETTE["bg_dark"], corner_radius=0
+        # El logo se decodifica después de mostrar la ventana; mientras tanto
+        # se reserva su lugar para que el resto no salte
+        self.logo_label = customtkinter.CTkLabel(self, text="", width=300, height=70, fg_color="transparent")
+        self.logo_label.pack(pady=20)
+
+        self.catalog_list = VirtualCatalogList(
+            self, model=self.catalog_model, fonts=self.fonts, palette=PALETTE,
+            thumbnails=self.thumbnails
         )
-        self.scroll_frame.pack(fill="both", expand=True, padx=20, pady=10)
-        self.scroll_frame.grid_columnconfigure(0, weight=1)
+        self.catalog_list.pack(fill="both", expand=True, padx=20, pady=10)
+        self.catalog_model.selection.subscribe(lambda _: self._update_button_states())
 
         # Barra de herramientas superior (Refresh)
         toolbar_frame = customtkinter.CTkFrame(self, fg_color="transparent")
@@ -121,6 +166,19 @@ class App(customtkinter.CTk):
         )
         self.refresh_btn.pack(side="right")
 
+        if self.preset_store is not None:
+            self.preset_menu = customtkinter.CTkOptionMenu(
+                toolbar_frame, values=[PRESET_PLACEHOLDER], command=self._on_preset_chosen,
+                width=180, height=30, fg_color=PALETTE["bg_light"],
+                button_color=PALETTE["bg_hover"], button_hover_color=PALETTE["bg_hover"]
+            )
+            self.preset_menu.pack(side="left")
+            self.save_preset_btn = customtkinter.CTkButton(
+                toolbar_frame, text="Guardar selección", command=self._save_preset,
+                width=120, height=30, fg_color=PALETTE["bg_light"], hover_color=PALETTE["bg_hover"]
+            )
+            self.save_preset_btn.pack(side="left", padx=(10, 0))
+
         footer_frame = customtkinter.CTkFrame(self, fg_color=PALETTE["bg_dark"])
         footer_frame.pack(fill="x", padx=30, pady=(10, 20))
 
@@ -140,6 +198,12 @@ class App(customtkinter.CTk):
         )
         self.generate_button.pack(fill="x", pady=(5, 5))
 
+        # Visible solo mientras corre una fusión
+        self.cancel_button = customtkinter.CTkButton(
+            footer_frame, text="Cancelar fusión", command=self._cancel_merge,
+            fg_color=PALETTE["bg_light"], hover_color=PALETTE["bg_hover"], height=30
+        )
+
         self.progress_bar = customtkinter.CTkProgressBar(footer_frame, height=15)
         self.progress_bar.set(0)
         self.progress_bar.pack(fill="x", pady=(0, 5))
@@ -158,7 +222,145 @@ class App(customtkinter.CTk):
         )
         self.email_button.pack(fill="x", pady=(5, 0))
 
+        # Estado de la cola de email (vacío hasta que haya algo que mostrar)
+        self.outbox_label = customtkinter.CTkLabel(
+            footer_frame, text="", text_color=PALETTE["text"], height=20, font=("", 11)
+        )
+        self.outbox_label.pack(fill="x", pady=(5, 0))
+
     
+    def _on_first_map(self, event):
+        if event.widget is self and not self._deferred_started:
+            self.startup_profiler.mark("ventana_visible")
+            # Dejar que Tk pinte la ventana antes de seguir cargando
+            self.after(10, self._start_deferred_loading)
+
+    def _start_deferred_loading(self):
+        """Carga el logo y el catálogo una vez que la ventana está en pantalla."""
+        if self._deferred_started or self._closing:
+            return
+        self._deferred_started = True
+        self._load_logo()
+        self.startup_profiler.mark("logo")
+        self._scan_and_display_files(on_done=self._on_initial_scan_done)
+
+    def _on_initial_scan_done(self):
+        self.startup_profiler.mark("catalogo")
+        self._start_catalog_watcher()
+        self.startup_profiler.mark("observador")
+        if self.on_ready is not None:
+            self.on_ready()
+        self._load_presets()
+        self.after(0, lambda: self._start_preflight(
+            [str(path) for path in self.catalog_model.all_paths()]
+        ))
+
+    # --- Presets ---
+
+    def _load_presets(self):
+        """Lee los nombres de los presets en segundo plano y llena el menú."""
+        if self.preset_store is None:
+            return
+
+        def task():
+            try:
+                names = [preset.name for preset in self.preset_store.list_presets()]
+            except Exception as e:
+                print(f"Error al leer los presets: {e}")
+                return
+            if not self._closing:
+                self.after(0, lambda: self.preset_menu.configure(values=[PRESET_PLACEHOLDER] + names))
+
+        threading.Thread(target=task, daemon=True).start()
+
+    def _save_preset(self):
+        if self.catalog_model.selected_count() == 0:
+            messagebox.showwarning("Advertencia", "No hay etiquetas seleccionadas.")
+            return
+        name = simpledialog.askstring("Guardar preset", "Nombre del preset:")
+        if not name or not name.strip():
+            return
+        preset = self.catalog_model.to_preset(name.strip(), self.input_dir)
+        try:
+            self.preset_store.save_preset(preset)
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Error", f"No se pudo guardar el preset: {e}")
+            return
+        self.status_label.configure(text=f"Preset '{preset.name}' guardado")
+        self._load_presets()
+
+    def _on_preset_chosen(self, name: str):
+        """Compila (o toma del caché) el plan del preset y marca sus etiquetas."""
+        if name == PRESET_PLACEHOLDER:
+            return
+        self.status_label.configure(text=f"Cargando preset '{name}'...")
+
+        def task():
+            try:
+                plan = plan_preset_use_case(name, self.preset_store, on_invalid="repair")
+            except (MergeError, ValueError) as e:
+                self.after(0, lambda: messagebox.showerror("Error de Preset", str(e)))
+                self.after(0, lambda: self.status_label.configure(text="Error"))
+                return
+            if not self._closing:
+                self.after(0, lambda: self._apply_plan(plan))
+
+        threading.Thread(target=task, daemon=True).start()
+
+    def _apply_plan(self, plan: MergePlan):
+        self.catalog_model.select_only([Path(self._entry_path(entry)) for entry in plan.entries])
+        self.catalog_list.refresh()
+        self._active_plan = plan
+        self.preset_menu.set(PRESET_PLACEHOLDER)
+        text = f"Preset '{plan.name}': {len(plan.entries)} etiquetas, {plan.total_pages} páginas"
+        if plan.skipped:
+            text += f" ({len(plan.skipped)} omitida(s))"
+        self.status_label.configure(text=text)
+
+    @staticmethod
+    def _entry_path(entry) -> str:
+        return entry[0] if isinstance(entry, (tuple, list)) else entry
+
+    def _plan_matches_selection(self) -> bool:
+        """True si la selección es exactamente la del último preset cargado."""
+        plan = self._active_plan
+        if plan is None or self.catalog_model.selected_count() != len(plan.entries):
+            return False
+        planned = {self._entry_path(entry) for entry in plan.entries}
+        return all(str(path) in planned for path in self.catalog_model.selected_paths())
+
+    def _start_preflight(self, paths: List[str]):
+        """
+        Valida etiquetas en segundo plano (solo las nuevas o modificadas
+        abren el PDF), para que la fusión ya las encuentre revisadas.
+        """
+        if self.preflight_index is None or not paths or self._closing:
+            return
+
+        def task():
+            try:
+                results = self.preflight_index.validate(paths)
+            except Exception as e:
+                print(f"Error en la validación previa: {e}")
+                return
+            problems = sum(1 for result in results.values() if not result.usable)
+            if problems and not self._closing:
+                text = f"Aviso: {problems} etiqueta(s) dañada(s) o con contraseña; se omitirán al fusionar."
+                self.after(0, lambda: self.status_label.configure(text=text))
+
+        threading.Thread(target=task, daemon=True).start()
+
+    def _load_logo(self):
+        """Decodifica el logo (PIL se importa recién acá)."""
+        try:
+            from PIL import Image
+            pil_image = Image.open(self.logo_file)
+            logo_image = customtkinter.CTkImage(light_image=pil_image, dark_image=pil_image, size=(300, 70))
+            self.logo_label.configure(image=logo_image)
+        except Exception as e:
+            print(f"Error al cargar el logo: {e}")
+            self.logo_label.configure(text="Animall Forrajería", font=("Arial", 24, "bold"), text_color=PALETTE["primary"])
+
     def _load_email_config(self):
         """Intenta leer el config.ini y almacena la configuración."""
         try:
@@ -193,90 +395,143 @@ class App(customtkinter.CTk):
             )
 
 
-    def _scan_and_display_files(self):
-        """Escanea el directorio y puebla la UI con Tarjetas de Categoría."""
-        has_files = False
-        for widget in self.scroll_frame.winfo_children():
-            widget.destroy()
-            
+    def _load_catalog(self) -> Dict[str, List[Path]]:
+        """
+        Devuelve las etiquetas por categoría.
+
+        Con un índice inyectado solo se re-listan las carpetas que cambiaron;
+        sin él se recorre el directorio completo.
+        """
+        if self.label_catalog is not None:
+            return {
+                category: [Path(label.path) for label in labels]
+                for category, labels in self.label_catalog.refresh().items()
+            }
+
+        catalog = {}
         for category_dir in sorted(self.input_dir.glob('*')):
-            if not category_dir.is_dir(): continue
-            category_name = category_dir.name
+            if not category_dir.is_dir() or category_dir.name.startswith('.'): continue
             pdf_files = sorted(list(category_dir.glob('*.pdf')))
-            if not pdf_files: continue
+            if pdf_files:
+                catalog[category_dir.name] = pdf_files
+        return catalog
 
-            has_files = True
-            self.child_checkboxes[category_name] = []
-            
-            card = CategoryCard(master=self.scroll_frame)
-            card.pack(fill="x", pady=(0, 10))
-            header_frame = customtkinter.CTkFrame(card, fg_color="transparent")
-            header_frame.pack(fill="x", anchor="w", pady=(15, 5), padx=20)
-            cat_label = customtkinter.CTkLabel(header_frame, text=category_name, font=self.font_titulo_categoria, text_color=PALETTE["secondary"])
-            cat_label.pack(side="left", anchor="w")
-
-            master_chk = customtkinter.CTkCheckBox(
-                header_frame, text=f"Seleccionar Todos ({len(pdf_files)})",
-                text_color=PALETTE["text"], fg_color=PALETTE["primary"],
-                hover_color="#E09AC0", font=self.font_checkbox_master
-            )
-            master_chk.pack(side="left", anchor="w", padx=20)
-            self.master_checkboxes[category_name] = master_chk
+    def _scan_and_display_files(self, on_done: Optional[Callable] = None):
+        """
+        Lee el catálogo en un hilo aparte y, al terminar, lo carga en el
+        modelo y redibuja la lista visible (en el hilo de Tk).
+        """
+        if self._scanning:
+            return
+        self._scanning = True
+        self.refresh_btn.configure(state="disabled")
 
-            grid_frame = customtkinter.CTkFrame(card, fg_color="transparent")
-            grid_frame.pack(fill="x", anchor="w", padx=30, pady=(0, 15)) 
-            grid_frame.columnconfigure(tuple(range(CHECKBOX_COLUMNS)), weight=1)
-            
-            child_widgets_in_category = []
-            for index, pdf_file in enumerate(pdf_files):
-                row = index // CHECKBOX_COLUMNS
-                col = index % CHECKBOX_COLUMNS
-                child_chk = customtkinter.CTkCheckBox(
-                    grid_frame, text=pdf_file.name, text_color=PALETTE["text"],
-                    fg_color=PALETTE["primary"], hover_color="#E09AC0",
-                    font=self.font_checkbox_hijo
-                )
-                child_chk.grid(row=row, column=col, sticky="w", padx=10, pady=4)
-                self.child_checkboxes[category_name].append((pdf_file, child_chk))
-                child_widgets_in_category.append(child_chk)
-                child_chk.configure(command=self._update_button_states)
-            
-            master_chk.configure(
-                command=lambda m=master_chk, c=child_widgets_in_category: \
-                    self._on_master_toggle(m, c)
-            )
-            # card.bind_children_events(card) # Removed for performance
-        
-        if not has_files and not self.email_config:
+        def task():
+            try:
+                catalog = self._load_catalog()
+            except Exception as e:
+                print(f"Error al leer el catálogo: {e}")
+                catalog = {}
+            if not self._closing:
+                self.after(0, lambda: self._show_catalog(catalog, on_done))
+
+        threading.Thread(target=task, daemon=True).start()
+
+    def _show_catalog(self, catalog: Dict[str, List[Path]], on_done: Optional[Callable]):
+        self._scanning = False
+        self.refresh_btn.configure(state="normal")
+        self._output_exists = self.output_file.exists()
+        self.catalog_model.set_catalog(catalog)
+        self.catalog_list.refresh()
+
+        if not self.catalog_model.labels and not self.email_config:
             self.status_label.configure(
                 text=f"No se encontraron PDFs. Agrega carpetas y PDFs en '{self.input_dir.name}'",
                 text_color=PALETTE["secondary"]
             )
-            
-    def _on_master_toggle(self, master_checkbox, child_checkboxes):
-        is_selected = master_checkbox.get()
-        for child in child_checkboxes:
-            if is_selected: child.select()
-            else: child.deselect()
-        self._update_button_states()
+        if on_done is not None:
+            on_done()
+
+    def _start_catalog_watcher(self):
+        """Arranca el observador; sus eventos se aplican en el hilo de Tk."""
+        if self.catalog_watcher is None:
+            return
+        self.catalog_watcher.start(
+            lambda events: self.after(0, lambda: self._apply_catalog_events(events))
+        )
+
+    def _apply_catalog_events(self, events: List[CatalogEvent]):
+        """
+        Aplica los eventos del observador al modelo y redibuja solo las
+        filas visibles, sin reconstruir la lista.
+        """
+        for event in events:
+            pdf_file = Path(event.label.path)
+            if event.kind == "added":
+                self.catalog_model.add_label(event.label.category, pdf_file)
+            elif event.kind == "removed":
+                self.catalog_model.remove_label(event.label.category, pdf_file)
+        self.catalog_list.refresh()
+        self._start_preflight([event.label.path for event in events if event.kind != "removed"])
+
+    def attach_email_outbox(self, email_outbox: IEmailOutbox):
+        """
+        Muestra el estado de la cola de email debajo del botón. La cola avisa
+        desde sus hilos; el texto se actualiza en el hilo de Tk.
+        """
+        self.email_outbox = email_outbox
+        email_outbox.subscribe(lambda stats: self._outbox_progress.update(stats=stats))
+        self._show_outbox_stats(email_outbox.stats())
+
+    def _drain_outbox_progress(self):
+        update = self._outbox_progress.poll()
+        if update is not None:
+            self._show_outbox_stats(update.fields["stats"])
+
+    def _show_outbox_stats(self, stats: Dict[str, float]):
+        if self._closing:
+            return
+        parts = []
+        pending = int(stats["pending"] + stats["in_flight"])
+        if pending:
+            parts.append(f"{pending} en cola")
+        if stats["sent"]:
+            parts.append(f"{int(stats['sent'])} enviado(s)")
+        if stats["failed"]:
+            parts.append(f"{int(stats['failed'])} fallido(s)")
+        self.outbox_label.configure(text=f"Emails: {', '.join(parts)}" if parts else "")
+
+    @property
+    def is_closing(self) -> bool:
+        """True desde que empezó el cierre: no conviene agendar nada más en la ventana."""
+        return self._closing
+
+    def close(self):
+        """Detiene los servicios en segundo plano y cierra la ventana (hilo de Tk)."""
+        self._closing = True
+        # Los trabajos cortan en el próximo punto seguro; la salida anterior queda intacta
+        self.scheduler.shutdown(cancel=True, timeout=0)
+        if self.catalog_watcher is not None:
+            self.catalog_watcher.stop()
+        if self.thumbnails is not None:
+            self.thumbnails.close()
+        self.destroy()
 
     def _update_button_states(self):
         """
         Actualiza el estado de TODOS los botones (Generar y Email)
-        basado en el estado actual de la UI y del sistema de archivos.
+        basado en el modelo de selección y en si existe el PDF de salida.
+
+        Se llama en cada clic, por eso no recorre casillas ni toca el disco:
+        el total sale del contador del modelo, la existencia de la salida se
+        recuerda tras cada fusión o refresco, y los widgets solo se
+        reconfiguran si el valor mostrado cambió.
         """
-        total_selected = 0
-        for category_name, child_list in self.child_checkboxes.items():
-            count_in_category = 0
-            for _, child_chk in child_list:
-                if child_chk.get() == 1:
-                    total_selected += 1
-                    count_in_category += 1
-            master_chk = self.master_checkboxes.get(category_name)
-            if master_chk:
-                if count_in_category == 0: master_chk.deselect()
-                elif count_in_category == len(child_list): master_chk.select()
-                else: master_chk.deselect()
+        total_selected = self.catalog_model.selected_count()
+        email_state = "normal" if self.email_config and self._output_exists else "disabled"
+        if (total_selected, email_state) == self._shown_selection_count:
+            return
+        self._shown_selection_count = (total_selected, email_state)
 
         # Lógica del Botón Generar PDF
         if total_selected == 0:
@@ -293,22 +548,18 @@ class App(customtkinter.CTk):
             self.status_label.configure(text=f"{total_selected} {plural} seleccionada(s).")
 
         # Lógica del Botón Enviar Email
-        pdf_exists = self.output_file.exists()
-        
-        if self.email_config and pdf_exists:
-            self.email_button.configure(state="normal")
-        else:
-            self.email_button.configure(state="disabled")
+        self.email_button.configure(state=email_state)
             
+    def _on_output_changed(self):
+        """Vuelve a mirar si existe el PDF de salida (tras una fusión)."""
+        self._output_exists = self.output_file.exists()
+        self._shown_selection_count = None
+        self._update_button_states()
+
     def _clear_all_checkboxes(self):
         """Deselecciona todas las casillas (maestras e hijas) en la app."""
-        for master_chk in self.master_checkboxes.values():
-            master_chk.deselect()
-        for child_list in self.child_checkboxes.values():
-            for _, child_chk in child_list:
-                child_chk.deselect()
-        
-        self._update_button_states()
+        self.catalog_model.clear_selection()
+        self.catalog_list.refresh()
 
     def _open_output_folder(self):
         """Abre la carpeta de salida en el explorador de archivos (multiplataforma)."""
@@ -324,11 +575,7 @@ class App(customtkinter.CTk):
     def start_merge_thread(self):
         """Inicia el proceso de fusión en un hilo separado."""
         # Recopilar archivos seleccionados
-        files: List[str] = []
-        for category in self.child_checkboxes:
-            for file_path, chk in self.child_checkboxes[category]:
-                if chk.get() == 1: 
-                    files.append(str(file_path))
+        files: List[str] = [str(path) for path in self.catalog_model.selected_paths()]
 
         if not files:
             messagebox.showwarning("Advertencia", "No hay archivos para unir.")
@@ -342,30 +589,140 @@ class App(customtkinter.CTk):
             return
 
         self.progress_bar.set(0)
-        self.status_label.configure(text="Procesando...")
         self.generate_button.configure(state="disabled")
+        if self._plan_matches_selection():
+            # El plan ya está resuelto y validado: se fusiona sin más pasos
+            plan = self._active_plan
+            self._confirm_and_merge(
+                PreflightReport(entries=plan.entries, skipped=plan.skipped, repaired=[],
+                                total_pages=plan.total_pages),
+                destination
+            )
+            return
+        if self.preflight_index is None:
+            self._run_merge(files, destination)
+            return
 
-        def task():
+        # Validar antes de fusionar; lo ya revisado en segundo plano no se vuelve a abrir
+        self.status_label.configure(text="Validando etiquetas...")
+
+        def check(token):
+            try:
+                report = preflight_pdfs_use_case(files, self.preflight_index, on_invalid="repair")
+            except (MergeError, ValueError) as e:
+                self.after(0, lambda: messagebox.showerror("Error de Fusión", str(e)))
+                self.after(0, lambda: self.status_label.configure(text="Error"))
+                self.after(0, lambda: self.generate_button.configure(state="normal"))
+                return
+            token.raise_if_cancelled()  # se cerró la ventana mientras se validaba
+            self.after(0, lambda: self._confirm_and_merge(report, destination))
+
+        self.scheduler.submit(check, name="Validar selección", lane=LANE_QUICK)
+
+    def _confirm_and_merge(self, report, destination: str):
+        """Pide confirmación si hay etiquetas que se van a omitir y lanza la fusión."""
+        if report.skipped:
+            names = "\n".join(f"• {Path(r.path).name} ({r.detail or r.status})" for r in report.skipped[:10])
+            if len(report.skipped) > 10:
+                names += f"\n… y {len(report.skipped) - 10} más"
+            if not messagebox.askyesno(
+                "Etiquetas con problemas",
+                f"{len(report.skipped)} etiqueta(s) no se pueden usar y se omitirán:\n\n{names}\n\n¿Continuar?"
+            ):
+                self.status_label.configure(text="Fusión cancelada")
+                self.generate_button.configure(state="normal")
+                return
+        self._run_merge(report.entries, destination,
+                        f"{len(report.entries)} etiquetas, {report.total_pages} páginas")
+
+    def _run_merge(self, files: List, destination: str, summary: str = ""):
+        """
+        Encola la fusión en el carril pesado del planificador.
+
+        El avance, el ritmo y el resultado viajan por un ProgressChannel:
+        el hilo de la fusión nunca llama a `after` por su cuenta.
+        """
+        self.status_label.configure(text=f"Procesando {summary}..." if summary else "Procesando...")
+        self._merge_meter = ThroughputMeter(total_files=len(files))
+        progress = ProgressChannel(meter=self._merge_meter, wakeup=self._wakeup(self._drain_merge_progress))
+        progress.start(len(files))
+        self._merge_progress = progress
+        self.cancel_button.configure(state="normal")
+        self.cancel_button.pack(fill="x", pady=(0, 5), after=self.generate_button)
+
+        def task(token):
+            if self._closing:
+                return
             try:
                 # Usamos el caso de uso inyectado
                 self.merge_use_case(
                     files=files, 
                     output=destination, 
-                    on_progress=self._update_progress_safe
+                    on_progress=progress,
+                    metrics=self._merge_meter,
+                    cancel=token
                 )
-                self.after(0, lambda: messagebox.showinfo("Éxito", "¡Fusión completada correctamente!"))
-                self.after(0, lambda: self.status_label.configure(text="Listo"))
+                progress.finish("Listo", dialog=("Éxito", "¡Fusión completada correctamente!"))
+            except OperationCancelled:
+                progress.finish("Fusión cancelada", ok=False)
             except MergeError as e:
-                 self.after(0, lambda: messagebox.showerror("Error de Fusión", str(e)))
-                 self.after(0, lambda: self.status_label.configure(text="Error"))
+                progress.finish("Error", ok=False, dialog=("Error de Fusión", str(e)))
             except Exception as e:
-                self.after(0, lambda: messagebox.showerror("Error Inesperado", f"Ocurrió un error grave: {e}"))
-                self.after(0, lambda: self.status_label.configure(text="Error Grave"))
-            finally:
-                self.after(0, lambda: self.generate_button.configure(state="normal"))
-                self.after(0, lambda: self.progress_bar.set(0))
+                progress.finish("Error Grave", ok=False,
+                                dialog=("Error Inesperado", f"Ocurrió un error grave: {e}"))
+
+        def on_done(job: Job):
+            # Cancelada antes de empezar: `task` nunca corrió y nadie cerró el canal
+            if job.state == JOB_CANCELLED:
+                progress.finish("Fusión cancelada", ok=False)
+
+        self._merge_job = self.scheduler.submit(task, name=f"Fusión {summary}".strip(), lane=LANE_HEAVY,
+                                                on_done=on_done)
+
+    def _cancel_merge(self):
+        """Pide cancelar la fusión en curso; termina en el próximo archivo."""
+        if self._merge_job is not None:
+            self._merge_job.cancel()
+            self.cancel_button.configure(state="disabled")
+            self.status_label.configure(text="Cancelando...")
+
+    def _wakeup(self, drain: Callable[[], None]) -> Callable[[float], None]:
+        """`wakeup` para un ProgressChannel: agenda `drain` en el hilo de Tk."""
+        def wake(delay: float):
+            if self._closing:
+                return
+            try:
+                self.after(int(delay * 1000), drain)
+            except (RuntimeError, tkinter.TclError):
+                pass  # la ventana ya se cerró
+        return wake
+
+    def _drain_merge_progress(self):
+        """Muestra el último estado de la fusión (hilo de Tk)."""
+        progress = self._merge_progress
+        update = progress.poll() if progress is not None and not self._closing else None
+        if update is None:
+            return
+        if update.done:
+            self.status_label.configure(text=update.message)
+            self._on_merge_finished()
+            dialog = update.fields.get("dialog")
+            if dialog:
+                (messagebox.showinfo if update.ok else messagebox.showerror)(*dialog)
+            return
+        self.progress_bar.set(update.fraction)
+        if update.throughput["files"] and update.current < update.total:
+            self.status_label.configure(
+                text=f"Procesando {update.current}/{update.total} · {format_throughput(update.throughput)}"
+            )
 
-        threading.Thread(target=task, daemon=True).start()
+    def _on_merge_finished(self):
+        self._merge_job = None
+        self._merge_progress = None
+        self.cancel_button.pack_forget()
+        self.generate_button.configure(state="normal")
+        self.progress_bar.set(0)
+        self._on_output_changed()
 
     def start_send_email_thread(self):
         """Inicia el proceso de envío de email en un hilo separado."""
@@ -395,7 +752,7 @@ class App(customtkinter.CTk):
 
         # Si falta receptor, pedirlo (simplificación)
         if 'EMAIL_RECEPTOR' not in email_config or not email_config['EMAIL_RECEPTOR']:
-             dest = filedialog.askstring("Destinatario", "Ingrese email del destinatario:")
+             dest = simpledialog.askstring("Destinatario", "Ingrese email del destinatario:")
              if not dest: return
              email_config['EMAIL_RECEPTOR'] = dest
              
@@ -411,23 +768,30 @@ class App(customtkinter.CTk):
         self.email_button.configure(state="disabled")
         self.status_label.configure(text="Enviando email...")
 
-        def task():
+        def task(token):
             try:
-                 self.send_email_use_case(email_config, file_to_send)
-                 self.after(0, lambda: messagebox.showinfo("Éxito", "Email enviado correctamente."))
-                 self.after(0, lambda: self.status_label.configure(text="Email enviado"))
+                 # Con una cola de salida el caso de uso vuelve enseguida con
+                 # los envíos encolados; el resultado se ve en `outbox_label`
+                 queued = self.send_email_use_case(email_config, file_to_send)
+                 if isinstance(queued, list):
+                     self.after(0, lambda: self.status_label.configure(
+                         text=f"Email en cola ({len(queued)} destinatario(s))"))
+                 else:
+                     self.after(0, lambda: messagebox.showinfo("Éxito", "Email enviado correctamente."))
+                     self.after(0, lambda: self.status_label.configure(text="Email enviado"))
+            except ValueError as e:
+                  # Sin destinatarios, config.ini incompleto o PDF inexistente
+                  self.after(0, lambda: messagebox.showerror("Error de Email", str(e)))
+                  self.after(0, lambda: self.status_label.configure(text="Error Envío"))
             except EmailError as e:
                   self.after(0, lambda: messagebox.showerror("Error de Email", str(e)))
                   self.after(0, lambda: self.status_label.configure(text="Error Envío"))
             except Exception as e:
                  self.after(0, lambda: messagebox.showerror("Error", f"Error inesperado: {e}"))
             finally:
-                 self.after(0, lambda: self.email_button.configure(state="normal"))
+                 if not self._closing:
+                     self.after(0, lambda: self.email_button.configure(state="normal"))
 
-        threading.Thread(target=task, daemon=True).start()
+        self.scheduler.submit(task, name="Enviar email", lane=LANE_QUICK)
 
-    def _update_progress_safe(self, current, total):
-        """Callback seguro para hilos."""
-        progress = current / total if total > 0 else 0
-        self.after(0, lambda: self.progress_bar.set(progress))
 
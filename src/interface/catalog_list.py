@@ -0,0 +1,281 @@
+# src/interface/catalog_list.py
+import threading
+import tkinter
+import customtkinter
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from src.core.interfaces import IThumbnailProvider
+from src.core.progress import ProgressChannel
+from src.interface.catalog_view_model import CatalogViewModel, Row
+
+ROW_HEIGHT = 34
+# Caja de la miniatura de cada etiqueta dentro del renglón
+THUMB_WIDTH = 56
+THUMB_HEIGHT = 28
+# Miniaturas decodificadas que se conservan en memoria
+THUMB_MEMORY_ITEMS = 512
+
+
+class _RowSlot(customtkinter.CTkFrame):
+    """
+    Un renglón reciclable de la lista virtual.
+
+    Puede dibujar una cabecera de categoría o un grupo de etiquetas; al
+    hacer scroll solo se le cambia el contenido, nunca se crean widgets.
+    """
+    def __init__(self, master, columns: int, fonts: Dict[str, customtkinter.CTkFont],
+                 palette: Dict[str, str], on_child_toggle: Callable,
+                 on_master_toggle: Callable, on_expand_toggle: Callable,
+                 thumbnail_for: Optional[Callable[[Path], Optional[customtkinter.CTkImage]]] = None):
+        super().__init__(master, fg_color=palette["bg_light"], corner_radius=0, height=ROW_HEIGHT)
+        self.row: Optional[Row] = None
+        self.paths: List[Optional[Path]] = [None] * columns
+
+        # Widgets de cabecera
+        self.expand_btn = customtkinter.CTkButton(
+            self, text="▾", width=28, height=24, fg_color="transparent",
+            hover_color=palette["bg_hover"], text_color=palette["secondary"],
+            command=lambda: on_expand_toggle(self.row[1])
+        )
+        self.title = customtkinter.CTkLabel(
+            self, text="", font=fonts["titulo"], text_color=palette["secondary"], anchor="w"
+        )
+        self.master_chk = customtkinter.CTkCheckBox(
+            self, text="", text_color=palette["text"], fg_color=palette["primary"],
+            hover_color="#E09AC0", font=fonts["master"],
+            command=lambda: on_master_toggle(self.row[1], self.master_chk.get() == 1)
+        )
+
+        # Widgets de etiquetas
+        self.thumbnail_for = thumbnail_for
+        self.thumbs: List[customtkinter.CTkLabel] = []
+        self.checkboxes: List[customtkinter.CTkCheckBox] = []
+        for col in range(columns):
+            if thumbnail_for is not None:
+                self.thumbs.append(customtkinter.CTkLabel(
+                    self, text="", width=THUMB_WIDTH, height=THUMB_HEIGHT,
+                    fg_color=palette["bg_hover"], corner_radius=3
+                ))
+            chk = customtkinter.CTkCheckBox(
+                self, text="", text_color=palette["text"], fg_color=palette["primary"],
+                hover_color="#E09AC0", font=fonts["hijo"],
+                command=lambda c=col: on_child_toggle(self.paths[c], self.checkboxes[c].get() == 1)
+            )
+            self.checkboxes.append(chk)
+        self.columns = columns
+
+    def show(self, row: Row, model: CatalogViewModel, labels_text: Callable[[str], str]) -> None:
+        """Dibuja la fila `row` con el estado actual del modelo."""
+        kind, category, paths = row
+        if self.row is None or self.row[0] != kind:
+            for widget in [self.expand_btn, self.title, self.master_chk] + self.checkboxes + self.thumbs:
+                widget.place_forget()
+            if kind == "header":
+                self.expand_btn.place(x=12, rely=0.5, anchor="w")
+                self.title.place(x=44, rely=0.5, anchor="w")
+                self.master_chk.place(relx=0.55, rely=0.5, anchor="w")
+        self.row = row
+
+        if kind == "header":
+            self.expand_btn.configure(text="▾" if category in model.expanded else "▸")
+            self.title.configure(text=category)
+            self.master_chk.configure(text=labels_text(category))
+            if model.is_category_selected(category): self.master_chk.select()
+            else: self.master_chk.deselect()
+            return
+
+        for col, chk in enumerate(self.checkboxes):
+            path = paths[col] if col < len(paths) else None
+            self.paths[col] = path
+            if path is None:
+                chk.place_forget()
+                if self.thumbs:
+                    self.thumbs[col].place_forget()
+                continue
+            chk.configure(text=path.name)
+            x = 40
+            if self.thumbs:
+                self.show_thumbnail(col)
+                self.thumbs[col].place(relx=col / self.columns, x=x, rely=0.5, anchor="w")
+                x += THUMB_WIDTH + 6
+            chk.place(relx=col / self.columns, x=x, rely=0.5, anchor="w")
+            if model.is_selected(path): chk.select()
+            else: chk.deselect()
+
+    def show_thumbnail(self, col: int) -> None:
+        """Pone la miniatura de la columna `col` (vacía si todavía no llegó)."""
+        image = self.thumbnail_for(self.paths[col])
+        # CTkLabel no acepta image=None: se vacía con una cadena
+        self.thumbs[col].configure(image=image if image is not None else "")
+
+
+class VirtualCatalogList(customtkinter.CTkFrame):
+    """
+    Lista virtualizada de categorías y etiquetas.
+
+    Solo existen los renglones que entran en pantalla (más uno); al hacer
+    scroll se reciclan con el contenido de las filas del modelo. El tiempo
+    de arranque y el consumo de memoria no crecen con el catálogo.
+
+    Con `thumbnails`, cada etiqueta muestra una vista previa que se pide
+    solo cuando su fila entra en pantalla. El PNG se decodifica en el hilo
+    que lo entrega; la ventana recibe las imágenes listas por tandas, a
+    través de un ProgressChannel (como mucho 30 veces por segundo).
+    """
+    def __init__(self, master, model: CatalogViewModel, fonts: Dict[str, customtkinter.CTkFont],
+                 palette: Dict[str, str], thumbnails: Optional[IThumbnailProvider] = None, **kwargs):
+        super().__init__(master, fg_color=palette["bg_dark"], corner_radius=0, **kwargs)
+        self.model = model
+        self.fonts = fonts
+        self.palette = palette
+        self.thumbnails = thumbnails
+        self.offset = 0
+        self.slots: List[_RowSlot] = []
+        self._images: "OrderedDict[Path, customtkinter.CTkImage]" = OrderedDict()
+        self._requested = set()
+        # Miniaturas decodificadas que esperan al hilo de Tk
+        self._ready: Dict[Path, object] = {}
+        self._ready_lock = threading.Lock()
+        self._thumb_progress = ProgressChannel(wakeup=self._wake_thumbnails)
+
+        self.viewport = tkinter.Frame(self, bg=palette["bg_dark"], highlightthickness=0)
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.scrollbar = customtkinter.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.viewport.bind("<Configure>", lambda e: self.refresh())
+        # Igual que CTkScrollableFrame: la rueda se escucha a nivel global y
+        # solo se atiende si el puntero está sobre la lista
+        self.bind_all("<MouseWheel>", self._on_mousewheel, add="+")
+        self.bind_all("<Button-4>", self._on_mousewheel, add="+")
+        self.bind_all("<Button-5>", self._on_mousewheel, add="+")
+
+    def refresh(self) -> None:
+        """Vuelve a dibujar las filas visibles (llamar tras cambiar el modelo)."""
+        rows = self.model.rows()
+        height = max(self.viewport.winfo_height(), 1)
+        total = len(rows) * ROW_HEIGHT
+        self.offset = max(0, min(self.offset, total - height))
+
+        needed = height // ROW_HEIGHT + 2
+        while len(self.slots) < needed:
+            slot = _RowSlot(
+                self.viewport, self.model.columns, self.fonts, self.palette,
+                on_child_toggle=self._on_child_toggle,
+                on_master_toggle=self._on_master_toggle,
+                on_expand_toggle=self._on_expand_toggle,
+                thumbnail_for=self._thumbnail_for if self.thumbnails is not None else None
+            )
+            self.slots.append(slot)
+
+        first = self.offset // ROW_HEIGHT
+        for i, slot in enumerate(self.slots):
+            index = first + i
+            if index >= len(rows):
+                slot.place_forget()
+                continue
+            slot.show(rows[index], self.model, self._master_text)
+            slot.place(x=0, y=index * ROW_HEIGHT - self.offset, relwidth=1, height=ROW_HEIGHT)
+
+        if total <= height:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + height) / total)
+
+    def scroll_by(self, pixels: int) -> None:
+        self.offset += pixels
+        self.refresh()
+
+    def _thumbnail_for(self, path: Path) -> Optional[customtkinter.CTkImage]:
+        """Devuelve la miniatura de `path` si ya está en memoria; si no, la pide."""
+        image = self._images.get(path)
+        if image is not None:
+            self._images.move_to_end(path)
+            return image
+        if path not in self._requested:
+            self._requested.add(path)
+            self.thumbnails.request(str(path), lambda _, png: self._on_thumbnail_file(path, png))
+        return None
+
+    def _on_thumbnail_file(self, path: Path, png_path: Optional[str]) -> None:
+        # Hilo del proveedor: acá se hace la parte lenta (leer y decodificar)
+        if png_path is None:
+            return
+        try:
+            from PIL import Image
+            with Image.open(png_path) as img:
+                img.load()
+                pil_image = img.copy()
+        except Exception as e:
+            print(f"No se pudo leer la miniatura de '{path.name}': {e}")
+            return
+        with self._ready_lock:
+            self._ready[path] = pil_image
+        self._thumb_progress.update()
+
+    def _wake_thumbnails(self, delay: float) -> None:
+        try:
+            self.after(int(delay * 1000), self._drain_thumbnails)
+        except (RuntimeError, tkinter.TclError):
+            pass  # la ventana ya se cerró
+
+    def _drain_thumbnails(self) -> None:
+        """Aplica de una vez todas las miniaturas que llegaron desde la última tanda."""
+        if self._thumb_progress.poll() is None:
+            return
+        with self._ready_lock:
+            ready, self._ready = self._ready, {}
+        for path, pil_image in ready.items():
+            self._on_thumbnail_image(path, pil_image)
+
+    def _on_thumbnail_image(self, path: Path, pil_image) -> None:
+        self._requested.discard(path)
+        scale = min(THUMB_WIDTH / pil_image.width, THUMB_HEIGHT / pil_image.height)
+        size = (max(1, round(pil_image.width * scale)), max(1, round(pil_image.height * scale)))
+        self._images[path] = customtkinter.CTkImage(light_image=pil_image, dark_image=pil_image, size=size)
+        while len(self._images) > THUMB_MEMORY_ITEMS:
+            self._images.popitem(last=False)
+        # Solo se toca el renglón que la muestra, si sigue en pantalla
+        for slot in self.slots:
+            if slot.row is not None and slot.row[0] != "header" and path in slot.paths:
+                slot.show_thumbnail(slot.paths.index(path))
+
+    def _master_text(self, category: str) -> str:
+        return f"Seleccionar Todos ({len(self.model.labels.get(category, []))})"
+
+    def _on_scrollbar(self, *args) -> None:
+        total = len(self.model.rows()) * ROW_HEIGHT
+        height = max(self.viewport.winfo_height(), 1)
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = ROW_HEIGHT if args[2] == "units" else height
+            self.offset += int(args[1]) * step
+        self.refresh()
+
+    def _on_mousewheel(self, event) -> None:
+        if not str(event.widget).startswith(str(self.viewport)):
+            return
+        if event.num == 4:
+            delta = 1
+        elif event.num == 5:
+            delta = -1
+        else:
+            # Windows entrega múltiplos de 120; macOS valores pequeños
+            delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll_by(-delta * 3 * ROW_HEIGHT)
+
+    def _on_child_toggle(self, path: Optional[Path], selected: bool) -> None:
+        if path is None:
+            return
+        self.model.set_selected(path, selected)
+        self.refresh()
+
+    def _on_master_toggle(self, category: str, selected: bool) -> None:
+        self.model.set_category_selected(category, selected)
+        self.refresh()
+
+    def _on_expand_toggle(self, category: str) -> None:
+        self.model.toggle_expanded(category)
+        self.refresh()
@@ -0,0 +1,138 @@
+# src/interface/catalog_view_model.py
+import bisect
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from src.core.entities import SelectionPreset
+from src.core.selection import SelectionModel
+
+# Una fila visible: ("header", categoría, []) o ("labels", categoría, [rutas])
+Row = Tuple[str, str, List[Path]]
+
+
+class CatalogViewModel:
+    """
+    Modelo plano (sin widgets) de la lista de etiquetas.
+
+    Guarda las categorías y qué categorías están desplegadas; la selección
+    la lleva un `SelectionModel` del núcleo. La lista virtual solo le pide
+    las filas visibles, por lo que la cantidad de widgets no depende del
+    tamaño del catálogo.
+    """
+
+    def __init__(self, columns: int = 3, collapse_threshold: int = 300):
+        """
+        Args:
+            columns (int): Etiquetas por fila.
+            collapse_threshold (int): Con más etiquetas que esto, las
+                categorías arrancan plegadas y se despliegan a pedido.
+        """
+        self.columns = columns
+        self.collapse_threshold = collapse_threshold
+        self.labels: Dict[str, List[Path]] = {}
+        self.expanded: Set[str] = set()
+        self.selection = SelectionModel()
+        self._rows: Optional[List[Row]] = None
+
+    def set_catalog(self, catalog: Dict[str, List[Path]]) -> None:
+        """Reemplaza el catálogo conservando la selección de lo que sigue existiendo."""
+        self.labels = {category: sorted(paths) for category, paths in sorted(catalog.items()) if paths}
+        total = sum(len(paths) for paths in self.labels.values())
+        if total <= self.collapse_threshold:
+            self.expanded = set(self.labels)
+        else:
+            self.expanded &= set(self.labels)
+        self.selection.set_categories(self.labels)
+        self._rows = None
+
+    def add_label(self, category: str, path: Path) -> None:
+        paths = self.labels.get(category)
+        if paths is None:
+            self.labels = dict(sorted({**self.labels, category: []}.items()))
+            paths = self.labels[category]
+            self.expanded.add(category)
+        index = bisect.bisect_left(paths, path)
+        if index < len(paths) and paths[index] == path:
+            return
+        paths.insert(index, path)
+        self.selection.add_item(category, path)
+        self._rows = None
+
+    def remove_label(self, category: str, path: Path) -> None:
+        paths = self.labels.get(category)
+        if not paths or path not in paths:
+            return
+        paths.remove(path)
+        self.selection.remove_item(path)
+        if not paths:
+            del self.labels[category]
+            self.expanded.discard(category)
+        self._rows = None
+
+    def toggle_expanded(self, category: str) -> None:
+        if category in self.expanded:
+            self.expanded.discard(category)
+        else:
+            self.expanded.add(category)
+        self._rows = None
+
+    def rows(self) -> List[Row]:
+        """Filas planas (cabeceras + grupos de `columns` etiquetas) a dibujar."""
+        if self._rows is None:
+            rows: List[Row] = []
+            for category, paths in self.labels.items():
+                rows.append(("header", category, []))
+                if category in self.expanded:
+                    for start in range(0, len(paths), self.columns):
+                        rows.append(("labels", category, paths[start:start + self.columns]))
+            self._rows = rows
+        return self._rows
+
+    # --- Selección (delegada en SelectionModel) ---
+
+    def set_selected(self, path: Path, selected: bool) -> None:
+        self.selection.set_selected(path, selected)
+
+    def set_category_selected(self, category: str, selected: bool) -> None:
+        self.selection.set_category_selected(category, selected)
+
+    def clear_selection(self) -> None:
+        self.selection.clear()
+
+    def select_only(self, paths: List[Path]) -> None:
+        self.selection.select_only(paths)
+
+    def is_selected(self, path: Path) -> bool:
+        return self.selection.is_selected(path)
+
+    def is_category_selected(self, category: str) -> bool:
+        return self.selection.is_category_selected(category)
+
+    def selected_count(self) -> int:
+        return self.selection.count()
+
+    def selected_paths(self) -> List[Path]:
+        """Rutas seleccionadas en el orden del catálogo."""
+        return self.selection.selected_items()
+
+    def all_paths(self) -> List[Path]:
+        """Todas las etiquetas del catálogo, seleccionadas o no."""
+        return [path for paths in self.labels.values() for path in paths]
+
+    def to_preset(self, name: str, input_dir: Path) -> SelectionPreset:
+        """
+        Describe la selección actual como preset: las categorías completas se
+        guardan por nombre (así incluyen las etiquetas que se agreguen) y el
+        resto como rutas relativas a `input_dir`.
+        """
+        categories, files = [], []
+        for category, paths in self.labels.items():
+            if self.selection.is_category_selected(category):
+                categories.append(category)
+                continue
+            for path in paths:
+                if self.selection.is_selected(path):
+                    try:
+                        files.append(path.relative_to(input_dir).as_posix())
+                    except ValueError:
+                        files.append(str(path))
+        return SelectionPreset(name=name, categories=tuple(categories), files=tuple(files))
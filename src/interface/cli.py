@@ -0,0 +1,628 @@
+# src/interface/cli.py
+"""
+Modo por línea de comandos, sin interfaz gráfica.
+
+Pensado para cron, un servidor de impresión o scripts: reutiliza los mismos
+casos de uso que la GUI y escribe en stdout una línea JSON por evento
+(inicio, progreso, fin, error), lista para procesar con otra herramienta.
+Los mensajes informativos de la infraestructura van a stderr.
+
+Este módulo nunca importa tkinter, customtkinter ni PIL.
+
+Ejemplos:
+    python -m mergeetiquetas merge --category Perros --output perros.pdf
+    python -m mergeetiquetas merge --glob "*/Royal*.pdf" --nup 2x4
+    python -m mergeetiquetas merge --job-file trabajos.json --jobs 4 --metrics metricas.jsonl
+    python -m mergeetiquetas presets --save Semanal -c Suavizantes -f Perfuminas/lavanda.pdf
+    python -m mergeetiquetas merge --preset Semanal
+    python -m mergeetiquetas bundles
+    python -m mergeetiquetas email _SALIDA/etiquetas_imprimir.pdf
+    python -m mergeetiquetas email --queue _SALIDA/etiquetas_imprimir.pdf
+    python -m mergeetiquetas outbox --drain
+"""
+import argparse
+import configparser
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO, Tuple
+
+from src.core.exceptions import EmailError, MergeError, OperationCancelled
+from src.core.metrics import MetricsFanout, ThroughputMeter
+from src.core.entities import SelectionPreset
+from src.core.selection import SelectionEntry
+from src.core.use_cases import (
+    PREFLIGHT_POLICIES, impose_pdfs_use_case, merge_pdfs_use_case, plan_preset_use_case,
+    preflight_pdfs_use_case, queue_pdf_email_use_case, send_pdf_by_email_use_case
+)
+from src.infrastructure.category_bundles import CategoryBundles
+from src.infrastructure.email_outbox import FileEmailOutbox
+from src.infrastructure.metrics_sink import JsonLinesMetricsSink
+from src.infrastructure.pdf_cache import PdfSourceCache
+from src.infrastructure.pdf_repository import PyMuPDFRepository
+from src.infrastructure.preflight_index import SQLitePreflightIndex
+from src.infrastructure.preset_store import JsonPresetStore
+from src.infrastructure.smtp_email_service import SMTPEmailService
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_OUTPUT_NAME = "etiquetas_imprimir.pdf"
+PREFLIGHT_INDEX_NAME = ".catalogo.sqlite3"
+PRESETS_FILE_NAME = "presets.json"  # junto a config.ini
+PLANS_FILE_NAME = ".planes.json"    # en la carpeta de salida
+
+
+class JsonEventWriter:
+    """Escribe eventos como líneas JSON; es seguro llamarlo desde varios hilos."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields) -> None:
+        record = {"event": event, "t": round(time.perf_counter() - self.started, 4), **fields}
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+# --- Selección de etiquetas ---
+
+def _pdfs_in(directory: Path) -> List[Path]:
+    return sorted(
+        p for p in directory.iterdir() if p.is_file() and p.suffix.lower() == ".pdf"
+    )
+
+
+def resolve_selection(input_dir: Path, categories: List[str] = (), globs: List[str] = (),
+                      files: List = ()) -> List[SelectionEntry]:
+    """
+    Arma la lista de etiquetas de un trabajo, en el orden indicado.
+
+    Args:
+        input_dir (Path): Carpeta `_ETIQUETAS_PDFS`.
+        categories (List[str]): Categorías completas a incluir.
+        globs (List[str]): Patrones relativos a `input_dir` (p. ej. "*/Royal*.pdf").
+        files (List): Rutas sueltas o pares [ruta, copias]; las relativas
+            se toman respecto de `input_dir`.
+
+    Returns:
+        List[SelectionEntry]: Rutas o pares (ruta, copias).
+
+    Raises:
+        ValueError: Si una categoría no existe o un patrón no encuentra nada.
+    """
+    selection: List[SelectionEntry] = []
+    for category in categories:
+        category_dir = input_dir / category
+        if not category_dir.is_dir():
+            raise ValueError(f"La categoría '{category}' no existe en '{input_dir}'.")
+        selection += [str(p) for p in _pdfs_in(category_dir)]
+    for pattern in globs:
+        matches = sorted(
+            p for p in input_dir.glob(pattern)
+            if p.is_file() and p.suffix.lower() == ".pdf"
+            and not any(part.startswith(".") for part in p.relative_to(input_dir).parts)
+        )
+        if not matches:
+            raise ValueError(f"El patrón '{pattern}' no coincide con ninguna etiqueta.")
+        selection += [str(p) for p in matches]
+    for entry in files:
+        path, copies = entry if isinstance(entry, (list, tuple)) else (entry, None)
+        path = str(input_dir / path)  # las rutas absolutas se conservan tal cual
+        selection.append(path if copies is None else (path, copies))
+    return selection
+
+
+def parse_nup(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Convierte "3x8" en (3, 8). None o "" significa sin imposición."""
+    if not value:
+        return None
+    try:
+        columns, rows = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Formato de grilla inválido: '{value}' (se espera COLUMNASxFILAS).")
+    return columns, rows
+
+
+def load_jobs(job_file: Path, input_dir: Path, output_dir: Path) -> List[Dict]:
+    """
+    Lee un archivo de trabajos JSON.
+
+    El archivo es una lista de trabajos (o un objeto con la clave "jobs").
+    Cada trabajo admite: "output" (relativo a `output_dir`), "categories",
+    "globs", "files", "nup" ("2x4"), "paper" y "email" (bool).
+    """
+    with open(job_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("jobs", [])
+
+    jobs = []
+    for index, spec in enumerate(data):
+        output = Path(spec.get("output") or f"trabajo_{index + 1}.pdf")
+        if not output.is_absolute():
+            output = output_dir / output
+        jobs.append({
+            "name": spec.get("name") or output.stem,
+            "output": str(output),
+            "files": resolve_selection(
+                input_dir, spec.get("categories", []), spec.get("globs", []), spec.get("files", [])
+            ),
+            "nup": parse_nup(spec.get("nup")),
+            "paper": spec.get("paper", "a4"),
+            "email": bool(spec.get("email", False)),
+        })
+    return jobs
+
+
+def load_email_config(config_file: Path) -> Dict[str, str]:
+    """
+    Lee la configuración de email de `config.ini`.
+
+    Acepta las claves en la sección [Email] o en [DEFAULT]; se devuelven en
+    mayúsculas, como las espera el caso de uso.
+    """
+    if not config_file.exists():
+        raise ValueError(f"'{config_file.name}' no encontrado.")
+    parser = configparser.ConfigParser()
+    parser.read(config_file, encoding="utf-8")
+    section = parser["Email"] if parser.has_section("Email") else parser["DEFAULT"]
+    return {key.upper(): value for key, value in section.items()}
+
+
+# --- Ejecución de trabajos ---
+
+_repository: Optional[PyMuPDFRepository] = None
+_email_service: Optional[SMTPEmailService] = None
+_worker_events = None
+
+
+def _get_repository(workers: int, input_dir: Optional[str] = None) -> PyMuPDFRepository:
+    """
+    Un repositorio (con su caché) por proceso, creado a demanda.
+
+    Usa los paquetes por categoría que estén al día, pero no los arma: un
+    proceso de línea de comandos termina antes (ver el comando `bundles`).
+    """
+    global _repository
+    if _repository is None:
+        _repository = PyMuPDFRepository(
+            workers=workers,
+            cache=PdfSourceCache(max_bytes=256 * 1024 * 1024),
+            incremental=True,
+            max_memory_bytes=128 * 1024 * 1024,
+            garbage=4,
+            deflate=True,
+            bundles=CategoryBundles(Path(input_dir), auto_rebuild=False) if input_dir else None,
+            loader="bulk",
+            prefetch=8
+        )
+    return _repository
+
+
+def _get_email_service() -> SMTPEmailService:
+    """Un único servicio de email, para reutilizar sus conexiones entre trabajos."""
+    global _email_service
+    if _email_service is None:
+        _email_service = SMTPEmailService(max_attachment_bytes=18 * 1024 * 1024)
+    return _email_service
+
+
+def run_job(job: Dict, emit, read_workers: int = 1) -> Dict:
+    """
+    Ejecuta un trabajo de fusión (o imposición) y emite su progreso.
+
+    Un error de este trabajo, esperado o no, se informa como evento "error"
+    y no corta el resto del lote.
+
+    Returns:
+        Dict: El evento final ("done" o "error") con sus tiempos.
+    """
+    name = job["name"]
+    emit("start", job=name, output=job["output"], files=len(job["files"]))
+    # El medidor alimenta el ritmo y la ETA de los eventos "progress"
+    meter = ThroughputMeter(total_files=len(job["files"]))
+    metrics_file = (JsonLinesMetricsSink(Path(job["metrics"]), tags={"job": name})
+                    if job.get("metrics") else None)
+    on_progress = lambda current, total: emit(
+        "progress", job=name, current=current, total=total, **_rates(meter)
+    )
+    started = time.perf_counter()
+    try:
+        files = job["files"]
+        if job.get("preflight_index"):
+            # Validar todo antes de abrir nada: un archivo dañado no corta la fusión a mitad
+            report = preflight_pdfs_use_case(
+                files, SQLitePreflightIndex(Path(job["preflight_index"]), workers=read_workers),
+                on_invalid=job.get("on_invalid", "fail")
+            )
+            files = report.entries
+            emit("preflight", job=name, files=len(files), pages=report.total_pages,
+                 skipped=[Path(r.path).name for r in report.skipped],
+                 repaired=[Path(r.path).name for r in report.repaired])
+        repository = _get_repository(read_workers, job.get("input_dir"))
+        if job.get("nup"):
+            columns, rows = job["nup"]
+            report = impose_pdfs_use_case(
+                pdf_files=files, output_path=job["output"], pdf_repository=repository,
+                columns=columns, rows=rows, paper_size=job.get("paper", "a4"),
+                on_progress=on_progress, metrics=MetricsFanout([meter, metrics_file])
+            )
+        else:
+            report = merge_pdfs_use_case(
+                pdf_files=files, output_path=job["output"],
+                pdf_repository=repository, on_progress=on_progress,
+                metrics=MetricsFanout([meter, metrics_file])
+            )
+    except (MergeError, ValueError) as e:
+        return _job_error(emit, name, started, str(e))
+    except OperationCancelled as e:
+        return _job_error(emit, name, started, str(e), cancelled=True)
+    except Exception as e:
+        return _job_error(emit, name, started, f"Error inesperado ({type(e).__name__}): {e}")
+    finally:
+        if metrics_file is not None:
+            metrics_file.close()
+
+    report = report or {}
+    result = {
+        "job": name,
+        "output": job["output"],
+        "seconds": round(time.perf_counter() - started, 4),
+        "output_bytes": os.path.getsize(job["output"]),
+        "mode": report.get("mode"),
+    }
+    if report.get("bundles"):
+        result["bundles"] = report["bundles"]
+        result["opened"] = report["opened"]
+    if meter.files:
+        result["pages"] = meter.pages
+        result.update(_rates(meter))
+        del result["eta_seconds"]
+    emit("done", **result)
+    return {"event": "done", **result}
+
+
+def _job_error(emit, name: str, started: float, error: str, **extra) -> Dict:
+    """Emite el evento "error" de un trabajo y lo devuelve como resultado."""
+    result = {"job": name, "error": error, **extra, "seconds": round(time.perf_counter() - started, 4)}
+    emit("error", **result)
+    return {"event": "error", **result}
+
+
+def _rates(meter: ThroughputMeter) -> Dict:
+    """Ritmo y ETA para los eventos JSON (vacío hasta el primer archivo)."""
+    if not meter.files:
+        return {}
+    snapshot = meter.snapshot()
+    eta = snapshot["eta_seconds"]
+    return {
+        "pages_per_second": round(snapshot["pages_per_second"], 1),
+        "mb_per_second": round(snapshot["mb_per_second"], 3),
+        "eta_seconds": round(eta, 1) if eta is not None else None,
+    }
+
+
+def _init_worker(events) -> None:
+    global _worker_events
+    _worker_events = events
+    sys.stdout = sys.stderr
+
+
+def _run_job_in_worker(job: Dict) -> Dict:
+    emit = lambda event, **fields: _worker_events.put((event, fields))
+    return run_job(job, emit)
+
+
+def run_jobs(jobs: List[Dict], writer: JsonEventWriter, max_jobs: int,
+             email_config: Optional[Dict[str, str]] = None) -> List[Dict]:
+    """
+    Ejecuta los trabajos, en paralelo si `max_jobs` > 1.
+
+    PyMuPDF no es seguro entre hilos, así que cada trabajo concurrente corre
+    en su propio proceso; los eventos vuelven por una cola y los escribe
+    este proceso, para que las líneas JSON nunca se mezclen.
+    """
+    if max_jobs <= 1 or len(jobs) <= 1:
+        results: List[Dict] = []
+        read_workers = min(4, os.cpu_count() or 1)
+        for job in jobs:
+            results.append(run_job(job, writer.emit, read_workers))
+            _maybe_send(job, results[-1], email_config, writer)
+        return results
+
+    context = multiprocessing.get_context("spawn")
+    events = context.Queue()
+    pump = threading.Thread(target=_pump_events, args=(events, writer), daemon=True)
+    pump.start()
+    try:
+        with ProcessPoolExecutor(max_workers=max_jobs, mp_context=context,
+                                 initializer=_init_worker, initargs=(events,)) as pool:
+            futures = {pool.submit(_run_job_in_worker, job): index for index, job in enumerate(jobs)}
+            by_index: Dict[int, Dict] = {}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    by_index[index] = future.result()
+                except Exception as e:
+                    by_index[index] = {"event": "error", "job": jobs[index]["name"], "error": str(e)}
+                    writer.emit("error", job=jobs[index]["name"], error=str(e))
+    finally:
+        events.put(None)
+        pump.join()
+
+    results = [by_index[index] for index in range(len(jobs))]
+    for job, result in zip(jobs, results):
+        _maybe_send(job, result, email_config, writer)
+    return results
+
+
+def _pump_events(events, writer: JsonEventWriter) -> None:
+    while True:
+        item = events.get()
+        if item is None:
+            return
+        event, fields = item
+        writer.emit(event, **fields)
+
+
+def _maybe_send(job: Dict, result: Dict, email_config: Optional[Dict[str, str]],
+                writer: JsonEventWriter) -> None:
+    if not job.get("email") or result["event"] != "done":
+        return
+    started = time.perf_counter()
+    try:
+        if email_config is None:
+            raise ValueError("No hay configuración de email.")
+        send_pdf_by_email_use_case(
+            config=email_config, pdf_path=job["output"], email_service=_get_email_service()
+        )
+        writer.emit("email", job=job["name"], seconds=round(time.perf_counter() - started, 4))
+    except (EmailError, ValueError) as e:
+        result["event"] = "error"
+        result["error"] = str(e)
+        writer.emit("error", job=job["name"], error=str(e))
+
+
+# --- Punto de entrada ---
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="mergeetiquetas", description="Fusión de etiquetas PDF sin interfaz gráfica."
+    )
+    parser.add_argument("--input-dir", type=Path, default=ROOT_DIR / "_ETIQUETAS_PDFS")
+    parser.add_argument("--output-dir", type=Path, default=ROOT_DIR / "_SALIDA")
+    parser.add_argument("--config", type=Path, default=ROOT_DIR / "config.ini")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    merge = commands.add_parser("merge", help="Fusiona etiquetas en uno o más PDFs.")
+    merge.add_argument("-c", "--category", action="append", default=[],
+                       help="Incluir todas las etiquetas de una categoría.")
+    merge.add_argument("-g", "--glob", action="append", default=[],
+                       help="Patrón relativo a la carpeta de etiquetas.")
+    merge.add_argument("-f", "--file", action="append", default=[],
+                       help="Ruta a una etiqueta suelta.")
+    merge.add_argument("--job-file", type=Path, help="Archivo JSON con varios trabajos.")
+    merge.add_argument("-p", "--preset", action="append", default=[],
+                       help="Fusionar un preset guardado (uno o más; cada uno en su PDF).")
+    merge.add_argument("-o", "--output", help="PDF de salida (trabajo único).")
+    merge.add_argument("--nup", help="Etiquetas por hoja, COLUMNASxFILAS (p. ej. 2x4).")
+    merge.add_argument("--paper", default="a4", help="Tamaño de hoja para --nup.")
+    merge.add_argument("-j", "--jobs", type=int, default=min(4, os.cpu_count() or 1),
+                       help="Trabajos simultáneos.")
+    merge.add_argument("--email", action="store_true", help="Enviar cada salida por email.")
+    merge.add_argument("--on-invalid", choices=PREFLIGHT_POLICIES, default="fail",
+                       help="Etiquetas dañadas o con contraseña: fallar antes de empezar, "
+                            "omitirlas (skip) u omitir solo las irrecuperables (repair).")
+    merge.add_argument("--no-preflight", action="store_true",
+                       help="No validar las etiquetas antes de fusionar.")
+    merge.add_argument("--metrics", type=Path,
+                       help="Agregar las métricas por archivo a este JSON Lines.")
+
+    email = commands.add_parser("email", help="Envía un PDF por email.")
+    email.add_argument("pdf", help="PDF a adjuntar.")
+    email.add_argument("--to", help="Destinatario (por defecto, el de config.ini).")
+    email.add_argument("--queue", action="store_true",
+                       help="Dejarlo en la cola de salida en vez de enviarlo ya.")
+
+    presets = commands.add_parser("presets", help="Lista, guarda o borra presets de selección.")
+    presets.add_argument("--save", metavar="NOMBRE",
+                         help="Guardar como preset la selección de --category/--glob/--file.")
+    presets.add_argument("--delete", metavar="NOMBRE", help="Borrar un preset.")
+    presets.add_argument("-c", "--category", action="append", default=[])
+    presets.add_argument("-g", "--glob", action="append", default=[])
+    presets.add_argument("-f", "--file", action="append", default=[],
+                         help="Etiqueta relativa a la carpeta de etiquetas.")
+
+    commands.add_parser("bundles", help="Arma los paquetes por categoría que estén vencidos.")
+
+    outbox = commands.add_parser("outbox", help="Muestra o despacha la cola de emails.")
+    outbox.add_argument("--drain", action="store_true",
+                        help="Enviar ahora los emails vencidos de la cola.")
+    return parser
+
+
+def _get_outbox(args) -> FileEmailOutbox:
+    return FileEmailOutbox(args.output_dir / "outbox", _get_email_service(),
+                           secrets=lambda: load_email_config(args.config))
+
+
+def _get_preset_store(args) -> JsonPresetStore:
+    return JsonPresetStore(
+        args.config.parent / PRESETS_FILE_NAME, args.input_dir,
+        args.output_dir / PLANS_FILE_NAME,
+        SQLitePreflightIndex(args.output_dir / PREFLIGHT_INDEX_NAME, workers=min(4, os.cpu_count() or 1))
+    )
+
+
+def _preset_jobs(args, writer: JsonEventWriter) -> Optional[List[Dict]]:
+    """
+    Un trabajo por preset, con las etiquetas ya resueltas por su plan.
+
+    Los planes vienen validados, así que estos trabajos no repiten la
+    validación previa. Devuelve None si algún preset no se pudo usar.
+    """
+    if args.output and len(args.preset) > 1:
+        raise ValueError("--output solo se admite con un único --preset.")
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    store = _get_preset_store(args)
+    jobs = []
+    for name in args.preset:
+        try:
+            plan = plan_preset_use_case(name, store, on_invalid=args.on_invalid)
+        except MergeError as e:
+            writer.emit("error", job=name, error=str(e))
+            return None
+        writer.emit("plan", job=name, files=len(plan.entries), pages=plan.total_pages,
+                    fingerprint=plan.fingerprint[:16], reused=plan.reused,
+                    skipped=[Path(r.path).name for r in plan.skipped])
+        jobs.append({
+            "name": name,
+            "output": args.output or str(args.output_dir / f"{name}.pdf"),
+            "files": plan.entries,
+            "nup": parse_nup(args.nup),
+            "paper": args.paper,
+            "email": args.email,
+            "planned": True,
+        })
+    return jobs
+
+
+def _merge_command(args, writer: JsonEventWriter) -> int:
+    if args.job_file:
+        if args.category or args.glob or args.file or args.output or args.preset:
+            raise ValueError("--job-file no se combina con --category/--glob/--file/--output/--preset.")
+        jobs = load_jobs(args.job_file, args.input_dir, args.output_dir)
+    elif args.preset:
+        if args.category or args.glob or args.file:
+            raise ValueError("--preset no se combina con --category/--glob/--file.")
+        jobs = _preset_jobs(args, writer)
+        if jobs is None:
+            return 1
+    else:
+        output = args.output or str(args.output_dir / DEFAULT_OUTPUT_NAME)
+        jobs = [{
+            "name": Path(output).stem,
+            "output": output,
+            "files": resolve_selection(args.input_dir, args.category, args.glob, args.file),
+            "nup": parse_nup(args.nup),
+            "paper": args.paper,
+            "email": args.email,
+        }]
+    for job in jobs:
+        if args.email:
+            job["email"] = True
+        job["metrics"] = str(args.metrics) if args.metrics else None
+        job["on_invalid"] = args.on_invalid
+        job["input_dir"] = str(args.input_dir)
+        # Los resultados se comparten con la aplicación (mismo archivo que el catálogo)
+        job["preflight_index"] = (None if args.no_preflight or job.get("planned")
+                                  else str(args.output_dir / PREFLIGHT_INDEX_NAME))
+
+    names = [job["name"] for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError("Los trabajos deben tener nombres de salida distintos.")
+
+    email_config = None
+    if any(job["email"] for job in jobs):
+        email_config = load_email_config(args.config)
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    results = run_jobs(jobs, writer, args.jobs, email_config)
+    failed = sum(1 for result in results if result["event"] != "done")
+    writer.emit("summary", jobs=len(jobs), ok=len(jobs) - failed, failed=failed,
+                seconds=round(time.perf_counter() - writer.started, 4))
+    return 1 if failed else 0
+
+
+def _email_command(args, writer: JsonEventWriter) -> int:
+    config = load_email_config(args.config)
+    if args.to:
+        config["EMAIL_RECEPTOR"] = args.to
+    started = time.perf_counter()
+    if args.queue:
+        ids = queue_pdf_email_use_case(config=config, pdf_path=args.pdf,
+                                       email_outbox=_get_outbox(args))
+        writer.emit("queued", pdf=args.pdf, ids=ids)
+        return 0
+    try:
+        send_pdf_by_email_use_case(config=config, pdf_path=args.pdf,
+                                   email_service=_get_email_service())
+    except EmailError as e:
+        writer.emit("error", error=str(e))
+        return 1
+    writer.emit("email", pdf=args.pdf, seconds=round(time.perf_counter() - started, 4))
+    return 0
+
+
+def _presets_command(args, writer: JsonEventWriter) -> int:
+    store = _get_preset_store(args)
+    if args.save:
+        store.save_preset(SelectionPreset(
+            name=args.save, categories=tuple(args.category), globs=tuple(args.glob), files=tuple(args.file)
+        ))
+    if args.delete:
+        store.delete_preset(args.delete)
+    for preset in store.list_presets():
+        writer.emit("preset", name=preset.name, categories=list(preset.categories),
+                    globs=list(preset.globs), files=[list(f) if isinstance(f, tuple) else f for f in preset.files])
+    return 0
+
+
+def _bundles_command(args, writer: JsonEventWriter) -> int:
+    bundles = CategoryBundles(args.input_dir, auto_rebuild=False)
+    started = time.perf_counter()
+    try:
+        rebuilt = bundles.rebuild_stale()
+    finally:
+        bundles.close()
+    writer.emit("bundles", rebuilt=rebuilt, seconds=round(time.perf_counter() - started, 4))
+    return 0
+
+
+def _outbox_command(args, writer: JsonEventWriter) -> int:
+    outbox = _get_outbox(args)
+    failed_before = outbox.stats()["failed"]
+    if args.drain:
+        outbox.drain()
+    stats = outbox.stats()
+    writer.emit("outbox", **stats)
+    return 1 if stats["failed"] > failed_before else 0
+
+
+def main(argv: Optional[List[str]] = None, stdout: Optional[TextIO] = None) -> int:
+    """
+    Ejecuta la línea de comandos.
+
+    Returns:
+        int: 0 si todo salió bien, 1 si algún trabajo falló, 2 ante un
+            error de uso.
+    """
+    args = build_parser().parse_args(argv)
+    writer = JsonEventWriter(stdout or sys.stdout)
+    # Los print() de la infraestructura no deben mezclarse con el JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            if args.command == "merge":
+                return _merge_command(args, writer)
+            if args.command == "outbox":
+                return _outbox_command(args, writer)
+            if args.command == "presets":
+                return _presets_command(args, writer)
+            if args.command == "bundles":
+                return _bundles_command(args, writer)
+            return _email_command(args, writer)
+        except (ValueError, OSError) as e:
+            writer.emit("error", error=str(e))
+            return 2
+        finally:
+            if _email_service is not None:
+                _email_service.close()
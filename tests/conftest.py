@@ -26,3 +26,134 @@ def valid_config():
         'EMAIL_RECEPTOR': 'receiver@example.com',
         'ASUNTO': 'Test Subject'
     }
+
+
+class StubSMTPServer:
+    """
+    Minimal threaded SMTP server for tests (plain text, AUTH PLAIN).
+
+    Records every connection, login and delivered message so tests can
+    check how the email service uses connections.
+    """
+
+    def __init__(self):
+        import socketserver
+        import threading
+
+        self.connections = 0
+        self.logins = 0
+        self.noops = 0
+        self.messages = []  # (mail_from, [rcpt], data bytes)
+        self.keep_data = True  # False: only record the size of each message
+        self.reject = set()
+        self.password = "password"
+        self._sockets = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                with server._lock:
+                    server.connections += 1
+                    server._sockets.append(self.request)
+                self._reply("220 stub ESMTP")
+                mail_from, rcpts = None, []
+                while True:
+                    try:
+                        line = self.rfile.readline()
+                    except OSError:
+                        return
+                    if not line:
+                        return
+                    command = line.decode().strip()
+                    verb = command.split(" ", 1)[0].upper()
+                    if verb in ("EHLO", "HELO"):
+                        self._reply("250-stub\r\n250-AUTH PLAIN\r\n250 8BITMIME")
+                    elif verb == "AUTH":
+                        import base64
+                        _, user, password = base64.b64decode(command.split()[2]).split(b"\0")
+                        if password.decode() == server.password:
+                            with server._lock:
+                                server.logins += 1
+                            self._reply("235 ok")
+                        else:
+                            self._reply("535 bad credentials")
+                    elif verb == "MAIL":
+                        mail_from, rcpts = command.split(":", 1)[1].strip(" <>"), []
+                        self._reply("250 ok")
+                    elif verb == "RCPT":
+                        rcpt = command.split(":", 1)[1].strip(" <>")
+                        if rcpt in server.reject:
+                            self._reply("550 no such user")
+                        else:
+                            rcpts.append(rcpt)
+                            self._reply("250 ok")
+                    elif verb == "DATA":
+                        self._reply("354 go ahead")
+                        chunks, size = [], 0
+                        for data_line in self.rfile:
+                            if data_line == b".\r\n":
+                                break
+                            data_line = data_line[1:] if data_line.startswith(b"..") else data_line
+                            size += len(data_line)
+                            if server.keep_data:
+                                chunks.append(data_line)
+                        else:
+                            return  # cut before the final dot: nothing is delivered
+                        data = b"".join(chunks) if server.keep_data else size
+                        with server._lock:
+                            server.messages.append((mail_from, rcpts, data))
+                        self._reply("250 queued")
+                    elif verb == "NOOP":
+                        with server._lock:
+                            server.noops += 1
+                        self._reply("250 ok")
+                    elif verb == "RSET":
+                        mail_from, rcpts = None, []
+                        self._reply("250 ok")
+                    elif verb == "QUIT":
+                        self._reply("221 bye")
+                        return
+                    else:
+                        self._reply("502 not implemented")
+
+            def _reply(self, text):
+                self.wfile.write(text.encode() + b"\r\n")
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self._server = Server(("127.0.0.1", 0), Handler)
+        self.host, self.port = self._server.server_address
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+
+    def drop_connections(self):
+        """Closes every open client connection, as an idle-timeout would."""
+        import socket
+        with self._lock:
+            sockets, self._sockets = self._sockets, []
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def config(self, valid_config):
+        return {**valid_config, "SMTP_HOST": self.host, "SMTP_PORT": str(self.port), "SMTP_SSL": "0"}
+
+    def close(self):
+        self.drop_connections()
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def smtp_server():
+    """A local stand-in SMTP server, stopped after the test."""
+    server = StubSMTPServer()
+    yield server
+    server.close()
@@ -0,0 +1,26 @@
+import json
+from benchmarks import bench_suite
+
+def test_suite_records_every_case_and_flags_regressions(tmp_path):
+    """A tiny run records all cases; a faster baseline makes the comparison fail."""
+    results_file = tmp_path / "results.json"
+
+    code = bench_suite.main(["--sizes", "20", "--repeat", "1", "--data-dir", str(tmp_path / "data"),
+                             "--json", str(results_file)])
+
+    assert code == 0
+    results = json.loads(results_file.read_text())
+    assert set(results["results"]) == {
+        "scan_cold/20", "scan_warm/20", "merge/20", "merge_bundled/20",
+        "load_local/20", "load_slow/20", "email/20"
+    }
+    assert set(results["results"]["load_slow/20"]["variants"]) == set(bench_suite.LOAD_VARIANTS)
+    assert results["results"]["merge_bundled/20"]["opened"] == 1
+    merge = results["results"]["merge/20"]
+    assert merge["items"] == 20 and merge["output_bytes"] > 0 and merge["seconds"] > 0
+    assert results["results"]["email/20"]["output_bytes"] > merge["output_bytes"]
+
+    baseline = json.loads(results_file.read_text())
+    baseline["results"]["merge/20"]["seconds"] /= 10
+    regressions = bench_suite.compare(results, baseline, threshold=0.5)
+    assert len(regressions) == 1 and regressions[0].startswith("merge/20 seconds")
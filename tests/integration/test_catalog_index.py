@@ -0,0 +1,89 @@
+import os
+import fitz
+from src.infrastructure.catalog_index import SQLiteCatalogIndex
+import src.infrastructure.catalog_index as catalog_index
+
+def create_dummy_pdf(path, pages=1):
+    """Helper to create a valid PDF file."""
+    doc = fitz.open()
+    for _ in range(pages):
+        doc.new_page()
+    doc.save(path)
+    doc.close()
+
+def bump_mtime(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+def test_refresh_indexes_categories(temp_input_dir, tmp_path):
+    """The first refresh records category, size, pages and hash of each label."""
+    (temp_input_dir / "Suavizantes").mkdir()
+    (temp_input_dir / "Vacia").mkdir()
+    (temp_input_dir / ".bundles").mkdir()
+    create_dummy_pdf(temp_input_dir / "Suavizantes" / "B.pdf", pages=2)
+    create_dummy_pdf(temp_input_dir / "Suavizantes" / "A.pdf")
+    (temp_input_dir / "Suavizantes" / "notas.txt").write_text("x")
+
+    catalog = SQLiteCatalogIndex(temp_input_dir, tmp_path / "index.sqlite3").refresh()
+
+    assert list(catalog) == ["Suavizantes"]
+    labels = catalog["Suavizantes"]
+    assert [label.name for label in labels] == ["A.pdf", "B.pdf"]
+    assert [label.page_count for label in labels] == [1, 2]
+    assert all(len(label.content_hash) == 64 for label in labels)
+
+def test_refresh_skips_unchanged_directories(temp_input_dir, tmp_path, monkeypatch):
+    """A second refresh with no directory changes reads only the index."""
+    category = temp_input_dir / "Perfuminas"
+    category.mkdir()
+    create_dummy_pdf(category / "LYSOFORM.pdf")
+    index = SQLiteCatalogIndex(temp_input_dir, tmp_path / "index.sqlite3")
+    index.refresh()
+
+    scanned = []
+    original_scandir = os.scandir
+    monkeypatch.setattr(catalog_index.os, "scandir", lambda p: scanned.append(p) or original_scandir(p))
+    reopened = SQLiteCatalogIndex(temp_input_dir, tmp_path / "index.sqlite3")
+
+    assert [label.name for label in reopened.refresh()["Perfuminas"]] == ["LYSOFORM.pdf"]
+    assert scanned == []
+
+def test_refresh_picks_up_changes(temp_input_dir, tmp_path):
+    """Added, removed and renamed labels and categories are reflected."""
+    category = temp_input_dir / "Pileta"
+    category.mkdir()
+    create_dummy_pdf(category / "CLORO.pdf")
+    create_dummy_pdf(category / "ALGUICIDA.pdf")
+    index = SQLiteCatalogIndex(temp_input_dir, tmp_path / "index.sqlite3")
+    index.refresh()
+
+    (category / "CLORO.pdf").unlink()
+    create_dummy_pdf(category / "VERCEL.pdf", pages=3)
+    bump_mtime(category)
+    other = temp_input_dir / "Auto"
+    other.mkdir()
+    create_dummy_pdf(other / "SHAMPOO AUTO.pdf")
+    bump_mtime(temp_input_dir)
+
+    catalog = index.refresh()
+
+    assert list(catalog) == ["Auto", "Pileta"]
+    assert [(l.name, l.page_count) for l in catalog["Pileta"]] == [("ALGUICIDA.pdf", 1), ("VERCEL.pdf", 3)]
+    assert index.lookup(str(other / "SHAMPOO AUTO.pdf")).category == "Auto"
+
+def test_full_refresh_detects_in_place_edits(temp_input_dir, tmp_path):
+    """full=True re-stats files whose directory mtime did not change."""
+    category = temp_input_dir / "Ceras"
+    category.mkdir()
+    label = category / "CERA.pdf"
+    create_dummy_pdf(label)
+    index = SQLiteCatalogIndex(temp_input_dir, tmp_path / "index.sqlite3")
+    index.refresh()
+    dir_stat = os.stat(category)
+
+    create_dummy_pdf(label, pages=4)
+    bump_mtime(label)
+    os.utime(category, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+
+    assert index.refresh()["Ceras"][0].page_count == 1
+    assert index.refresh(full=True)["Ceras"][0].page_count == 4
@@ -0,0 +1,65 @@
+import queue
+import sys
+import fitz
+import pytest
+from src.infrastructure.catalog_index import SQLiteCatalogIndex
+from src.infrastructure.catalog_watcher import CatalogWatcher
+
+def create_dummy_pdf(path, pages=1):
+    """Helper to create a valid PDF file."""
+    doc = fitz.open()
+    for _ in range(pages):
+        doc.new_page()
+    doc.save(path)
+    doc.close()
+
+def collect(events_queue, count, timeout=5):
+    """Waits until `count` events arrive (or the timeout expires)."""
+    events = []
+    while len(events) < count:
+        events += events_queue.get(timeout=timeout)
+    return [(e.kind, e.label.category, e.label.name) for e in events]
+
+@pytest.fixture(params=["polling", "inotify"])
+def watcher(request, temp_input_dir, tmp_path):
+    if request.param == "inotify" and not sys.platform.startswith("linux"):
+        pytest.skip("inotify solo existe en Linux")
+    (temp_input_dir / "Suavizantes").mkdir()
+    create_dummy_pdf(temp_input_dir / "Suavizantes" / "BEBE.pdf")
+    index = SQLiteCatalogIndex(temp_input_dir, tmp_path / "index.sqlite3")
+    w = CatalogWatcher(index, poll_interval=0.05, debounce=0.05,
+                       use_inotify=request.param == "inotify")
+    events = queue.Queue()
+    w.start(events.put)
+    assert w.backend == request.param
+    yield w, events
+    w.stop()
+
+def test_watcher_reports_added_and_removed_labels(watcher, temp_input_dir):
+    """Adding and deleting a label produce one event each."""
+    _, events = watcher
+    create_dummy_pdf(temp_input_dir / "Suavizantes" / "VIVERE.pdf")
+    assert collect(events, 1) == [("added", "Suavizantes", "VIVERE.pdf")]
+
+    (temp_input_dir / "Suavizantes" / "BEBE.pdf").unlink()
+    assert collect(events, 1) == [("removed", "Suavizantes", "BEBE.pdf")]
+
+def test_watcher_reports_new_category(watcher, temp_input_dir):
+    """Labels in a newly created category are reported as added."""
+    _, events = watcher
+    category = temp_input_dir / "Perfuminas"
+    category.mkdir()
+    create_dummy_pdf(category / "LYSOFORM.pdf")
+
+    assert ("added", "Perfuminas", "LYSOFORM.pdf") in collect(events, 1)
+
+def test_watcher_reports_label_edited_in_place(watcher, temp_input_dir):
+    """Editing a label in place (the folder mtime stays put) is reported as modified."""
+    _, events = watcher
+    category = temp_input_dir / "Suavizantes"
+    folder_mtime = category.stat().st_mtime_ns
+    with open(category / "BEBE.pdf", "ab") as f:
+        f.write(b"%% editado\n")
+    assert category.stat().st_mtime_ns == folder_mtime
+
+    assert collect(events, 1) == [("modified", "Suavizantes", "BEBE.pdf")]
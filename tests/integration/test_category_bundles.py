@@ -0,0 +1,106 @@
+import os
+import time
+import fitz
+import pytest
+from src.infrastructure.category_bundles import CategoryBundles
+from src.infrastructure.merge_manifest import MergeManifest
+from src.infrastructure.pdf_repository import PyMuPDFRepository
+
+def create_label(path, text, pages=1):
+    doc = fitz.open()
+    for n in range(pages):
+        doc.new_page(width=200, height=100).insert_text((20, 50), f"{text} p{n}" if pages > 1 else text)
+    doc.save(path)
+    doc.close()
+
+def page_texts(path):
+    with fitz.open(path) as doc:
+        return [page.get_text().strip() for page in doc]
+
+@pytest.fixture
+def catalog(temp_input_dir):
+    for category in ["Perfuminas", "Suavizantes"]:
+        (temp_input_dir / category).mkdir()
+        for i in range(4):
+            create_label(temp_input_dir / category / f"{category.lower()}_{i}.pdf", f"{category} {i}",
+                         pages=2 if i == 3 else 1)
+    return temp_input_dir
+
+def labels(catalog, category):
+    return sorted(str(p) for p in (catalog / category).glob("*.pdf"))
+
+def test_full_categories_are_spliced_from_bundles(catalog, tmp_path):
+    bundles = CategoryBundles(catalog, min_members=3, auto_rebuild=False, use_processes=False)
+    assert bundles.rebuild_stale() == ["Perfuminas", "Suavizantes"]
+    assert bundles.rebuild_stale() == []
+    # Categoría completa + una etiqueta suelta de otra
+    files = labels(catalog, "Suavizantes") + [labels(catalog, "Perfuminas")[1]]
+    expected, output = tmp_path / "esperado.pdf", tmp_path / "salida.pdf"
+    PyMuPDFRepository().merge_pdfs(files, str(expected))
+
+    repository = PyMuPDFRepository(bundles=bundles)
+    report = repository.merge_pdfs(files, str(output))
+
+    assert page_texts(output) == page_texts(expected)
+    assert (report["bundles"], report["opened"]) == (1, 2)
+
+def test_extra_copies_inside_a_category_skip_the_bundle(catalog, tmp_path):
+    """A whole category with one label printed twice must not be replaced by the bundle."""
+    bundles = CategoryBundles(catalog, min_members=3, auto_rebuild=False, use_processes=False)
+    bundles.rebuild_stale()
+    members = labels(catalog, "Perfuminas")
+    files = [members[0], (members[1], 2), members[2], members[3]]
+    expected, output = tmp_path / "esperado.pdf", tmp_path / "salida.pdf"
+    PyMuPDFRepository().merge_pdfs(files, str(expected))
+
+    report = PyMuPDFRepository(bundles=bundles).merge_pdfs(files, str(output))
+
+    assert page_texts(output) == page_texts(expected)
+    assert len(page_texts(output)) == 6
+    assert report["bundles"] == 0
+
+def test_changed_member_falls_back_until_rebuilt(catalog, tmp_path):
+    bundles = CategoryBundles(catalog, min_members=3, auto_rebuild=False, use_processes=False)
+    bundles.rebuild("Perfuminas")
+    files = [(path, 1) for path in labels(catalog, "Perfuminas")]
+    assert [pages for _, pages in bundles.substitute(files)] == [[1, 1, 1, 2]]
+
+    time.sleep(0.01)
+    create_label(catalog / "Perfuminas" / "perfuminas_0.pdf", "Editada")
+    assert [pages for _, pages in bundles.substitute(files)] == [None] * 4
+
+    assert bundles.rebuild("Perfuminas")
+    repository = PyMuPDFRepository(bundles=bundles)
+    report = repository.merge_pdfs([path for path, _ in files], str(tmp_path / "salida.pdf"))
+    assert page_texts(tmp_path / "salida.pdf")[0] == "Editada"
+    assert report["opened"] == 1
+
+def test_incremental_update_after_bundled_merge(catalog, tmp_path):
+    """Page ranges recorded for a bundled merge let the next merge update in place."""
+    bundles = CategoryBundles(catalog, min_members=3, auto_rebuild=False, use_processes=False)
+    bundles.rebuild_stale()
+    files = labels(catalog, "Perfuminas") + labels(catalog, "Suavizantes")
+    output = tmp_path / "salida.pdf"
+    repository = PyMuPDFRepository(incremental=True, bundles=bundles)
+    repository.merge_pdfs(files, str(output))
+    assert [(s["start"], s["pages"]) for s in MergeManifest.load(str(output)).sources][3:5] == [(3, 2), (5, 1)]
+
+    time.sleep(0.01)
+    create_label(catalog / "Suavizantes" / "suavizantes_1.pdf", "Nueva")
+    report = repository.merge_pdfs(files, str(output))
+
+    assert report["mode"] == "incremental"
+    assert page_texts(output)[6] == "Nueva" and len(page_texts(output)) == 10
+
+def test_stale_bundle_is_rebuilt_in_background(catalog):
+    bundles = CategoryBundles(catalog, min_members=3, use_processes=False)
+    files = [(path, 1) for path in labels(catalog, "Suavizantes")]
+
+    assert [pages for _, pages in bundles.substitute(files)] == [None] * 4
+    deadline = time.monotonic() + 30
+    while bundles.rebuilt == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    bundles.close()
+
+    assert os.path.exists(catalog / ".bundles" / "Suavizantes.pdf")
+    assert [pages for _, pages in bundles.substitute(files)] == [[1, 1, 1, 2]]
@@ -0,0 +1,221 @@
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+import fitz
+import pytest
+from src.interface.cli import main
+
+def create_label(path, text):
+    """Helper to create a small, label-sized PDF."""
+    doc = fitz.open()
+    page = doc.new_page(width=200, height=100)
+    page.insert_text((20, 50), text)
+    doc.save(path)
+    doc.close()
+
+@pytest.fixture
+def catalog(temp_input_dir):
+    for category in ["Gatos", "Perros"]:
+        (temp_input_dir / category).mkdir()
+        for i in range(3):
+            create_label(temp_input_dir / category / f"{category.lower()}_{i}.pdf", f"{category} {i}")
+    return temp_input_dir
+
+def run_cli(*argv):
+    out = io.StringIO()
+    code = main(list(argv), stdout=out)
+    return code, [json.loads(line) for line in out.getvalue().splitlines()]
+
+def test_merge_by_category_and_glob(catalog, temp_output_dir):
+    """A single job built from a category and a glob emits JSON events in order."""
+    output = temp_output_dir / "perros.pdf"
+
+    code, events = run_cli(
+        "--input-dir", str(catalog), "--output-dir", str(temp_output_dir),
+        "merge", "-c", "Perros", "-g", "Gatos/*_1.pdf", "-o", str(output)
+    )
+
+    assert code == 0
+    assert [e["event"] for e in events if e["event"] != "progress"] == ["start", "preflight", "done", "summary"]
+    assert events[-2]["output_bytes"] == output.stat().st_size
+    with fitz.open(output) as doc:
+        assert [page.get_text().strip() for page in doc] == ["Perros 0", "Perros 1", "Perros 2", "Gatos 1"]
+
+def test_job_file_runs_jobs_concurrently(catalog, temp_output_dir, tmp_path):
+    """Jobs from a job file run on a process pool; a failing job doesn't stop the rest."""
+    job_file = tmp_path / "jobs.json"
+    job_file.write_text(json.dumps({"jobs": [
+        {"output": "perros.pdf", "categories": ["Perros"]},
+        {"output": "hoja.pdf", "globs": ["*/*_0.pdf"], "nup": "2x1"},
+        {"output": "copias.pdf", "files": [["Gatos/gatos_2.pdf", 3]]},
+        {"output": "roto.pdf", "files": ["Gatos/no_existe.pdf"]},
+    ]}))
+
+    code, events = run_cli(
+        "--input-dir", str(catalog), "--output-dir", str(temp_output_dir),
+        "merge", "--job-file", str(job_file), "--jobs", "2"
+    )
+
+    assert code == 1
+    assert events[-1] == {**events[-1], "event": "summary", "jobs": 4, "ok": 3, "failed": 1}
+    done = {e["job"]: e for e in events if e["event"] == "done"}
+    assert set(done) == {"perros", "hoja", "copias"}
+    assert done["hoja"]["mode"] == "2x1"
+    with fitz.open(temp_output_dir / "copias.pdf") as doc:
+        assert doc.page_count == 3
+
+def test_unknown_category_is_a_usage_error(catalog, temp_output_dir):
+    code, events = run_cli(
+        "--input-dir", str(catalog), "--output-dir", str(temp_output_dir),
+        "merge", "-c", "Loros"
+    )
+
+    assert code == 2
+    assert "Loros" in events[-1]["error"]
+
+def test_cli_never_imports_gui_modules(catalog, temp_output_dir):
+    """The headless entry point must not load tkinter, customtkinter or PIL."""
+    script = (
+        "import sys\n"
+        "from src.interface.cli import main\n"
+        f"code = main(['--input-dir', {str(catalog)!r}, '--output-dir', {str(temp_output_dir)!r},"
+        " 'merge', '-c', 'Gatos'])\n"
+        "loaded = [m for m in ('tkinter', 'customtkinter', 'PIL') if m in sys.modules]\n"
+        "print('LOADED', loaded, code)\n"
+    )
+    root = Path(__file__).resolve().parents[2]
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                            check=True, cwd=root)
+
+    assert "LOADED [] 0" in result.stdout
+
+def test_queued_email_is_sent_by_outbox_drain(temp_output_dir, tmp_path, smtp_server, valid_config):
+    """`email --queue` only writes to the outbox; `outbox --drain` delivers it."""
+    pdf = tmp_path / "etiquetas.pdf"
+    create_label(pdf, "Perros 0")
+    config_file = tmp_path / "config.ini"
+    config = smtp_server.config({**valid_config, "EMAIL_RECEPTOR": "a@x.com, b@x.com"})
+    config_file.write_text("[Email]\n" + "".join(f"{k} = {v}\n" for k, v in config.items()))
+    common = ("--output-dir", str(temp_output_dir), "--config", str(config_file))
+
+    code, events = run_cli(*common, "email", "--queue", str(pdf))
+    assert code == 0 and len(events[-1]["ids"]) == 2
+    assert smtp_server.messages == []
+
+    code, events = run_cli(*common, "outbox", "--drain")
+    assert code == 0
+    assert events[-1]["event"] == "outbox"
+    assert events[-1]["sent"] == 2 and events[-1]["pending"] == 0
+    assert sorted(rcpts[0] for _, rcpts, _ in smtp_server.messages) == ["a@x.com", "b@x.com"]
+
+def test_merge_reports_throughput_and_writes_metrics(catalog, temp_output_dir, tmp_path):
+    """Progress events carry rates and an ETA; --metrics appends one line per file."""
+    metrics = tmp_path / "metricas.jsonl"
+
+    code, events = run_cli(
+        "--input-dir", str(catalog), "--output-dir", str(temp_output_dir),
+        "merge", "-c", "Perros", "-c", "Gatos", "--metrics", str(metrics)
+    )
+
+    assert code == 0
+    progress = [e for e in events if e["event"] == "progress"]
+    assert "eta_seconds" not in progress[0]
+    assert progress[3]["eta_seconds"] >= 0 and progress[3]["pages_per_second"] > 0
+    done = next(e for e in events if e["event"] == "done")
+    assert done["pages"] == 6 and done["mb_per_second"] > 0
+    lines = [json.loads(line) for line in metrics.read_text().splitlines()]
+    assert [line["event"] for line in lines].count("file") == 6
+    assert lines[0]["event"] == "merge_start" and lines[-1]["event"] == "merge_end"
+    assert {line["job"] for line in lines} == {"etiquetas_imprimir"}
+
+def test_preflight_fails_fast_or_skips_bad_labels(catalog, temp_output_dir):
+    """A password-protected label stops the job before any work unless told to skip it."""
+    doc = fitz.open()
+    doc.new_page()
+    doc.save(catalog / "Perros" / "perros_9.pdf", encryption=fitz.PDF_ENCRYPT_AES_256, user_pw="u", owner_pw="o")
+    doc.close()
+    output = temp_output_dir / "perros.pdf"
+    common = ("--input-dir", str(catalog), "--output-dir", str(temp_output_dir), "merge", "-c", "Perros",
+              "-o", str(output))
+
+    code, events = run_cli(*common)
+    assert code == 1
+    assert "perros_9.pdf" in next(e for e in events if e["event"] == "error")["error"]
+    assert not any(e["event"] == "progress" for e in events) and not output.exists()
+
+    code, events = run_cli(*common, "--on-invalid", "skip")
+    assert code == 0
+    preflight = next(e for e in events if e["event"] == "preflight")
+    assert preflight["skipped"] == ["perros_9.pdf"] and preflight["pages"] == 3
+    with fitz.open(output) as merged:
+        assert merged.page_count == 3
+
+def test_saved_preset_merges_from_its_plan(catalog, temp_output_dir, tmp_path):
+    """A preset is saved next to config.ini, compiled once and reused on the next merge."""
+    common = ("--input-dir", str(catalog), "--output-dir", str(temp_output_dir),
+              "--config", str(tmp_path / "config.ini"))
+    code, events = run_cli(*common, "presets", "--save", "Semanal", "-c", "Gatos", "-f", "Perros/perros_2.pdf")
+    assert code == 0 and events == [{"event": "preset", "t": events[0]["t"], "name": "Semanal",
+                                     "categories": ["Gatos"], "globs": [], "files": ["Perros/perros_2.pdf"]}]
+    assert (tmp_path / "presets.json").exists()
+
+    code, events = run_cli(*common, "merge", "--preset", "Semanal")
+    assert code == 0
+    assert [e["event"] for e in events if e["event"] != "progress"] == ["plan", "start", "done", "summary"]
+    assert events[0]["files"] == 4 and events[0]["pages"] == 4 and not events[0]["reused"]
+    with fitz.open(temp_output_dir / "Semanal.pdf") as doc:
+        assert [page.get_text().strip() for page in doc] == ["Gatos 0", "Gatos 1", "Gatos 2", "Perros 2"]
+
+    code, events = run_cli(*common, "merge", "--preset", "Semanal")
+    assert code == 0 and events[0]["reused"]
+
+def test_bundles_command_prepares_whole_category_merges(catalog, temp_output_dir, monkeypatch):
+    """After `bundles`, merging a full category opens its bundle instead of each label."""
+    from src.interface import cli
+    monkeypatch.setattr(cli, "_repository", None)
+    for i in range(3, 8):
+        create_label(catalog / "Perros" / f"perros_{i}.pdf", f"Perros {i}")
+    common = ("--input-dir", str(catalog), "--output-dir", str(temp_output_dir))
+
+    # Gatos tiene muy pocas etiquetas para armarle un paquete
+    code, events = run_cli(*common, "bundles")
+    assert code == 0 and events[0]["rebuilt"] == ["Perros"]
+
+    code, events = run_cli(*common, "merge", "-c", "Perros", "-f", "Gatos/gatos_0.pdf")
+    done = next(e for e in events if e["event"] == "done")
+    assert code == 0 and (done["bundles"], done["opened"]) == (1, 2)
+    with fitz.open(temp_output_dir / "etiquetas_imprimir.pdf") as doc:
+        assert [page.get_text().strip() for page in doc] == [f"Perros {i}" for i in range(8)] + ["Gatos 0"]
+
+@pytest.mark.parametrize("failure, cancelled", [
+    (RuntimeError("fitz se cayó"), False),
+    (None, True),
+])
+def test_unexpected_job_errors_become_error_events(catalog, temp_output_dir, monkeypatch, failure, cancelled):
+    """One failing job reports a JSON error event and the batch keeps going."""
+    from src.core.exceptions import OperationCancelled
+    from src.interface import cli
+    calls = []
+
+    def flaky_merge(**kwargs):
+        calls.append(kwargs["output_path"])
+        if len(calls) == 1:
+            raise failure or OperationCancelled("La operación fue cancelada.")
+        return original_merge(**kwargs)
+
+    original_merge = cli.merge_pdfs_use_case
+    monkeypatch.setattr(cli, "merge_pdfs_use_case", flaky_merge)
+    jobs = [{"name": name, "files": [str(catalog / "Gatos" / "gatos_0.pdf")],
+             "output": str(temp_output_dir / f"{name}.pdf")} for name in ("uno", "dos")]
+
+    results = cli.run_jobs(jobs, cli.JsonEventWriter(io.StringIO()), max_jobs=1)
+    errors = [r for r in results if r["event"] == "error"]
+
+    assert [r["event"] for r in results] == ["error", "done"]
+    assert errors[0]["job"] == "uno"
+    if cancelled:
+        assert errors[0]["cancelled"] is True
+    else:
+        assert "RuntimeError" in errors[0]["error"] and "fitz se cayó" in errors[0]["error"]
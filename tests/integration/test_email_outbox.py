@@ -0,0 +1,155 @@
+import json
+import threading
+import time
+from unittest.mock import Mock
+import pytest
+from src.core.exceptions import EmailError
+from src.core.interfaces import IEmailService
+from src.infrastructure.email_outbox import FileEmailOutbox, TokenBucket
+
+@pytest.fixture
+def pdf(tmp_path):
+    path = tmp_path / "etiquetas_imprimir.pdf"
+    path.write_bytes(b"%PDF-1.4 test")
+    return path
+
+def make_outbox(directory, service, **kwargs):
+    kwargs.setdefault("rate_per_minute", 6000)
+    kwargs.setdefault("burst", 100)
+    return FileEmailOutbox(directory, service, secrets=lambda: {"APP_PASSWORD": "secreto"}, **kwargs)
+
+def test_enqueue_persists_one_job_per_recipient_without_password(tmp_path, pdf, valid_config):
+    service = Mock(spec=IEmailService)
+    outbox = make_outbox(tmp_path / "outbox", service)
+    config = {**valid_config, "EMAIL_RECEPTOR": "a@x.com, b@x.com"}
+
+    ids = outbox.enqueue(config, str(pdf))
+    pdf.write_bytes(b"%PDF-1.4 changed later")
+
+    assert len(ids) == 2
+    assert outbox.stats()["pending"] == 2
+    for job_id in ids:
+        stored = (tmp_path / "outbox" / "pending" / f"{job_id}.json").read_text()
+        assert "APP_PASSWORD" not in stored and "password" not in stored
+        copy = tmp_path / "outbox" / "pending" / job_id / "etiquetas_imprimir.pdf"
+        assert copy.read_bytes() == b"%PDF-1.4 test"
+    service.send_email_with_attachment.assert_not_called()
+
+def test_drain_sends_with_current_password_and_records_result(tmp_path, pdf, valid_config):
+    service = Mock(spec=IEmailService)
+    outbox = make_outbox(tmp_path / "outbox", service)
+    [job_id] = outbox.enqueue(valid_config, str(pdf))
+
+    assert outbox.drain()
+
+    config, path = service.send_email_with_attachment.call_args.args
+    assert config["APP_PASSWORD"] == "secreto"
+    assert config["EMAIL_RECEPTOR"] == valid_config["EMAIL_RECEPTOR"]
+    assert path.endswith("etiquetas_imprimir.pdf")
+    assert outbox.stats()["sent"] == 1 and outbox.stats()["sent_per_minute"] == 1
+    assert json.loads((tmp_path / "outbox" / "sent" / f"{job_id}.json").read_text())["attempts"] == 1
+    assert list((tmp_path / "outbox" / "pending").iterdir()) == []
+
+def test_failures_back_off_exponentially_then_give_up(tmp_path, pdf, valid_config):
+    service = Mock(spec=IEmailService)
+    service.send_email_with_attachment.side_effect = EmailError("Se perdió la conexión")
+    outbox = make_outbox(tmp_path / "outbox", service, base_delay=100, max_attempts=3)
+    [job_id] = outbox.enqueue(valid_config, str(pdf))
+    job_path = tmp_path / "outbox" / "pending" / f"{job_id}.json"
+
+    outbox.drain()
+    job = json.loads(job_path.read_text())
+    assert job["attempts"] == 1
+    assert 80 <= job["next_attempt"] - time.time() <= 120
+    assert outbox.stats()["retries"] == 1
+
+    # Forzar el vencimiento de los reintentos
+    for _ in range(2):
+        with outbox._cond:
+            outbox._queue = [(0, created, jid) for _, created, jid in outbox._queue]
+        outbox.drain()
+
+    assert service.send_email_with_attachment.call_count == 3
+    assert outbox.stats()["failed"] == 1 and outbox.stats()["pending"] == 0
+    failed = json.loads((tmp_path / "outbox" / "failed" / f"{job_id}.json").read_text())
+    assert failed["last_error"] == "Se perdió la conexión"
+
+def test_unexpected_errors_count_as_failed_attempts(tmp_path, pdf, valid_config):
+    """A damaged PDF (fitz RuntimeError) or broken secrets must not leak the in-flight slot."""
+    service = Mock(spec=IEmailService)
+    service.send_email_with_attachment.side_effect = RuntimeError("cannot open broken document")
+    outbox = make_outbox(tmp_path / "outbox", service, max_attempts=1)
+    [bad_pdf] = outbox.enqueue(valid_config, str(pdf))
+    [bad_secrets] = outbox.enqueue(valid_config, str(pdf))
+    outbox.secrets = Mock(side_effect=[{"APP_PASSWORD": "secreto"}, OSError("config.ini ilegible")])
+
+    outbox.drain()
+
+    assert outbox.stats()["in_flight"] == 0 and outbox.stats()["failed"] == 2
+    errors = {job_id: json.loads((tmp_path / "outbox" / "failed" / f"{job_id}.json").read_text())["last_error"]
+              for job_id in (bad_pdf, bad_secrets)}
+    assert "cannot open broken document" in errors[bad_pdf]
+    assert "config.ini ilegible" in errors[bad_secrets]
+
+def test_pending_jobs_survive_a_restart(tmp_path, pdf, valid_config):
+    first = make_outbox(tmp_path / "outbox", Mock(spec=IEmailService))
+    first.enqueue(valid_config, str(pdf))
+
+    service = Mock(spec=IEmailService)
+    second = make_outbox(tmp_path / "outbox", service)
+
+    assert second.stats()["pending"] == 1
+    assert second.drain()
+    service.send_email_with_attachment.assert_called_once()
+
+def test_two_processes_never_send_the_same_job(tmp_path, pdf, valid_config):
+    """The GUI and `cli.py outbox --drain` share the folder: only the one that claims a job sends it."""
+    gui_service, cli_service = Mock(spec=IEmailService), Mock(spec=IEmailService)
+    gui = make_outbox(tmp_path / "outbox", gui_service)
+    gui.enqueue({**valid_config, "EMAIL_RECEPTOR": "a@x.com,b@x.com"}, str(pdf))
+    cli = make_outbox(tmp_path / "outbox", cli_service)
+
+    assert cli.drain()
+    gui.drain()
+
+    assert cli_service.send_email_with_attachment.call_count == 2
+    gui_service.send_email_with_attachment.assert_not_called()
+    assert gui.stats()["pending"] == 0 and gui.stats()["in_flight"] == 0
+    assert list((tmp_path / "outbox" / "in_flight").iterdir()) == []
+
+def test_jobs_claimed_by_a_dead_process_are_recovered(tmp_path, pdf, valid_config, monkeypatch):
+    outbox = make_outbox(tmp_path / "outbox", Mock(spec=IEmailService))
+    [job_id] = outbox.enqueue(valid_config, str(pdf))
+    outbox._claim(job_id)
+    claimed = list((tmp_path / "outbox" / "in_flight").iterdir())
+    assert len(claimed) == 1
+
+    # El mismo envío, tomado por un proceso de esta máquina que ya terminó
+    dead = claimed[0].with_name(f"{job_id}@999999@{outbox._host}.json")
+    claimed[0].rename(dead)
+    monkeypatch.setattr("src.infrastructure.email_outbox._pid_alive", lambda pid: pid != 999999)
+
+    service = Mock(spec=IEmailService)
+    assert make_outbox(tmp_path / "outbox", service).drain()
+    service.send_email_with_attachment.assert_called_once()
+    assert not dead.exists()
+
+def test_background_dispatch_notifies_listeners(tmp_path, pdf, valid_config):
+    service = Mock(spec=IEmailService)
+    outbox = make_outbox(tmp_path / "outbox", service, max_concurrency=2)
+    done = threading.Event()
+    outbox.subscribe(lambda stats: stats["sent"] == 3 and done.set())
+    outbox.start()
+    try:
+        outbox.enqueue({**valid_config, "EMAIL_RECEPTOR": "a@x.com,b@x.com,c@x.com"}, str(pdf))
+        assert done.wait(5)
+    finally:
+        outbox.stop()
+    assert outbox.stats()["pending"] == 0 and outbox.stats()["in_flight"] == 0
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=20, capacity=2)
+    started = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - started >= 0.12
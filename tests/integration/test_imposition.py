@@ -0,0 +1,116 @@
+import fitz
+import pytest
+from src.core.exceptions import MergeError
+from src.infrastructure.pdf_repository import PyMuPDFRepository
+
+def create_label(path, text):
+    """Helper to create a small, label-sized PDF."""
+    doc = fitz.open()
+    page = doc.new_page(width=200, height=100)
+    page.insert_text((20, 50), text)
+    doc.save(path)
+    doc.close()
+
+def count_forms(path):
+    with fitz.open(path) as doc:
+        return sum(
+            1 for xref in range(1, doc.xref_length())
+            if doc.xref_get_key(xref, "Subtype") == ("name", "/Form")
+        )
+
+def test_impose_pdfs_tiles_labels_on_sheets(tmp_path):
+    """20 labels on a 2x4 grid fit in 3 A4 sheets, in selection order."""
+    unique = []
+    for i in range(5):
+        pdf = tmp_path / f"label_{i}.pdf"
+        create_label(pdf, f"Label {i}")
+        unique.append(str(pdf))
+    files = unique * 4
+    output = tmp_path / "sheets.pdf"
+
+    PyMuPDFRepository().impose_pdfs(files, str(output), columns=2, rows=4)
+
+    with fitz.open(output) as doc:
+        assert doc.page_count == 3
+        assert doc[0].rect == fitz.paper_rect("a4")
+        words = sorted(doc[0].get_text("words"), key=lambda w: (round(w[1]), w[0]))
+        labels = [f"{a[4]} {b[4]}" for a, b in zip(words[::2], words[1::2])]
+        assert labels == [f"Label {i % 5}" for i in range(8)]
+
+def test_impose_pdfs_reuses_placed_xobjects(tmp_path):
+    """Repeated labels reference the same placed XObject.
+
+    Each placement adds only a tiny wrapper form (matrix + clip); the label
+    content itself is stored once.
+    """
+    pdf = tmp_path / "label.pdf"
+    create_label(pdf, "Repeated")
+    output = tmp_path / "sheets.pdf"
+
+    PyMuPDFRepository().impose_pdfs([str(pdf)] * 24, str(output), columns=3, rows=8)
+
+    assert count_forms(output) == 24 + 1
+
+def test_impose_pdfs_invalid_input(tmp_path):
+    """A broken label raises MergeError like a regular merge."""
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+
+    with pytest.raises(MergeError, match="Error al procesar el archivo"):
+        PyMuPDFRepository().impose_pdfs([str(broken)], str(tmp_path / "out.pdf"), columns=2, rows=4)
+
+def test_impose_pdfs_grid_too_large(tmp_path):
+    pdf = tmp_path / "label.pdf"
+    create_label(pdf, "Label")
+
+    with pytest.raises(MergeError, match="La grilla no entra"):
+        PyMuPDFRepository().impose_pdfs([str(pdf)], str(tmp_path / "out.pdf"), columns=200, rows=1)
+
+@pytest.mark.parametrize("grid", [(0, 4), (2, 0), (-1, 4)])
+def test_impose_pdfs_rejects_empty_grid(tmp_path, grid):
+    """A direct repository call validates the grid instead of dividing by zero."""
+    pdf = tmp_path / "label.pdf"
+    create_label(pdf, "Label")
+    columns, rows = grid
+
+    with pytest.raises(ValueError, match="La grilla debe tener"):
+        PyMuPDFRepository().impose_pdfs([str(pdf)], str(tmp_path / "out.pdf"), columns=columns, rows=rows)
+
+def test_impose_pdfs_reports_metrics_and_can_be_cancelled(tmp_path):
+    from src.core.exceptions import OperationCancelled
+    from src.core.jobs import CancellationToken
+    from src.core.use_cases import impose_pdfs_use_case
+    files = []
+    for i in range(4):
+        pdf = tmp_path / f"label_{i}.pdf"
+        create_label(pdf, f"Label {i}")
+        files.append(str(pdf))
+    output = tmp_path / "sheets.pdf"
+    events = []
+
+    class Sink:
+        def record(self, event, fields):
+            events.append((event, fields))
+
+    report = impose_pdfs_use_case(files, str(output), PyMuPDFRepository(), columns=2, rows=1,
+                                  margin=0, gap=0, metrics=Sink())
+    assert (report["labels"], report["sheets"]) == (4, 2)
+    assert [e for e, _ in events].count("file") == 4
+    assert events[0][0] == "merge_start" and events[-1] == ("merge_end", events[-1][1])
+    with fitz.open(output) as doc:
+        # Sin margen ni separación, la celda es media hoja y empieza en el borde
+        scale = fitz.paper_rect("a4").width / 2 / 200
+        assert doc[0].get_text("words")[0][0] == pytest.approx(20 * scale, abs=0.5)
+
+    before = output.read_bytes()
+    token = CancellationToken()
+
+    def cancel_after_first(current, total):
+        if current == 1:
+            token.cancel()
+
+    with pytest.raises(OperationCancelled):
+        PyMuPDFRepository().impose_pdfs(files, str(output), columns=2, rows=1,
+                                        on_progress=cancel_after_first, cancel=token)
+    assert output.read_bytes() == before
+    assert sorted(p.name for p in tmp_path.iterdir() if p.name.startswith("sheets")) == ["sheets.pdf"]
@@ -0,0 +1,123 @@
+import os
+import fitz
+from src.infrastructure.merge_manifest import MergeManifest
+from src.infrastructure.pdf_repository import PyMuPDFRepository
+
+def create_dummy_pdf(path, text="Dummy Content", pages=1):
+    """Helper to create a valid PDF file."""
+    doc = fitz.open()
+    for n in range(pages):
+        page = doc.new_page()
+        page.insert_text((50, 50), f"{text} p{n}" if pages > 1 else text)
+    doc.save(path)
+    doc.close()
+
+def page_texts(path):
+    with fitz.open(path) as doc:
+        return [page.get_text().strip() for page in doc]
+
+def make_labels(tmp_path, count):
+    files = []
+    for i in range(count):
+        pdf = tmp_path / f"label_{i:02d}.pdf"
+        create_dummy_pdf(pdf, f"Label {i}")
+        files.append(str(pdf))
+    return files
+
+def test_first_merge_writes_manifest(tmp_path):
+    """A full merge records every source with its hash and page range."""
+    files = make_labels(tmp_path, 3)
+    multi = tmp_path / "multi.pdf"
+    create_dummy_pdf(multi, "Multi", pages=2)
+    files.append(str(multi))
+    output = tmp_path / "out.pdf"
+
+    PyMuPDFRepository(incremental=True).merge_pdfs(files, str(output))
+
+    manifest = MergeManifest.load(str(output))
+    assert manifest is not None
+    assert [(s["start"], s["pages"]) for s in manifest.sources] == [(0, 1), (1, 1), (2, 1), (3, 2)]
+    assert manifest.increments == 0
+
+def test_small_edit_updates_output_in_place(tmp_path):
+    """Adding, removing and replacing a few labels only appends an update."""
+    files = make_labels(tmp_path, 10)
+    output = tmp_path / "out.pdf"
+    repo = PyMuPDFRepository(incremental=True)
+    repo.merge_pdfs(files, str(output))
+    original = output.read_bytes()
+
+    extra = tmp_path / "extra.pdf"
+    create_dummy_pdf(extra, "Extra")
+    create_dummy_pdf(files[5], "Label 5 v2")
+    os.utime(files[5], ns=(0, os.stat(files[5]).st_mtime_ns + 1_000_000_000))
+    selection = files[:2] + [str(extra)] + files[3:]
+    selection.remove(files[8])
+
+    repo.merge_pdfs(selection, str(output))
+
+    assert output.read_bytes().startswith(original)
+    assert MergeManifest.load(str(output)).increments == 1
+    expected = [f"Label {i}" for i in range(10) if i not in (2, 8)]
+    expected.insert(2, "Extra")
+    expected[expected.index("Label 5")] = "Label 5 v2"
+    assert page_texts(output) == expected
+
+def test_large_change_falls_back_to_full_rebuild(tmp_path):
+    """When most sources change, the output is rebuilt from scratch."""
+    files = make_labels(tmp_path, 4)
+    output = tmp_path / "out.pdf"
+    repo = PyMuPDFRepository(incremental=True)
+    repo.merge_pdfs(files, str(output))
+
+    others = [str(tmp_path / f"other_{i}.pdf") for i in range(4)]
+    for i, path in enumerate(others):
+        create_dummy_pdf(path, f"Other {i}")
+    repo.merge_pdfs(others, str(output))
+
+    assert MergeManifest.load(str(output)).increments == 0
+    assert page_texts(output) == [f"Other {i}" for i in range(4)]
+
+def test_foreign_output_invalidates_manifest(tmp_path):
+    """If the output was replaced by something else, the manifest is ignored."""
+    files = make_labels(tmp_path, 3)
+    output = tmp_path / "out.pdf"
+    repo = PyMuPDFRepository(incremental=True)
+    repo.merge_pdfs(files, str(output))
+
+    create_dummy_pdf(output, "Foreign")
+    assert MergeManifest.load(str(output)) is None
+
+    repo.merge_pdfs(files, str(output))
+    assert page_texts(output) == ["Label 0", "Label 1", "Label 2"]
+
+def test_changing_copies_updates_only_that_source(tmp_path):
+    """Changing the number of copies of one label replaces just its page range."""
+    files = make_labels(tmp_path, 4)
+    output = tmp_path / "out.pdf"
+    repo = PyMuPDFRepository(incremental=True)
+    repo.merge_pdfs(files, str(output))
+
+    repo.merge_pdfs([files[0], (files[1], 3)] + files[2:], str(output))
+
+    assert MergeManifest.load(str(output)).increments == 1
+    assert page_texts(output) == ["Label 0"] + ["Label 1"] * 3 + ["Label 2", "Label 3"]
+
+def test_unchanged_selection_reuses_output(tmp_path):
+    """Merging the same selection again leaves the output and its save count untouched."""
+    files = make_labels(tmp_path, 3)
+    output = tmp_path / "out.pdf"
+    repo = PyMuPDFRepository(incremental=True, incremental_max_saves=1)
+    repo.merge_pdfs(files, str(output))
+    repo.merge_pdfs([files[0], (files[1], 2), files[2]], str(output))
+    original = output.read_bytes()
+    mtime_ns = output.stat().st_mtime_ns
+
+    report = repo.merge_pdfs([files[0], (files[1], 2), files[2]], str(output))
+
+    assert report["mode"] == "incremental"
+    assert output.read_bytes() == original
+    assert output.stat().st_mtime_ns == mtime_ns
+    manifest = MergeManifest.load(str(output))
+    assert manifest.increments == 1
+    assert [(s["start"], s["pages"]) for s in manifest.sources] == [(0, 1), (1, 2), (3, 1)]
@@ -0,0 +1,68 @@
+import json
+import fitz
+import pytest
+from src.core.interfaces import IMetricsSink
+from src.infrastructure.metrics_sink import JsonLinesMetricsSink
+from src.infrastructure.pdf_cache import PdfSourceCache
+from src.infrastructure.pdf_repository import PyMuPDFRepository
+
+class ListSink(IMetricsSink):
+    def __init__(self):
+        self.events = []
+
+    def record(self, event, fields):
+        self.events.append((event, fields))
+
+def create_pdf(path, pages):
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((50, 50), f"{path.name} {i}")
+    doc.save(path)
+    doc.close()
+
+@pytest.fixture
+def sources(tmp_path):
+    paths = []
+    for i, pages in enumerate([1, 3, 2]):
+        path = tmp_path / f"src_{i}.pdf"
+        create_pdf(path, pages)
+        paths.append(path)
+    return paths
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_repository_reports_each_file_and_save(sources, tmp_path, workers):
+    """One 'file' event per source with pages, bytes and stage timings, plus the save."""
+    sink = ListSink()
+    output = tmp_path / "out.pdf"
+    repo = PyMuPDFRepository(workers=workers)
+
+    repo.merge_pdfs([str(sources[0]), (str(sources[1]), 2), str(sources[2])], str(output), metrics=sink)
+
+    files = [fields for event, fields in sink.events if event == "file"]
+    assert [f["index"] for f in files] == [0, 1, 2]
+    assert [f["pages"] for f in files] == [1, 6, 2]
+    assert [f["bytes"] for f in files] == [p.stat().st_size for p in sources]
+    assert all(f["read_seconds"] > 0 and f["parse_seconds"] >= 0 and f["insert_seconds"] > 0 for f in files)
+    [save] = [fields for event, fields in sink.events if event == "save"]
+    assert save["bytes_written"] == output.stat().st_size and not save["incremental"]
+
+def test_cached_sources_are_flagged(sources, tmp_path):
+    repo = PyMuPDFRepository(cache=PdfSourceCache(max_bytes=1024 * 1024))
+    repo.merge_pdfs([str(p) for p in sources], str(tmp_path / "a.pdf"))
+    sink = ListSink()
+
+    repo.merge_pdfs([str(p) for p in sources], str(tmp_path / "b.pdf"), metrics=sink)
+
+    files = [fields for event, fields in sink.events if event == "file"]
+    assert all(f["cached"] and f["read_seconds"] == 0 for f in files)
+
+def test_json_lines_sink_appends_tagged_events(tmp_path):
+    path = tmp_path / "metricas" / "merge.jsonl"
+    sink = JsonLinesMetricsSink(path, tags={"job": "perros"})
+    sink.record("file", {"pages": 2, "path": "a.pdf"})
+    sink.close()
+    JsonLinesMetricsSink(path).record("save", {"seconds": 0.5})
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["event"] for line in lines] == ["file", "save"]
+    assert lines[0]["job"] == "perros" and lines[0]["pages"] == 2 and "ts" in lines[0]
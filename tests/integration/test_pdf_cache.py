@@ -0,0 +1,77 @@
+import os
+import fitz
+from src.infrastructure.pdf_cache import PdfSourceCache
+from src.infrastructure.pdf_repository import PyMuPDFRepository
+
+def create_dummy_pdf(path, text="Dummy Content"):
+    """Helper to create a valid PDF file."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((50, 50), text)
+    doc.save(path)
+    doc.close()
+
+def test_repeat_merge_hits_cache(tmp_path):
+    """A second merge of unchanged files is served from the cache."""
+    files = []
+    for i in range(3):
+        pdf = tmp_path / f"label_{i}.pdf"
+        create_dummy_pdf(pdf, f"Label {i}")
+        files.append(str(pdf))
+    cache = PdfSourceCache()
+    repo = PyMuPDFRepository(cache=cache)
+
+    repo.merge_pdfs(files, str(tmp_path / "first.pdf"))
+    repo.merge_pdfs(files, str(tmp_path / "second.pdf"))
+
+    stats = cache.stats()
+    assert stats["misses"] == 3
+    assert stats["hits"] == 3
+    assert (tmp_path / "first.pdf").read_bytes() == (tmp_path / "second.pdf").read_bytes()
+
+def test_modified_file_is_reloaded(tmp_path):
+    """Changing mtime/size invalidates the entry and replaces the old version."""
+    pdf = tmp_path / "label.pdf"
+    create_dummy_pdf(pdf, "Old")
+    cache = PdfSourceCache()
+    repo = PyMuPDFRepository(workers=2, cache=cache)
+    repo.merge_pdfs([str(pdf)], str(tmp_path / "out.pdf"))
+
+    create_dummy_pdf(pdf, "New content")
+    os.utime(pdf, ns=(0, os.stat(pdf).st_mtime_ns + 1_000_000_000))
+    repo.merge_pdfs([str(pdf)], str(tmp_path / "out.pdf"))
+
+    assert cache.stats()["misses"] == 2
+    assert cache.stats()["entries"] == 1
+    with fitz.open(tmp_path / "out.pdf") as doc:
+        assert "New content" in doc[0].get_text()
+
+def test_identical_files_share_one_entry(tmp_path):
+    """Entries are content-addressed: copies in other folders share memory."""
+    a = tmp_path / "a.pdf"
+    create_dummy_pdf(a)
+    b = tmp_path / "b.pdf"
+    b.write_bytes(a.read_bytes())
+    cache = PdfSourceCache()
+
+    for path in (a, b):
+        key = cache.key_for(str(path))
+        assert cache.get(key) is None
+        cache.put(key, path.read_bytes())
+
+    assert cache.stats()["entries"] == 1
+    assert cache.get(cache.key_for(str(b))) == b.read_bytes()
+
+def test_lru_eviction_respects_memory_bound(tmp_path):
+    """The least recently used entry is evicted when the bound is exceeded."""
+    cache = PdfSourceCache(max_bytes=10)
+    keys = [(str(tmp_path / f"{i}.pdf"), 1, 4) for i in range(3)]
+    cache.put(keys[0], b"aaaa")
+    cache.put(keys[1], b"bbbb")
+    cache.get(keys[0])
+    cache.put(keys[2], b"cccc")
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == b"aaaa"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= 10
@@ -54,3 +54,229 @@ def test_merge_pdfs_invalid_input(tmp_path):
     
     with pytest.raises(MergeError, match="Error al procesar el archivo"):
         repo.merge_pdfs([str(invalid_file)], str(output))
+
+
+def _make_sources(tmp_path, count):
+    files = []
+    for i in range(count):
+        pdf = tmp_path / f"label_{i}.pdf"
+        create_dummy_pdf(pdf, f"Label {i}")
+        files.append(str(pdf))
+    return files
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_merge_pdfs_parallel_is_deterministic(tmp_path, use_processes):
+    """Parallel preparation keeps order and produces byte-identical output."""
+    files = _make_sources(tmp_path, 6)
+    sequential = tmp_path / "sequential.pdf"
+    parallel = tmp_path / "parallel.pdf"
+
+    PyMuPDFRepository(use_processes=use_processes).merge_pdfs(files, str(sequential))
+    PyMuPDFRepository(workers=3, use_processes=use_processes).merge_pdfs(files, str(parallel))
+
+    assert sequential.read_bytes() == parallel.read_bytes()
+    with fitz.open(parallel) as doc:
+        assert [page.get_text().strip() for page in doc] == [f"Label {i}" for i in range(6)]
+
+def test_merge_pdfs_parallel_reports_progress(tmp_path):
+    """Progress is reported once per file plus the final (total, total)."""
+    files = _make_sources(tmp_path, 4)
+    calls = []
+
+    PyMuPDFRepository(workers=2).merge_pdfs(
+        files, str(tmp_path / "out.pdf"), on_progress=lambda c, t: calls.append((c, t))
+    )
+
+    assert calls == [(0, 4), (1, 4), (2, 4), (3, 4), (4, 4)]
+
+def test_merge_pdfs_parallel_invalid_input(tmp_path):
+    """A broken file in parallel mode raises the same MergeError."""
+    files = _make_sources(tmp_path, 3)
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"%PDF-1.7 garbage")
+    files.insert(1, str(broken))
+
+    with pytest.raises(MergeError, match="Error al procesar el archivo '.*broken.pdf'"):
+        PyMuPDFRepository(workers=2).merge_pdfs(files, str(tmp_path / "out.pdf"))
+
+def _count_images(path):
+    with fitz.open(path) as doc:
+        return sum(
+            1 for xref in range(1, doc.xref_length())
+            if doc.xref_get_key(xref, "Subtype") == ("name", "/Image")
+        )
+
+def test_merge_pdfs_deduplicates_shared_resources(tmp_path):
+    """With garbage=4 a logo shared by every label is stored only once."""
+    logo = fitz.Pixmap(fitz.csRGB, 64, 64, bytes(range(256)) * 48, False)
+    files = []
+    for i in range(5):
+        pdf = tmp_path / f"label_{i}.pdf"
+        doc = fitz.open()
+        page = doc.new_page()
+        page.insert_image(fitz.Rect(0, 0, 64, 64), pixmap=logo)
+        page.insert_text((50, 100), f"Label {i}")
+        doc.save(pdf)
+        doc.close()
+        files.append(str(pdf))
+    plain = tmp_path / "plain.pdf"
+    optimized = tmp_path / "optimized.pdf"
+
+    PyMuPDFRepository().merge_pdfs(files, str(plain))
+    report = PyMuPDFRepository(garbage=4, deflate=True).merge_pdfs(files, str(optimized))
+
+    assert _count_images(plain) == 5
+    assert _count_images(optimized) == 1
+    assert optimized.stat().st_size < plain.stat().st_size
+    assert report["output_bytes"] == optimized.stat().st_size
+    assert report["input_bytes"] == sum((tmp_path / f"label_{i}.pdf").stat().st_size for i in range(5))
+    assert report["save_seconds"] <= report["total_seconds"]
+
+def test_merge_pdfs_rejects_invalid_garbage_level():
+    with pytest.raises(ValueError, match="garbage"):
+        PyMuPDFRepository(garbage=7)
+
+def test_merge_pdfs_copies_open_each_source_once(tmp_path, monkeypatch):
+    """(path, copies) pairs read each file once and keep copies adjacent."""
+    import src.infrastructure.pdf_repository as pdf_repository
+    files = _make_sources(tmp_path, 2)
+    reads = []
+    original_read = pdf_repository._read_source
+    monkeypatch.setattr(pdf_repository, "_read_source", lambda p: reads.append(p) or original_read(p))
+    output = tmp_path / "copies.pdf"
+
+    PyMuPDFRepository().merge_pdfs([(files[0], 3), files[1]], str(output))
+
+    assert reads == files
+    with fitz.open(output) as doc:
+        assert [page.get_text().strip() for page in doc] == ["Label 0"] * 3 + ["Label 1"]
+
+def test_merge_pdfs_copies_share_resources(tmp_path):
+    """Twenty copies of a label with an image do not store the image twenty times."""
+    pdf = tmp_path / "label.pdf"
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_image(page.rect, pixmap=fitz.Pixmap(fitz.csRGB, 128, 128, bytes(range(256)) * 192, False))
+    doc.save(pdf)
+    doc.close()
+    single = tmp_path / "single.pdf"
+    copies = tmp_path / "copies.pdf"
+
+    PyMuPDFRepository().merge_pdfs([str(pdf)], str(single))
+    PyMuPDFRepository().merge_pdfs([(str(pdf), 20)], str(copies))
+
+    assert _count_images(copies) == 1
+    assert copies.stat().st_size < 2 * single.stat().st_size
+    with fitz.open(copies) as doc:
+        assert doc.page_count == 20
+
+@pytest.mark.parametrize("loader", ["bulk", "mmap"])
+def test_merge_pdfs_zero_copy_loaders_match_read(tmp_path, loader):
+    """Bulk and mmap loading, with and without prefetch, give the same output as plain reads."""
+    files = _make_sources(tmp_path, 5)
+    expected = tmp_path / "read.pdf"
+    PyMuPDFRepository().merge_pdfs(files, str(expected))
+
+    for prefetch in (0, 3):
+        output = tmp_path / f"{loader}_{prefetch}.pdf"
+        PyMuPDFRepository(loader=loader, prefetch=prefetch).merge_pdfs(files, str(output))
+        assert output.read_bytes() == expected.read_bytes()
+
+def test_merge_pdfs_prefetch_reads_ahead_with_one_worker(tmp_path, monkeypatch):
+    """With prefetch, later labels are already being read while the first one is inserted."""
+    import threading
+    import src.infrastructure.pdf_repository as pdf_repository
+    files = _make_sources(tmp_path, 4)
+    read = []
+    all_read = threading.Event()
+    original_read = pdf_repository._bulk_read_source
+
+    def tracking_read(path):
+        read.append(path)
+        if len(read) == len(files):
+            all_read.set()
+        return original_read(path)
+
+    original_insert = PyMuPDFRepository._insert_one
+
+    def waiting_insert(self, *args, **kwargs):
+        assert all_read.wait(5)
+        return original_insert(self, *args, **kwargs)
+
+    monkeypatch.setattr(pdf_repository, "_bulk_read_source", tracking_read)
+    monkeypatch.setattr(PyMuPDFRepository, "_insert_one", waiting_insert)
+
+    PyMuPDFRepository(loader="bulk", prefetch=4).merge_pdfs(files, str(tmp_path / "out.pdf"))
+
+    assert sorted(read) == sorted(files)
+
+def test_merge_pdfs_rejects_unknown_loader():
+    with pytest.raises(ValueError, match="carga"):
+        PyMuPDFRepository(loader="aio")
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_cancelled_merge_keeps_previous_output(tmp_path, incremental):
+    """Cancelling mid-merge leaves the previous output untouched and no temp files."""
+    from src.core.exceptions import OperationCancelled
+    from src.core.jobs import CancellationToken
+    files = _make_sources(tmp_path, 6)
+    output = tmp_path / "out" / "salida.pdf"
+    output.parent.mkdir()
+    repo = PyMuPDFRepository(incremental=incremental, max_memory_bytes=1)
+    repo.merge_pdfs(files[:3], str(output))
+    before = output.read_bytes()
+    token = CancellationToken()
+
+    def cancel_after_first(current, total):
+        if current == 1:
+            token.cancel()
+
+    with pytest.raises(OperationCancelled):
+        repo.merge_pdfs(files, str(output), on_progress=cancel_after_first, cancel=token)
+
+    assert output.read_bytes() == before
+    assert sorted(p.name for p in output.parent.iterdir()) == (
+        ["salida.pdf", "salida.pdf.manifest.json"] if incremental else ["salida.pdf"]
+    )
+
+def test_concurrent_merges_on_one_repository_keep_their_own_state(tmp_path):
+    """Cancelling one merge must not touch another merge running on the same repository."""
+    import threading
+    from src.core.exceptions import OperationCancelled
+    from src.core.jobs import CancellationToken
+    files = _make_sources(tmp_path, 4)
+    repo = PyMuPDFRepository()
+    both_running = threading.Barrier(2, timeout=5)
+    token = CancellationToken()
+    events = []
+    results = {}
+
+    class Sink:
+        def record(self, event, fields):
+            events.append(event)
+
+    def meet_then(action):
+        def on_progress(current, total):
+            if current == 1:
+                both_running.wait()
+                action()
+        return on_progress
+
+    def run(name, **kwargs):
+        try:
+            results[name] = repo.merge_pdfs(files, str(tmp_path / f"{name}.pdf"), **kwargs)
+        except OperationCancelled as e:
+            results[name] = e
+
+    cancelled = threading.Thread(target=run, args=("cancelled",),
+                                 kwargs={"on_progress": meet_then(token.cancel), "cancel": token})
+    kept = threading.Thread(target=run, args=("kept",),
+                            kwargs={"on_progress": meet_then(lambda: None), "metrics": Sink()})
+    for thread in (cancelled, kept):
+        thread.start()
+    for thread in (cancelled, kept):
+        thread.join(10)
+
+    assert isinstance(results["cancelled"], OperationCancelled)
+    assert results["kept"]["files"] == 4 and results["kept"]["mode"] == "full"
+    assert events.count("file") == 4
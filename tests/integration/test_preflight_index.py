@@ -0,0 +1,70 @@
+import os
+import fitz
+import pytest
+from src.infrastructure import preflight_index
+from src.infrastructure.preflight_index import SQLitePreflightIndex
+
+def create_pdf(path, pages=1):
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((50, 50), f"{path.name} {i}")
+    doc.save(path)
+    doc.close()
+
+@pytest.fixture
+def labels(tmp_path):
+    folder = tmp_path / "labels"
+    folder.mkdir()
+    create_pdf(folder / "ok.pdf", pages=2)
+    # Sin tabla xref: MuPDF lo abre reconstruyéndolo
+    create_pdf(folder / "tmp.pdf")
+    data = (folder / "tmp.pdf").read_bytes()
+    (folder / "roto.pdf").write_bytes(data[:data.rfind(b"xref")])
+    os.remove(folder / "tmp.pdf")
+    doc = fitz.open()
+    doc.new_page()
+    doc.save(folder / "clave.pdf", encryption=fitz.PDF_ENCRYPT_AES_256, user_pw="u", owner_pw="o")
+    doc.close()
+    (folder / "basura.pdf").write_bytes(b"%PDF-1.4\nesto no es un pdf")
+    return folder
+
+def test_validate_classifies_labels(labels, tmp_path):
+    index = SQLitePreflightIndex(tmp_path / "index.sqlite3")
+    paths = [str(labels / name) for name in ["ok.pdf", "roto.pdf", "clave.pdf", "basura.pdf", "no_existe.pdf"]]
+
+    results = index.validate(paths)
+
+    assert [(results[p].status, results[p].page_count) for p in paths] == [
+        ("ok", 2), ("needs_repair", 1), ("encrypted", 0), ("corrupt", 0), ("missing", 0)
+    ]
+    assert [results[p].usable for p in paths] == [True, True, False, False, False]
+
+def test_only_changed_files_are_reopened(labels, tmp_path, monkeypatch):
+    """Results survive a new instance and are reused until size or mtime change."""
+    SQLitePreflightIndex(tmp_path / "index.sqlite3").validate([str(labels / "ok.pdf"), str(labels / "roto.pdf")])
+    inspected = []
+    original = preflight_index.inspect_pdf
+    monkeypatch.setattr(preflight_index, "inspect_pdf", lambda p: inspected.append(p) or original(p))
+    index = SQLitePreflightIndex(tmp_path / "index.sqlite3")
+
+    assert index.validate([str(labels / "ok.pdf")])[str(labels / "ok.pdf")].page_count == 2
+    assert inspected == []
+
+    create_pdf(labels / "ok.pdf", pages=3)
+    assert index.validate([str(labels / "ok.pdf")])[str(labels / "ok.pdf")].page_count == 3
+    assert inspected == [str(labels / "ok.pdf")]
+
+def test_large_batches_use_a_process_pool(tmp_path):
+    folder = tmp_path / "many"
+    folder.mkdir()
+    for i in range(20):
+        create_pdf(folder / f"{i:02d}.pdf", pages=i % 3 + 1)
+    paths = [str(folder / f"{i:02d}.pdf") for i in range(20)]
+    progress = []
+
+    results = SQLitePreflightIndex(tmp_path / "index.sqlite3", workers=2).validate(
+        paths, on_progress=lambda done, total: progress.append((done, total))
+    )
+
+    assert [results[p].page_count for p in paths] == [i % 3 + 1 for i in range(20)]
+    assert progress[-1] == (20, 20)
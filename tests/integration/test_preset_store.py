@@ -0,0 +1,70 @@
+import time
+from pathlib import Path
+import fitz
+import pytest
+from src.core.entities import SelectionPreset
+from src.infrastructure import preset_store
+from src.infrastructure.preflight_index import SQLitePreflightIndex
+from src.infrastructure.preset_store import JsonPresetStore
+
+def create_label(path, text, pages=1):
+    doc = fitz.open()
+    for _ in range(pages):
+        doc.new_page(width=200, height=100).insert_text((20, 50), text)
+    doc.save(path)
+    doc.close()
+
+@pytest.fixture
+def store(temp_input_dir, tmp_path):
+    for category in ["Suavizantes", "Perfuminas"]:
+        (temp_input_dir / category).mkdir()
+        for i in range(2):
+            create_label(temp_input_dir / category / f"{category.lower()}_{i}.pdf", f"{category} {i}")
+    store = JsonPresetStore(tmp_path / "presets.json", temp_input_dir, tmp_path / ".planes.json",
+                            SQLitePreflightIndex(tmp_path / "index.sqlite3"))
+    store.save_preset(SelectionPreset(
+        "Semanal", categories=("Suavizantes",), files=(("Perfuminas/perfuminas_1.pdf", 2),)
+    ))
+    return store
+
+def test_compiles_preset_into_plan(store, temp_input_dir):
+    plan = store.compile_plan("Semanal")
+
+    assert plan.entries == [
+        str(temp_input_dir / "Suavizantes" / "suavizantes_0.pdf"),
+        str(temp_input_dir / "Suavizantes" / "suavizantes_1.pdf"),
+        (str(temp_input_dir / "Perfuminas" / "perfuminas_1.pdf"), 2),
+    ]
+    assert plan.total_pages == 4 and not plan.skipped and not plan.reused
+    assert [p.name for p in store.list_presets()] == ["Semanal"]
+
+def test_plan_is_reused_until_a_source_changes(store, temp_input_dir, monkeypatch):
+    """A fresh plan costs only stats; a new label in the category or an edited file recompiles it."""
+    first = store.compile_plan("Semanal")
+    hashed = []
+    original = preset_store.file_sha256
+    monkeypatch.setattr(preset_store, "file_sha256", lambda p: hashed.append(p) or original(p))
+
+    again = store.compile_plan("Semanal")
+    assert again.reused and again.fingerprint == first.fingerprint and hashed == []
+
+    time.sleep(0.01)
+    create_label(temp_input_dir / "Suavizantes" / "suavizantes_2.pdf", "nuevo", pages=3)
+    plan = store.compile_plan("Semanal")
+    assert not plan.reused and plan.total_pages == 7
+    # Solo se calculó el hash de la etiqueta nueva
+    assert [Path(p).name for p in hashed] == ["suavizantes_2.pdf"]
+
+    create_label(temp_input_dir / "Perfuminas" / "perfuminas_1.pdf", "editada")
+    assert store.compile_plan("Semanal").fingerprint != plan.fingerprint
+
+def test_unusable_labels_are_skipped_and_unknown_presets_rejected(store, temp_input_dir):
+    (temp_input_dir / "Suavizantes" / "suavizantes_1.pdf").write_bytes(b"%PDF-1.4\nbasura")
+
+    plan = store.compile_plan("Semanal")
+
+    assert [r.status for r in plan.skipped] == ["corrupt"]
+    assert len(plan.entries) == 2 and plan.total_pages == 3
+    store.delete_preset("Semanal")
+    with pytest.raises(ValueError):
+        store.compile_plan("Semanal")
@@ -0,0 +1,208 @@
+import email
+import os
+import pytest
+from src.core.exceptions import EmailError
+from src.infrastructure.smtp_email_service import SMTPEmailService, parse_recipients
+
+@pytest.fixture
+def attachment(tmp_path):
+    pdf = tmp_path / "etiquetas.pdf"
+    pdf.write_bytes(b"%PDF-1.4\n" + b"x" * 5000 + b"\n.\n..\n%%EOF\n")
+    return pdf
+
+def test_parse_recipients():
+    assert parse_recipients("a@x.com, b@x.com;c@x.com  a@x.com") == ["a@x.com", "b@x.com", "c@x.com"]
+    assert parse_recipients("") == []
+
+def test_sends_one_message_per_recipient_over_pooled_connections(smtp_server, valid_config, attachment):
+    """Five branches are served by at most two authenticated connections."""
+    recipients = [f"sucursal{i}@example.com" for i in range(5)]
+    config = {**smtp_server.config(valid_config), "EMAIL_RECEPTOR": ", ".join(recipients)}
+    service = SMTPEmailService(max_connections=2)
+
+    report = service.send_email_with_attachment(config, str(attachment))
+
+    assert sorted(rcpts[0] for _, rcpts, _ in smtp_server.messages) == recipients
+    assert all(len(rcpts) == 1 for _, rcpts, _ in smtp_server.messages)
+    assert smtp_server.connections <= 2
+    assert smtp_server.logins == smtp_server.connections
+    for _, rcpts, data in smtp_server.messages:
+        msg = email.message_from_bytes(data)
+        assert msg["To"] == rcpts[0]
+        part = [p for p in msg.walk() if p.get_filename() == "etiquetas.pdf"][0]
+        assert part.get_payload(decode=True) == attachment.read_bytes()
+
+    assert report["recipients"] == 5
+    assert [m["ok"] for m in report["messages"]] == [True] * 5
+    assert all(m["seconds"] >= 0 for m in report["messages"])
+    service.close()
+
+def test_connections_are_kept_alive_between_sends(smtp_server, valid_config, attachment):
+    """A second send reuses the pooled connection: no new handshake or login."""
+    config = smtp_server.config(valid_config)
+    service = SMTPEmailService(max_connections=1)
+
+    service.send_email_with_attachment(config, str(attachment))
+    report = service.send_email_with_attachment(config, str(attachment))
+
+    assert len(smtp_server.messages) == 2
+    assert smtp_server.connections == 1
+    assert smtp_server.logins == 1
+    assert report["connections_opened"] == 0
+    service.close()
+
+def test_stale_connection_is_replaced(smtp_server, valid_config, attachment):
+    """If the server dropped the idle connection, the NOOP check reconnects."""
+    config = smtp_server.config(valid_config)
+    service = SMTPEmailService(max_connections=1, keepalive_interval=0)
+
+    service.send_email_with_attachment(config, str(attachment))
+    smtp_server.drop_connections()
+    report = service.send_email_with_attachment(config, str(attachment))
+
+    assert len(smtp_server.messages) == 2
+    assert smtp_server.connections == 2
+    assert report["connections_opened"] == 1
+    service.close()
+
+def test_rejected_recipient_does_not_block_the_others(smtp_server, valid_config, attachment):
+    smtp_server.reject.add("mal@example.com")
+    config = {**smtp_server.config(valid_config), "EMAIL_RECEPTOR": "ok@example.com, mal@example.com"}
+    service = SMTPEmailService()
+
+    with pytest.raises(EmailError, match="mal@example.com"):
+        service.send_email_with_attachment(config, str(attachment))
+
+    assert [rcpts for _, rcpts, _ in smtp_server.messages] == [["ok@example.com"]]
+    service.close()
+
+def test_cancelled_send_does_not_deliver_the_partial_message(smtp_server, valid_config, tmp_path, monkeypatch):
+    """Cancelling while the attachment is streamed drops the session before the final dot."""
+    import smtplib
+    from src.core.exceptions import OperationCancelled
+    from src.core.jobs import CancellationToken
+    big = tmp_path / "grande.pdf"
+    big.write_bytes(os.urandom(2 * 1024 * 1024))
+    token = CancellationToken()
+    original_send = smtplib.SMTP.send
+    chunks = []
+
+    def counting_send(server, data):
+        chunks.append(data)
+        if len(chunks) == 3:
+            token.cancel()
+        return original_send(server, data)
+
+    monkeypatch.setattr(smtplib.SMTP, "send", counting_send)
+    service = SMTPEmailService(max_connections=1)
+
+    with pytest.raises(OperationCancelled):
+        service.send_email_with_attachment(smtp_server.config(valid_config), str(big), cancel=token)
+
+    assert smtp_server.messages == []
+    service.close()
+
+def test_bad_credentials_raise_email_error(smtp_server, valid_config, attachment):
+    config = {**smtp_server.config(valid_config), "APP_PASSWORD": "wrong"}
+
+    with pytest.raises(EmailError, match="autenticación"):
+        SMTPEmailService().send_email_with_attachment(config, str(attachment))
+
+def test_large_attachment_is_streamed_with_constant_memory(smtp_server, valid_config, tmp_path):
+    """An 8 MB attachment is sent without holding it (or its base64) in memory."""
+    import tracemalloc
+    big = tmp_path / "grande.pdf"
+    with open(big, "wb") as f:
+        for _ in range(8):
+            f.write(os.urandom(1024 * 1024))
+    smtp_server.keep_data = False
+    service = SMTPEmailService(max_connections=1)
+    config = smtp_server.config(valid_config)
+
+    tracemalloc.start()
+    service.send_email_with_attachment(config, str(big))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    [(_, _, size)] = smtp_server.messages
+    assert size > 8 * 1024 * 1024 * 4 / 3
+    assert peak < 2 * 1024 * 1024
+    service.close()
+
+def _noisy_pdf(path, pages):
+    """PDF whose pages carry incompressible images (~60 KB each)."""
+    import fitz
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page(width=200, height=100)
+        pix = fitz.Pixmap(fitz.csRGB, 150, 130, os.urandom(150 * 130 * 3), False)
+        page.insert_image(page.rect, pixmap=pix)
+        page.insert_text((10, 20), f"Pagina {i}")
+    doc.save(path)
+    doc.close()
+
+def test_oversized_pdf_is_split_into_several_messages(smtp_server, valid_config, tmp_path):
+    """Above the limit the PDF goes out in page ranges, each under the limit."""
+    import fitz
+    pdf = tmp_path / "lote.pdf"
+    _noisy_pdf(pdf, 10)
+    limit = pdf.stat().st_size // 3
+    service = SMTPEmailService(max_attachment_bytes=limit, oversize="split")
+
+    report = service.send_email_with_attachment(smtp_server.config(valid_config), str(pdf))
+
+    assert len(smtp_server.messages) >= 3
+    pages = 0
+    for _, _, data in smtp_server.messages:
+        msg = email.message_from_bytes(data)
+        assert "(parte " in msg["Subject"]
+        [part] = [p for p in msg.walk() if p.get_filename()]
+        payload = part.get_payload(decode=True)
+        assert len(payload) <= limit
+        with fitz.open(stream=payload, filetype="pdf") as doc:
+            pages += doc.page_count
+    assert pages == 10
+    assert report["parts"] == len(smtp_server.messages)
+    service.close()
+
+def test_oversized_pdf_is_compressed_when_that_is_enough(smtp_server, valid_config, tmp_path):
+    import fitz
+    pdf = tmp_path / "texto.pdf"
+    doc = fitz.open()
+    for i in range(40):
+        page = doc.new_page()
+        writer = fitz.TextWriter(page.rect)
+        for line in range(40):
+            writer.append((20, 20 + line * 18), f"Etiqueta {i} renglon {line} " * 3)
+        writer.write_text(page)
+    doc.save(pdf, expand=255)  # streams sin comprimir
+    doc.close()
+    limit = pdf.stat().st_size // 2
+    service = SMTPEmailService(max_attachment_bytes=limit)
+
+    service.send_email_with_attachment(smtp_server.config(valid_config), str(pdf))
+
+    [(_, _, data)] = smtp_server.messages
+    msg = email.message_from_bytes(data)
+    assert "(parte " not in msg["Subject"]
+    [part] = [p for p in msg.walk() if p.get_filename() == "texto.pdf"]
+    assert len(part.get_payload(decode=True)) <= limit
+    service.close()
+
+def test_oversize_error_mode(smtp_server, valid_config, attachment):
+    service = SMTPEmailService(max_attachment_bytes=100, oversize="error")
+
+    with pytest.raises(EmailError, match="supera"):
+        service.send_email_with_attachment(smtp_server.config(valid_config), str(attachment))
+    assert smtp_server.messages == []
+
+def test_damaged_oversized_pdf_raises_email_error(smtp_server, valid_config, tmp_path):
+    """PyMuPDF errors while compressing or splitting surface as EmailError, not RuntimeError."""
+    damaged = tmp_path / "etiquetas.pdf"
+    damaged.write_bytes(b"no es un pdf" * 100)
+    service = SMTPEmailService(max_attachment_bytes=100, oversize="compress_then_split")
+
+    with pytest.raises(EmailError, match="No se pudo preparar el adjunto 'etiquetas.pdf'"):
+        service.send_email_with_attachment(smtp_server.config(valid_config), str(damaged))
+    assert smtp_server.messages == []
+    service.close()
@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+import fitz
+import pytest
+from src.core.exceptions import MergeError
+from src.infrastructure.pdf_repository import PyMuPDFRepository
+
+LABEL_COUNT = 60
+
+# Fusiona en un proceso aparte y lee su pico de RSS (VmHWM, en KB). ru_maxrss
+# no sirve aquí porque hereda el pico del proceso de pytest a través del exec.
+RSS_SCRIPT = """
+import glob, sys
+from src.infrastructure.pdf_repository import PyMuPDFRepository
+files = sorted(glob.glob(sys.argv[1] + '/*.pdf'))
+ceiling = int(sys.argv[3]) or None
+PyMuPDFRepository(max_memory_bytes=ceiling).merge_pdfs(files, sys.argv[2])
+with open('/proc/self/status') as f:
+    print([line.split()[1] for line in f if line.startswith('VmHWM:')][0])
+"""
+
+def create_heavy_pdf(path):
+    """Helper to create a label with an incompressible ~270 KB image."""
+    doc = fitz.open()
+    page = doc.new_page()
+    pix = fitz.Pixmap(fitz.csRGB, 300, 300, os.urandom(300 * 300 * 3), False)
+    page.insert_image(page.rect, pixmap=pix)
+    doc.save(path)
+    doc.close()
+
+@pytest.fixture
+def heavy_labels(tmp_path):
+    label_dir = tmp_path / "labels"
+    label_dir.mkdir()
+    for i in range(LABEL_COUNT):
+        create_heavy_pdf(label_dir / f"label_{i:03d}.pdf")
+    return label_dir
+
+def peak_rss_kb(label_dir, output, ceiling):
+    result = subprocess.run(
+        [sys.executable, "-c", RSS_SCRIPT, str(label_dir), str(output), str(ceiling)],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    )
+    return int(result.stdout.strip().splitlines()[-1])
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="Requiere /proc (Linux)")
+def test_streaming_merge_lowers_peak_rss(heavy_labels, tmp_path, record_property):
+    """Flushing in bounded batches keeps peak RSS below the in-memory merge."""
+    full_rss = peak_rss_kb(heavy_labels, tmp_path / "full.pdf", 0)
+    streaming_rss = peak_rss_kb(heavy_labels, tmp_path / "streaming.pdf", 2 * 1024 * 1024)
+
+    record_property("peak_rss_full_kb", full_rss)
+    record_property("peak_rss_streaming_kb", streaming_rss)
+    print(f"Peak RSS: en memoria={full_rss} KB, por lotes={streaming_rss} KB")
+
+    assert streaming_rss < full_rss
+    with fitz.open(tmp_path / "streaming.pdf") as doc:
+        assert doc.page_count == LABEL_COUNT
+
+def test_streaming_merge_keeps_order(tmp_path):
+    """Batches are appended in the selected order."""
+    files = []
+    for i in range(7):
+        pdf = tmp_path / f"label_{i}.pdf"
+        doc = fitz.open()
+        doc.new_page().insert_text((50, 50), f"Label {i}")
+        doc.save(pdf)
+        doc.close()
+        files.append(str(pdf))
+    output = tmp_path / "out.pdf"
+
+    PyMuPDFRepository(max_memory_bytes=1).merge_pdfs(files, str(output))
+
+    with fitz.open(output) as doc:
+        assert [page.get_text().strip() for page in doc] == [f"Label {i}" for i in range(7)]
+
+def test_streaming_merge_invalid_input(tmp_path):
+    """A broken file in streaming mode still raises MergeError."""
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+
+    with pytest.raises(MergeError, match="Error al procesar el archivo"):
+        PyMuPDFRepository(max_memory_bytes=1024).merge_pdfs([str(broken)], str(tmp_path / "out.pdf"))
@@ -0,0 +1,80 @@
+import threading
+import fitz
+import pytest
+from src.infrastructure.thumbnail_cache import ThumbnailCache
+
+def create_label(path, text):
+    doc = fitz.open()
+    page = doc.new_page(width=283, height=142)
+    page.insert_text((12, 40), text, fontsize=14)
+    doc.save(path)
+    doc.close()
+
+def fetch(cache, path, timeout=30):
+    """Requests a thumbnail and waits for the callback."""
+    done = threading.Event()
+    result = []
+    cache.request(str(path), lambda _, png: (result.append(png), done.set()))
+    assert done.wait(timeout)
+    return result[0]
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ThumbnailCache(tmp_path / "miniaturas", max_side=120, use_processes=False)
+    yield cache
+    cache.close()
+
+def test_renders_first_page_once(cache, tmp_path):
+    label = tmp_path / "a.pdf"
+    create_label(label, "Royal Canin")
+
+    png = fetch(cache, label)
+    again = fetch(cache, label)
+
+    assert png == again
+    pix = fitz.Pixmap(png)
+    assert pix.width == 120 and 60 <= pix.height <= 61
+    assert (cache.rendered, cache.hits) == (1, 1)
+
+def test_key_follows_content(cache, tmp_path):
+    """Identical copies share a thumbnail; editing a file produces a new one."""
+    create_label(tmp_path / "a.pdf", "Royal Canin")
+    (tmp_path / "copia.pdf").write_bytes((tmp_path / "a.pdf").read_bytes())
+    first = fetch(cache, tmp_path / "a.pdf")
+
+    assert fetch(cache, tmp_path / "copia.pdf") == first
+    create_label(tmp_path / "a.pdf", "Pro Plan")
+    assert fetch(cache, tmp_path / "a.pdf") != first
+    assert cache.rendered == 2
+
+def test_evicts_least_recently_used(tmp_path):
+    labels = []
+    for i in range(3):
+        labels.append(tmp_path / f"{i}.pdf")
+        create_label(labels[-1], f"Etiqueta {i}")
+    cache = ThumbnailCache(tmp_path / "miniaturas", max_side=120, use_processes=False)
+    pngs = [fetch(cache, label) for label in labels[:2]]
+    sizes = [(tmp_path / "miniaturas" / p).stat().st_size for p in pngs]
+    # Entran dos miniaturas de este tamaño, no tres
+    cache.max_bytes = sum(sizes) + min(sizes) // 2
+    fetch(cache, labels[0])  # el 1 pasa a ser el menos usado
+
+    fetch(cache, labels[2])
+
+    remaining = sorted(p.name for p in (tmp_path / "miniaturas").glob("*.png"))
+    assert (tmp_path / "miniaturas" / pngs[1]).name not in remaining
+    assert len(remaining) == 2
+    # Un índice nuevo arranca con lo que quedó en disco
+    assert ThumbnailCache(tmp_path / "miniaturas", use_processes=False)._total_bytes == cache._total_bytes
+
+def test_broken_pdf_reports_none(cache, tmp_path):
+    (tmp_path / "roto.pdf").write_bytes(b"%PDF-1.4\nesto no es un pdf")
+    assert fetch(cache, tmp_path / "roto.pdf") is None
+
+def test_renders_in_worker_process(tmp_path):
+    create_label(tmp_path / "a.pdf", "Royal Canin")
+    cache = ThumbnailCache(tmp_path / "miniaturas", max_side=120, workers=1)
+    try:
+        assert fetch(cache, tmp_path / "a.pdf", timeout=60).endswith("_120.png")
+    finally:
+        cache.close()
@@ -0,0 +1,99 @@
+import time
+from pathlib import Path
+from src.interface.catalog_view_model import CatalogViewModel
+
+def _catalog(categories, per_category):
+    return {
+        f"cat{c:03d}": [Path(f"/e/cat{c:03d}/label{i:04d}.pdf") for i in range(per_category)]
+        for c in range(categories)
+    }
+
+def test_rows_group_labels_by_columns():
+    """Test that each category yields a header plus rows of `columns` labels."""
+    model = CatalogViewModel(columns=3)
+    model.set_catalog({"B": [Path("b1.pdf")], "A": [Path(f"a{i}.pdf") for i in range(4)]})
+
+    rows = model.rows()
+
+    assert [(kind, cat, len(paths)) for kind, cat, paths in rows] == [
+        ("header", "A", 0), ("labels", "A", 3), ("labels", "A", 1),
+        ("header", "B", 0), ("labels", "B", 1),
+    ]
+
+def test_large_catalog_starts_collapsed_and_expands_lazily():
+    """Test that big catalogs only produce header rows until a category is expanded."""
+    model = CatalogViewModel(columns=3, collapse_threshold=100)
+    model.set_catalog(_catalog(10, 50))
+
+    assert len(model.rows()) == 10
+    model.toggle_expanded("cat003")
+    assert len(model.rows()) == 10 + 17
+
+def test_selection_is_independent_of_rows():
+    """Test that selection survives collapsing and is returned in catalog order."""
+    model = CatalogViewModel(columns=3, collapse_threshold=0)
+    model.set_catalog(_catalog(2, 5))
+
+    model.set_category_selected("cat001", True)
+    model.set_selected(Path("/e/cat000/label0002.pdf"), True)
+    model.toggle_expanded("cat001")
+
+    assert model.selected_count() == 6
+    assert model.is_category_selected("cat001")
+    assert not model.is_category_selected("cat000")
+    assert model.selected_paths()[0] == Path("/e/cat000/label0002.pdf")
+
+    model.clear_selection()
+    assert model.selected_count() == 0
+
+def test_incremental_changes_keep_order_and_prune_selection():
+    """Test that add/remove patch the model and drop removed labels from the selection."""
+    model = CatalogViewModel()
+    model.set_catalog({"A": [Path("a1.pdf"), Path("a3.pdf")]})
+    model.set_selected(Path("a3.pdf"), True)
+
+    model.add_label("A", Path("a2.pdf"))
+    model.add_label("C", Path("c1.pdf"))
+    model.remove_label("A", Path("a3.pdf"))
+
+    assert model.labels == {"A": [Path("a1.pdf"), Path("a2.pdf")], "C": [Path("c1.pdf")]}
+    assert model.selected_count() == 0
+
+    model.remove_label("C", Path("c1.pdf"))
+    assert "C" not in model.labels
+
+def test_refresh_keeps_selection_of_surviving_labels():
+    """Test that reloading the catalog keeps only selections that still exist."""
+    model = CatalogViewModel()
+    model.set_catalog({"A": [Path("a1.pdf"), Path("a2.pdf")]})
+    model.set_category_selected("A", True)
+
+    model.set_catalog({"A": [Path("a2.pdf")]})
+
+    assert model.selected_paths() == [Path("a2.pdf")]
+
+def test_ten_thousand_labels_load_fast():
+    """Test that loading a 10k-label catalog stays well under the time to draw it."""
+    catalog = _catalog(100, 100)
+    model = CatalogViewModel()
+
+    start = time.perf_counter()
+    model.set_catalog(catalog)
+    rows = model.rows()
+    elapsed = time.perf_counter() - start
+
+    assert len(rows) == 100
+    assert elapsed < 0.5
+
+def test_selection_round_trips_through_a_preset():
+    """Test that full categories are saved by name and loose labels as relative paths."""
+    model = CatalogViewModel(columns=3)
+    model.set_catalog(_catalog(3, 4))
+    model.set_category_selected("cat001", True)
+    model.set_selected(Path("/e/cat002/label0003.pdf"), True)
+
+    preset = model.to_preset("Semanal", Path("/e"))
+    assert (preset.categories, preset.files) == (("cat001",), ("cat002/label0003.pdf",))
+
+    model.select_only([Path("/e/cat000/label0000.pdf"), Path("/e/otra/label.pdf")])
+    assert model.selected_paths() == [Path("/e/cat000/label0000.pdf")]
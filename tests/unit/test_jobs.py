@@ -0,0 +1,65 @@
+import threading
+import pytest
+from src.core.exceptions import OperationCancelled
+from src.core.jobs import (
+    JOB_CANCELLED, JOB_DONE, JOB_FAILED, LANE_HEAVY, LANE_QUICK, CancellationToken, JobScheduler
+)
+
+def test_quick_job_is_not_stuck_behind_heavy_ones():
+    """With two workers the heavy lane leaves one free, so a quick job runs at once."""
+    scheduler = JobScheduler(workers=2)
+    release = threading.Event()
+    heavy = [scheduler.submit(lambda token: release.wait(5), lane=LANE_HEAVY) for _ in range(2)]
+
+    quick = scheduler.submit(lambda token: "ok", lane=LANE_QUICK)
+
+    assert quick.wait(2) and quick.result == "ok"
+    assert [job.state for job in heavy] == ["running", "pending"]
+    release.set()
+    assert all(job.wait(2) for job in heavy)
+    assert scheduler.shutdown(timeout=2)
+
+def test_cancel_pending_and_running_jobs():
+    """A pending job never runs but still reports completion; a running one stops at its next check."""
+    scheduler = JobScheduler(workers=1)
+    started = threading.Event()
+    finished = []
+
+    def long_job(token):
+        started.set()
+        while not token.wait(0.01):
+            pass
+        token.raise_if_cancelled()
+
+    running = scheduler.submit(long_job, lane=LANE_HEAVY, on_done=finished.append)
+    pending = scheduler.submit(lambda token: pytest.fail("should not run"), lane=LANE_HEAVY,
+                               on_done=lambda job: finished.append((job, job.state)))
+    assert started.wait(2)
+
+    pending.cancel()
+    running.cancel()
+
+    assert running.wait(2) and pending.wait(2)
+    assert (running.state, pending.state) == (JOB_CANCELLED, JOB_CANCELLED)
+    assert finished == [(pending, JOB_CANCELLED), running]
+    scheduler.shutdown(timeout=2)
+
+def test_failed_job_keeps_its_error_and_shutdown_rejects_new_jobs():
+    scheduler = JobScheduler(workers=1)
+    job = scheduler.submit(lambda token: 1 / 0)
+
+    assert job.wait(2)
+    assert job.state == JOB_FAILED and isinstance(job.error, ZeroDivisionError)
+    assert scheduler.submit(lambda token: 1).wait(2)
+    assert scheduler.shutdown(timeout=2)
+    with pytest.raises(RuntimeError):
+        scheduler.submit(lambda token: 1)
+
+def test_token_and_invalid_lane():
+    token = CancellationToken()
+    token.raise_if_cancelled()
+    token.cancel()
+    with pytest.raises(OperationCancelled):
+        token.raise_if_cancelled()
+    with pytest.raises(ValueError, match="Carril"):
+        JobScheduler().submit(lambda token: None, lane="urgent")
@@ -0,0 +1,65 @@
+import pytest
+from unittest.mock import Mock
+from src.core.interfaces import IMetricsSink, IPdfRepository
+from src.core.metrics import MetricsFanout, ThroughputMeter, format_throughput
+from src.core.use_cases import merge_pdfs_use_case
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+def test_meter_computes_rates_and_eta():
+    """Rates come from 'file' events; the ETA extrapolates the average per file."""
+    clock = FakeClock()
+    meter = ThroughputMeter(clock=clock)
+    meter.record("merge_start", {"files": 4})
+    assert meter.snapshot()["eta_seconds"] is None
+
+    clock.now += 2
+    meter.record("file", {"pages": 10, "bytes": 1024 * 1024})
+    meter.record("file", {"pages": 30, "bytes": 3 * 1024 * 1024})
+    snapshot = meter.snapshot()
+
+    assert snapshot["pages_per_second"] == 20
+    assert snapshot["mb_per_second"] == 2
+    assert snapshot["eta_seconds"] == 2
+    assert format_throughput(snapshot) == "20 pág/s · 2.0 MB/s · faltan 2 s"
+    assert format_throughput({**snapshot, "eta_seconds": 125}).endswith("faltan 2 min 05 s")
+
+def test_fanout_ignores_failing_sinks():
+    broken = Mock(spec=IMetricsSink)
+    broken.record.side_effect = RuntimeError("disco lleno")
+    good = Mock(spec=IMetricsSink)
+
+    MetricsFanout([broken, None, good]).record("file", {"pages": 1})
+
+    good.record.assert_called_once_with("file", {"pages": 1})
+
+def test_merge_use_case_brackets_repository_events():
+    """The use case wraps the repository's events with merge_start/merge_end totals."""
+    repo = Mock(spec=IPdfRepository)
+    repo.merge_pdfs.side_effect = lambda **kwargs: kwargs["metrics"].record(
+        "file", {"pages": 2, "bytes": 100}
+    )
+    sink = Mock(spec=IMetricsSink)
+
+    merge_pdfs_use_case(["a.pdf", ("b.pdf", 2)], "out.pdf", repo, metrics=sink)
+
+    events = [c.args for c in sink.record.call_args_list]
+    assert [event for event, _ in events] == ["merge_start", "file", "merge_end"]
+    assert events[0][1] == {"files": 2, "output": "out.pdf"}
+    assert events[2][1]["ok"] and events[2][1]["pages"] == 2 and events[2][1]["bytes"] == 100
+
+def test_merge_use_case_reports_failures():
+    repo = Mock(spec=IPdfRepository)
+    repo.merge_pdfs.side_effect = RuntimeError("roto")
+    sink = Mock(spec=IMetricsSink)
+
+    with pytest.raises(RuntimeError):
+        merge_pdfs_use_case(["a.pdf"], "out.pdf", repo, metrics=sink)
+
+    event, fields = sink.record.call_args.args
+    assert event == "merge_end" and fields["ok"] is False and fields["error"] == "roto"
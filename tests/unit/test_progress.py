@@ -0,0 +1,83 @@
+import pytest
+from src.core.metrics import ThroughputMeter
+from src.core.progress import ProgressChannel
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+def test_updates_are_coalesced_and_rate_limited():
+    """Many updates between polls deliver only the latest state, at most max_hz times a second."""
+    clock = FakeClock()
+    channel = ProgressChannel(max_hz=10, clock=clock)
+    channel.start(1000)
+    assert channel.poll().current == 0
+
+    for i in range(1, 501):
+        channel(i, 1000)
+    assert channel.poll() is None  # 0.1 s todavía no pasaron
+
+    clock.now += 0.15
+    update = channel.poll()
+    assert (update.current, update.total) == (500, 1000)
+    assert channel.poll() is None  # nada cambió
+    assert channel.updates == 501
+    assert channel.delivered == 2
+
+def test_start_and_finish_skip_the_rate_limit():
+    clock = FakeClock()
+    channel = ProgressChannel(max_hz=1, clock=clock)
+    channel.start(3)
+    channel.poll()
+    channel.update(2)
+    channel.finish("Listo", ok=False, dialog=("Error", "falló"))
+
+    update = channel.poll()
+    assert update.done and not update.ok
+    assert update.message == "Listo"
+    assert update.current == 2
+    assert update.fields["dialog"] == ("Error", "falló")
+
+def test_wakeup_fires_once_per_delivery_with_the_remaining_delay():
+    clock = FakeClock()
+    delays = []
+    channel = ProgressChannel(max_hz=10, wakeup=delays.append, clock=clock)
+    channel.start(10)
+    channel.update(1)
+    assert delays == [0.0]  # un solo aviso hasta el próximo poll
+
+    channel.poll()
+    clock.now += 0.04
+    channel.update(2)
+    channel.update(3)
+    assert delays == [0.0, pytest.approx(0.06)]
+
+    clock.now += 0.02
+    assert channel.poll() is None  # llegó antes de tiempo: se vuelve a agendar
+    assert delays[-1] == pytest.approx(0.04)
+    clock.now += 0.04
+    assert channel.poll().current == 3
+
+def test_rate_eta_and_meter_snapshot():
+    clock = FakeClock()
+    meter = ThroughputMeter(total_files=8, clock=clock)
+    channel = ProgressChannel(meter=meter, clock=clock)
+    channel.start(8)
+    assert channel.poll().eta_seconds is None
+
+    clock.now += 2
+    meter.record("file", {"pages": 6, "bytes": 0})
+    channel(2, 8)
+    update = channel.poll()
+
+    assert update.items_per_second == 1
+    assert update.eta_seconds == 6
+    assert update.fraction == 0.25
+    assert update.throughput["pages"] == 6
+
+def test_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        ProgressChannel(max_hz=0)
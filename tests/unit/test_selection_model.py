@@ -0,0 +1,72 @@
+from src.core.selection import SelectionModel
+
+def _model():
+    model = SelectionModel()
+    model.set_categories({"A": ["a1", "a2", "a3"], "B": ["b1", "b2"]})
+    return model
+
+def test_counts_are_tracked_incrementally():
+    """Test that toggling items keeps the total and per-category counts."""
+    model = _model()
+
+    model.set_selected("a1", True)
+    model.set_selected("a1", True)
+    model.set_selected("b2", True)
+    model.set_selected("zz", True)
+
+    assert model.count() == 2
+    assert model.category_count("A") == 1
+    assert model.is_selected("b2")
+    assert not model.is_category_selected("A")
+
+    model.set_selected("a1", False)
+    assert model.count() == 1
+
+def test_bulk_operations_notify_once():
+    """Test that selecting a category or clearing emits a single notification."""
+    model = _model()
+    calls = []
+    model.subscribe(lambda m: calls.append(m.count()))
+
+    model.set_category_selected("A", True)
+    model.set_category_selected("B", True)
+    model.set_category_selected("A", False)
+    model.clear()
+    model.clear()
+
+    assert calls == [3, 5, 2, 0]
+    assert not model.is_category_selected("B")
+
+def test_selected_items_are_ordered_by_category():
+    """Test that selected items come back grouped by category and sorted."""
+    model = _model()
+    for item in ["b1", "a3", "a1"]:
+        model.set_selected(item, True)
+
+    assert model.selected_items() == ["a1", "a3", "b1"]
+
+def test_catalog_changes_prune_selection():
+    """Test that removed items leave the selection and new ones start unselected."""
+    model = _model()
+    model.set_category_selected("A", True)
+
+    model.remove_item("a2")
+    model.add_item("A", "a4")
+    assert model.count() == 2
+    assert not model.is_category_selected("A")
+
+    model.set_categories({"A": ["a1"], "C": ["c1"]})
+    assert model.selected_items() == ["a1"]
+    assert model.is_category_selected("A")
+
+def test_unsubscribe_stops_notifications():
+    """Test that an unsubscribed listener is no longer called."""
+    model = _model()
+    calls = []
+    listener = lambda m: calls.append(m.count())
+    model.subscribe(listener)
+    model.unsubscribe(listener)
+
+    model.set_selected("a1", True)
+
+    assert calls == []
@@ -0,0 +1,51 @@
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+from src.interface.startup_profiler import StartupProfiler
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+
+def test_importing_main_does_not_load_heavy_modules():
+    """GUI, PyMuPDF and SMTP modules must only load when first used."""
+    script = (
+        "import sys, main\n"
+        "heavy = ('customtkinter', 'PIL', 'fitz', 'smtplib', 'ssl', 'email.mime')\n"
+        "print([m for m in heavy if m in sys.modules])\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT_DIR,
+                            capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
+
+def test_lazy_builds_once():
+    """Test that lazy() calls its factory only on first use."""
+    import main
+    calls = []
+    get = main.lazy(lambda: calls.append(1) or object())
+
+    assert get() is get()
+    assert calls == [1]
+
+def test_profiler_reports_phases():
+    """Test that the profiler prints each phase and a machine-readable summary."""
+    profiler = StartupProfiler(enabled=True, origin=0.0)
+    profiler.marks = [("imports", 0.05), ("ventana_visible", 0.2)]
+    out = io.StringIO()
+
+    profiler.report(out)
+
+    lines = out.getvalue().splitlines()
+    assert "ventana_visible" in lines[2] and "150.0 ms" in lines[2]
+    assert json.loads(lines[-1][len("startup "):]) == {"imports": 0.05, "ventana_visible": 0.2}
+    assert profiler.elapsed("imports") == 0.05
+
+def test_disabled_profiler_is_silent():
+    profiler = StartupProfiler()
+    profiler.mark("imports")
+    out = io.StringIO()
+
+    profiler.report(out)
+
+    assert profiler.marks == [] and out.getvalue() == ""
@@ -1,7 +1,12 @@
 import pytest
 from unittest.mock import Mock, MagicMock
-from src.core.use_cases import merge_pdfs_use_case, send_pdf_by_email_use_case
-from src.core.interfaces import IPdfRepository, IEmailService
+from src.core.use_cases import (
+    merge_pdfs_use_case, plan_preset_use_case, preflight_pdfs_use_case, queue_pdf_email_use_case,
+    send_pdf_by_email_use_case
+)
+from src.core.entities import MergePlan, PreflightResult
+from src.core.exceptions import MergeError
+from src.core.interfaces import IPdfRepository, IEmailService, IEmailOutbox, IPreflightIndex, IPresetStore
 
 def test_merge_pdfs_use_case_empty_list():
     """Test that merging an empty list raises ValueError."""
@@ -26,7 +31,9 @@ def test_merge_pdfs_success():
     repo.merge_pdfs.assert_called_once_with(
         pdf_file_paths=files, 
         output_path=output, 
-        on_progress=None
+        on_progress=None,
+        metrics=None,
+        cancel=None
     )
 
 def test_send_email_use_case_no_pdf():
@@ -57,4 +64,132 @@ def test_send_email_success(tmp_path, valid_config):
     
     send_pdf_by_email_use_case(valid_config, str(pdf), service)
     
-    service.send_email_with_attachment.assert_called_once_with(valid_config, str(pdf))
+    service.send_email_with_attachment.assert_called_once_with(valid_config, str(pdf), cancel=None)
+
+from src.core.use_cases import impose_pdfs_use_case
+
+def test_impose_pdfs_use_case_invalid_grid():
+    """Test that a grid without rows or columns raises ValueError."""
+    repo = Mock(spec=IPdfRepository)
+    with pytest.raises(ValueError, match="La grilla debe tener"):
+        impose_pdfs_use_case(["a.pdf"], "out.pdf", repo, columns=0, rows=4)
+
+def test_impose_pdfs_success():
+    """Test successful delegation of an N-up job."""
+    repo = Mock(spec=IPdfRepository)
+
+    impose_pdfs_use_case(["a.pdf"], "out.pdf", repo, columns=2, rows=4)
+
+    repo.impose_pdfs.assert_called_once_with(
+        pdf_file_paths=["a.pdf"],
+        output_path="out.pdf",
+        columns=2,
+        rows=4,
+        paper_size="a4",
+        margin=18,
+        gap=6,
+        on_progress=None,
+        metrics=None,
+        cancel=None
+    )
+
+def test_merge_pdfs_use_case_invalid_copies():
+    """Test that asking for zero copies raises ValueError."""
+    repo = Mock(spec=IPdfRepository)
+    with pytest.raises(ValueError, match="La cantidad de copias"):
+        merge_pdfs_use_case([("a.pdf", 0)], "out.pdf", repo)
+    repo.merge_pdfs.assert_not_called()
+
+def test_merge_pdfs_use_case_accepts_copies():
+    """Test that (path, copies) pairs are passed through to the repository."""
+    repo = Mock(spec=IPdfRepository)
+    files = ["a.pdf", ("b.pdf", 20)]
+
+    merge_pdfs_use_case(files, "out.pdf", repo)
+
+    repo.merge_pdfs.assert_called_once_with(
+        pdf_file_paths=files,
+        output_path="out.pdf",
+        on_progress=None,
+        metrics=None,
+        cancel=None
+    )
+
+def test_queue_pdf_email_validates_and_enqueues(valid_config, tmp_path):
+    """The queue use case validates like the direct one and returns the outbox ids."""
+    pdf = tmp_path / "etiquetas.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    outbox = Mock(spec=IEmailOutbox)
+    outbox.enqueue.return_value = ["job-1"]
+
+    assert queue_pdf_email_use_case(valid_config, str(pdf), outbox) == ["job-1"]
+    outbox.enqueue.assert_called_once_with(valid_config, str(pdf))
+
+    with pytest.raises(ValueError, match="incompleta"):
+        queue_pdf_email_use_case({**valid_config, "APP_PASSWORD": ""}, str(pdf), outbox)
+
+def test_queue_pdf_email_rejects_separator_only_recipients(valid_config, tmp_path):
+    """EMAIL_RECEPTOR with nothing but separators is rejected before reaching the outbox."""
+    pdf = tmp_path / "etiquetas.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    outbox = Mock(spec=IEmailOutbox)
+
+    with pytest.raises(ValueError, match="destinatarios"):
+        queue_pdf_email_use_case({**valid_config, "EMAIL_RECEPTOR": " , ;"}, str(pdf), outbox)
+    outbox.enqueue.assert_not_called()
+
+def make_preflight(results):
+    preflight = Mock(spec=IPreflightIndex)
+    preflight.validate.side_effect = lambda paths, on_progress=None: {p: results[p] for p in paths}
+    return preflight
+
+PREFLIGHT_RESULTS = {
+    "ok.pdf": PreflightResult("/x/ok.pdf", "ok", 2),
+    "roto.pdf": PreflightResult("/x/roto.pdf", "needs_repair", 1, "dañado"),
+    "clave.pdf": PreflightResult("/x/clave.pdf", "encrypted", 0, "protegido con contraseña"),
+}
+
+def test_preflight_fail_lists_unusable_files_before_merging():
+    """With 'fail', every unusable label is reported at once; repairable ones don't count."""
+    preflight = make_preflight(PREFLIGHT_RESULTS)
+
+    with pytest.raises(MergeError, match="clave.pdf: protegido con contraseña"):
+        preflight_pdfs_use_case(["ok.pdf", "roto.pdf", "clave.pdf"], preflight)
+
+    report = preflight_pdfs_use_case(["ok.pdf", ("roto.pdf", 3)], preflight)
+    assert report.entries == ["ok.pdf", ("roto.pdf", 3)]
+    assert report.total_pages == 5
+    assert [r.path for r in report.repaired] == ["/x/roto.pdf"]
+
+@pytest.mark.parametrize("policy, kept, pages", [
+    ("skip", ["ok.pdf"], 4),
+    ("repair", ["ok.pdf", "roto.pdf"], 5),
+])
+def test_preflight_skip_and_repair_policies(policy, kept, pages):
+    preflight = make_preflight(PREFLIGHT_RESULTS)
+
+    report = preflight_pdfs_use_case([("ok.pdf", 2), "roto.pdf", "clave.pdf"], preflight, on_invalid=policy)
+
+    assert [e if isinstance(e, str) else e[0] for e in report.entries] == kept
+    assert report.total_pages == pages
+    assert "/x/clave.pdf" in [r.path for r in report.skipped]
+
+def test_preflight_rejects_empty_result_and_unknown_policy():
+    preflight = make_preflight(PREFLIGHT_RESULTS)
+    with pytest.raises(ValueError, match="Ninguna"):
+        preflight_pdfs_use_case(["clave.pdf"], preflight, on_invalid="skip")
+    with pytest.raises(ValueError, match="Política inválida"):
+        preflight_pdfs_use_case(["ok.pdf"], preflight, on_invalid="ignorar")
+
+def test_plan_preset_rejects_skipped_labels_only_when_failing():
+    """Test that a plan with skipped labels fails under "fail" and is used as-is otherwise."""
+    store = Mock(spec=IPresetStore)
+    store.compile_plan.return_value = MergePlan(
+        "Semanal", entries=["a.pdf"], skipped=[PreflightResult("b.pdf", "encrypted", 0, "protegido")],
+        total_pages=1, fingerprint="f"
+    )
+
+    with pytest.raises(MergeError, match="b.pdf: protegido"):
+        plan_preset_use_case("Semanal", store)
+    assert plan_preset_use_case("Semanal", store, on_invalid="skip").entries == ["a.pdf"]
+    store.compile_plan.assert_called_with("Semanal")